@@ -1,5 +1,10 @@
-from django.contrib import admin
-from .models import Category, Tag, Post, Comment, NewsletterSubscriber, PostView
+from django.contrib import admin, messages
+from django.core.exceptions import ImproperlyConfigured
+from core.counts import EstimatedCountPaginator
+from .models import (
+    Category, Tag, Post, Comment, NewsletterSubscriber, NewsletterIssue, PostView, PostViewDaily,
+)
+from . import newsletter
 
 
 @admin.register(Category)
@@ -41,6 +46,7 @@ class PostAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'published_at'
     filter_horizontal = ['tags']
+    readonly_fields = ['reading_time']
     inlines = [CommentInline]
     
     fieldsets = (
@@ -122,10 +128,45 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
     deactivate_subscribers.short_description = "Deactivate selected subscribers"
 
 
+@admin.register(NewsletterIssue)
+class NewsletterIssueAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'sent_count', 'failed_count', 'started_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject']
+    readonly_fields = [
+        'status', 'audience_max_id', 'last_subscriber_id', 'sent_count', 'failed_count',
+        'started_at', 'sent_at',
+    ]
+    
+    actions = ['send_issues']
+    
+    def send_issues(self, request, queryset):
+        try:
+            started = sum(newsletter.start(issue) for issue in queryset.filter(status='draft'))
+        except ImproperlyConfigured as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return
+        self.message_user(request, f"Queued {started} issue(s) for delivery.")
+    send_issues.short_description = "Send selected draft issues to active subscribers"
+
+
 @admin.register(PostView)
 class PostViewAdmin(admin.ModelAdmin):
+    # Planner estimates instead of COUNT(*) on large tables (PostgreSQL)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_display = ['post', 'ip_address', 'viewed_at']
     list_filter = ['viewed_at']
     search_fields = ['post__title', 'ip_address']
     date_hierarchy = 'viewed_at'
     readonly_fields = ['post', 'ip_address', 'user_agent', 'viewed_at']
+
+
+@admin.register(PostViewDaily)
+class PostViewDailyAdmin(admin.ModelAdmin):
+    list_display = ['post', 'day', 'views', 'unique_ips']
+    list_filter = ['day']
+    search_fields = ['post__title']
+    date_hierarchy = 'day'
+    list_select_related = ['post']
+    readonly_fields = ['post', 'day', 'views', 'unique_ips']
@@ -0,0 +1,111 @@
+"""
+Batched ingestion of ``PostView`` analytics rows.
+
+Views are captured on the request thread into a bounded in-memory queue and
+written by a background flusher with ``bulk_create``. When the queue is full
+new events are dropped rather than blocking the request; captured, dropped
+and persisted events are counted in ``core.metrics``.
+"""
+import logging
+import threading
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from core import metrics
+from core.buffers import BackgroundFlusher
+from .models import Post, PostView
+
+logger = logging.getLogger('django')
+
+
+class PostViewRecorder(BackgroundFlusher):
+    """Bounded queue of post views flushed with bulk_create"""
+    
+    def __init__(self, max_size=None, batch_size=None, interval=None):
+        super().__init__(
+            'post_views',
+            interval or getattr(settings, 'POST_VIEW_FLUSH_INTERVAL', 5),
+        )
+        self.max_size = max_size or getattr(settings, 'POST_VIEW_QUEUE_SIZE', 10000)
+        self.batch_size = batch_size or getattr(settings, 'POST_VIEW_BATCH_SIZE', 500)
+        self._queue = deque()
+        self._flush_lock = threading.Lock()
+    
+    def record(self, post, ip_address, user_agent=''):
+        """Queue a view; returns False if it was dropped because the queue is full"""
+        self.ensure_started()
+        event = PostView(
+            post_id=post.pk,
+            ip_address=ip_address,
+            user_agent=(user_agent or '')[:512],
+            viewed_at=timezone.now(),
+        )
+        with self._lock:
+            if len(self._queue) >= self.max_size:
+                metrics.incr('post_views.dropped')
+                return False
+            self._queue.append(event)
+            size = len(self._queue)
+        metrics.incr('post_views.captured')
+        if size >= self.batch_size:
+            self.wake()
+        return True
+    
+    def queued(self):
+        with self._lock:
+            return len(self._queue)
+    
+    def flush(self):
+        """Write queued views in batches; returns the number of rows persisted"""
+        persisted = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    count = min(len(self._queue), self.batch_size)
+                    batch = [self._queue.popleft() for _ in range(count)]
+                if not batch:
+                    break
+                try:
+                    PostView.objects.bulk_create(batch, batch_size=self.batch_size)
+                except Exception as e:
+                    metrics.incr('post_views.failed', len(batch))
+                    logger.error(f"Failed to persist {len(batch)} post views: {e}")
+                    break
+                persisted += len(batch)
+                metrics.incr('post_views.persisted', len(batch))
+        return persisted
+
+
+post_view_recorder = PostViewRecorder()
+
+
+def record_post_view(request, post):
+    """Capture a view of ``post`` for analytics, if tracking is enabled"""
+    if not getattr(settings, 'POST_VIEW_TRACKING', True):
+        return False
+    
+    from contact.views import get_client_ip
+    ip_address = get_client_ip(request)
+    if not ip_address:
+        return False
+    return post_view_recorder.record(
+        post, ip_address, request.META.get('HTTP_USER_AGENT', '')
+    )
+
+
+def popular_posts(days=30, limit=5):
+    """Published posts with the most views over the last ``days`` days.
+    
+    Reads the PostViewDaily rollup, never the raw PostView table.
+    """
+    since = timezone.localdate() - timedelta(days=days)
+    return (
+        Post.objects
+        .filter(status='published', daily_views__day__gte=since)
+        .annotate(recent_views=Sum('daily_views__views'))
+        .order_by('-recent_views', '-published_at')[:limit]
+    )
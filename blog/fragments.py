@@ -0,0 +1,57 @@
+"""
+Cached sidebar fragments shared by every blog list view (see core.fragments).
+"""
+from django.db.models import Count, Q
+
+from core import fragments
+from core.page_cache import model_tag
+from .models import Category, Post, Tag
+
+# Bumped whenever a post enters, leaves or changes within the published set
+PUBLISHED_POSTS_TAG = 'published:blog.post'
+
+
+def categories_context():
+    return {
+        'categories': list(
+            Category.objects.filter(is_active=True).annotate(
+                published_count=Count('posts', filter=Q(posts__status='published'))
+            )
+        ),
+    }
+
+
+def tags_context():
+    return {'tags': list(Tag.objects.filter(is_active=True)[:15])}
+
+
+def recent_posts_context():
+    published = Post.objects.filter(status='published')
+    # The list page shows the top featured posts separately
+    featured = list(published.filter(is_featured=True).values_list('pk', flat=True)[:3])
+    return {'recent_posts': list(published.exclude(pk__in=featured)[:5])}
+
+
+def render_categories(request=None):
+    return fragments.render(
+        'blog.categories', 'blog/partials/sidebar_categories.html', categories_context,
+        [model_tag(Category), PUBLISHED_POSTS_TAG], request=request,
+    )
+
+
+def render_tags(request=None):
+    return fragments.render(
+        'blog.tags', 'blog/partials/sidebar_tags.html', tags_context,
+        [model_tag(Tag)], request=request,
+    )
+
+
+def render_recent_posts(request=None):
+    return fragments.render(
+        'blog.recent_posts', 'blog/partials/sidebar_recent_posts.html', recent_posts_context,
+        [PUBLISHED_POSTS_TAG], request=request,
+    )
+
+
+def invalidate_published_posts():
+    fragments.invalidate(PUBLISHED_POSTS_TAG)
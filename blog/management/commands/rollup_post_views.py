@@ -0,0 +1,117 @@
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from blog.models import PostView, PostViewDaily
+
+
+def day_start(day):
+    """Return the aware datetime at the start of ``day``"""
+    return timezone.make_aware(datetime.combine(day, dt_time.min))
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll raw PostView rows up into daily PostViewDaily rows and prune raw "
+        "rows older than the retention period in bounded chunks."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days', type=int,
+            default=getattr(settings, 'POST_VIEW_RETENTION_DAYS', 90),
+            help="Delete raw PostView rows older than this many days (0 disables pruning)",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help="Maximum number of raw rows deleted per statement",
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0.0,
+            help="Seconds to sleep between delete chunks",
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help="Recompute every day still present in the raw table",
+        )
+    
+    def handle(self, *args, **options):
+        days = self.rollup(full=options['full'])
+        self.stdout.write(f"Rolled up {days} day(s) of post views")
+        
+        if options['retention_days'] > 0:
+            deleted = self.prune(
+                options['retention_days'], options['chunk_size'], options['pause']
+            )
+            self.stdout.write(f"Pruned {deleted} raw post view row(s)")
+    
+    def rollup(self, full=False):
+        """Recompute daily rows from the last rolled-up day (which may be partial) onward"""
+        start = None
+        if not full:
+            start = PostViewDaily.objects.aggregate(last=Max('day'))['last']
+        if start is None:
+            first = PostView.objects.aggregate(first=Min('viewed_at'))['first']
+            if first is None:
+                return 0
+            start = timezone.localdate(first)
+        
+        today = timezone.localdate()
+        day = start
+        count = 0
+        while day <= today:
+            self.rollup_day(day)
+            day += timedelta(days=1)
+            count += 1
+        return count
+    
+    def rollup_day(self, day):
+        rows = (
+            PostView.objects
+            .filter(viewed_at__gte=day_start(day), viewed_at__lt=day_start(day + timedelta(days=1)))
+            .values('post_id')
+            .annotate(views=Count('id'), unique_ips=Count('ip_address', distinct=True))
+            .order_by()
+        )
+        PostViewDaily.objects.bulk_create(
+            [
+                PostViewDaily(
+                    post_id=row['post_id'], day=day,
+                    views=row['views'], unique_ips=row['unique_ips'],
+                )
+                for row in rows
+            ],
+            update_conflicts=True,
+            unique_fields=['post', 'day'],
+            update_fields=['views', 'unique_ips'],
+            batch_size=500,
+        )
+    
+    def prune(self, retention_days, chunk_size, pause):
+        """Delete old raw rows by primary key, one bounded chunk at a time"""
+        cutoff = day_start(timezone.localdate() - timedelta(days=retention_days))
+        # Never delete rows for days that have not been rolled up yet
+        last_rolled = PostViewDaily.objects.aggregate(last=Max('day'))['last']
+        if last_rolled is None:
+            return 0
+        cutoff = min(cutoff, day_start(last_rolled))
+        
+        deleted = 0
+        while True:
+            ids = list(
+                PostView.objects
+                .filter(viewed_at__lt=cutoff)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            count, _ = PostView.objects.filter(pk__in=ids).delete()
+            deleted += count
+            if pause:
+                time.sleep(pause)
+        return deleted
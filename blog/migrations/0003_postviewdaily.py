@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_postview_viewed_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('unique_ips', models.PositiveIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='blog.post')),
+            ],
+            options={
+                'verbose_name_plural': 'Post view rollups',
+                'ordering': ['-day', '-views'],
+                'indexes': [models.Index(fields=['day', 'post'], name='blog_pvd_day_post_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postviewdaily',
+            constraint=models.UniqueConstraint(fields=('post', 'day'), name='blog_postviewdaily_post_day'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+
+POSTGRES_VECTOR = """
+    setweight(to_tsvector('english', coalesce(p.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(p.subtitle, '') || ' ' || coalesce(p.excerpt, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(t.name, ' ')
+        FROM blog_tag t JOIN blog_post_tags pt ON pt.tag_id = t.id
+        WHERE pt.post_id = p.id
+    ), '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(p.content, '')), 'C')
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE blog_post ADD COLUMN search_vector tsvector")
+        schema_editor.execute(f"UPDATE blog_post AS p SET search_vector = {POSTGRES_VECTOR}")
+        schema_editor.execute(
+            "CREATE INDEX blog_post_search_vector_gin ON blog_post USING GIN (search_vector)"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+            "title, excerpt, tags, content, tokenize='porter unicode61')"
+        )
+        schema_editor.execute("""
+            INSERT INTO blog_post_fts (rowid, title, excerpt, tags, content)
+            SELECT p.id, p.title, coalesce(p.subtitle, '') || ' ' || p.excerpt,
+                   coalesce((
+                       SELECT group_concat(t.name, ' ')
+                       FROM blog_tag t JOIN blog_post_tags pt ON pt.tag_id = t.id
+                       WHERE pt.post_id = p.id
+                   ), ''),
+                   p.content
+            FROM blog_post p
+        """)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS blog_post_search_vector_gin")
+        schema_editor.execute("ALTER TABLE blog_post DROP COLUMN IF EXISTS search_vector")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
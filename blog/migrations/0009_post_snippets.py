@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_rendered_markup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='snippets',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=5, help_text='Estimated reading time in minutes (computed from content)'),
+        ),
+    ]
@@ -1,8 +1,11 @@
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 from django.contrib.auth.models import User
 
+from core import markup
+
 
 class Category(models.Model):
     """Blog post categories"""
@@ -72,6 +75,10 @@ class Post(models.Model):
         help_text="Brief summary for post cards (auto-generated if empty)"
     )
     content = models.TextField(help_text="Main post content (Markdown supported)")
+    # Rendered from content on save (see core.markup)
+    content_html = models.TextField(blank=True, editable=False)
+    toc = models.JSONField(default=list, blank=True, editable=False)
+    markup_hash = models.CharField(max_length=40, blank=True, editable=False)
     
     # Author
     author = models.ForeignKey(
@@ -119,20 +126,83 @@ class Post(models.Model):
     # Reading time
     reading_time = models.PositiveIntegerField(
         default=5,
-        help_text="Estimated reading time in minutes"
+        help_text="Estimated reading time in minutes (computed from content)"
     )
+    # Pre-truncated plain-text snippets for cards and meta tags, see derive_text()
+    snippets = models.JSONField(default=dict, blank=True, editable=False)
     
     class Meta:
         ordering = ['-is_featured', '-published_at', '-created_at']
+        # Partial indexes matching the published-post query shapes in blog.views
+        indexes = [
+            models.Index(
+                fields=['-is_featured', '-published_at', '-created_at'],
+                condition=models.Q(status='published'),
+                name='blog_post_pub_order_idx',
+            ),
+            models.Index(
+                fields=['category', '-is_featured', '-published_at', '-created_at'],
+                condition=models.Q(status='published'),
+                name='blog_post_pub_cat_order_idx',
+            ),
+            models.Index(
+                fields=['published_at', 'id'],
+                condition=models.Q(status='published'),
+                name='blog_post_pub_nav_idx',
+            ),
+        ]
+    
+    markup_fields = {'content': 'content_html'}
+    markup_baselevel = 2
+    # Columns derive_text() fills from content_html
+    derived_fields = ['excerpt', 'reading_time', 'snippets']
+    
+    EXCERPT_WORDS = 35
+    SNIPPET_WORDS = {'card': 40, 'description': 30, 'teaser': 20, 'related': 15}
     
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
-        if not self.excerpt and self.content:
-            # Auto-generate excerpt from content
-            self.excerpt = self.content[:200] + '...' if len(self.content) > 200 else self.content
+        changed = markup.render_fields(self) + self.derive_text()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *changed}
         super().save(*args, **kwargs)
     
+    def derive_text(self):
+        """Fill reading time, excerpt and snippets from one pass over content_html.
+        
+        A blank excerpt, or one still equal to the last generated excerpt, is
+        regenerated, and so is a legacy one (see has_legacy_excerpt); an
+        excerpt written by hand is kept and truncated instead.
+        """
+        words = markup.plain_text(self.content_html).split()
+        self.reading_time = markup.reading_time(len(words))
+        generated = markup.truncate_words(words, self.EXCERPT_WORDS)
+        if (
+            not self.excerpt
+            or self.excerpt == self.snippets.get('excerpt')
+            or self.has_legacy_excerpt()
+        ):
+            self.excerpt = generated
+            source = words
+        else:
+            source = self.excerpt.split()
+        self.snippets = {
+            'excerpt': generated,
+            **{
+                name: markup.truncate_words(source, count)
+                for name, count in self.SNIPPET_WORDS.items()
+            },
+        }
+        return list(self.derived_fields)
+    
+    def has_legacy_excerpt(self):
+        """Whether the excerpt is the raw Markdown prefix save() used to
+        generate, before derive_text(). Checked by rerender_posts too."""
+        content = self.content or ''
+        legacy = content[:200] + '...' if len(content) > 200 else content
+        return bool(self.excerpt) and self.excerpt.strip() == legacy.strip()
+    
     def __str__(self):
         return self.title
     
@@ -154,18 +224,31 @@ class Post(models.Model):
     
     @property
     def related_posts(self):
-        """Get related posts based on category and tags"""
-        related = Post.objects.filter(
-            status='published'
-        ).exclude(id=self.id)
-        
-        if self.category:
-            related = related.filter(category=self.category)
-        
-        if self.tags.exists():
-            related = related.filter(tags__in=self.tags.all())
-        
-        return related.distinct()[:3]
+        """Related posts, best first, from the precomputed RelatedPost graph"""
+        return Post.objects.filter(
+            status='published',
+            related_from__post=self
+        ).select_related('category').order_by('related_from__rank')
+
+
+class RelatedPost(models.Model):
+    """Precomputed related-post edge, maintained by blog.related"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_from')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    
+    class Meta:
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'related'], name='blog_relatedpost_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['post', 'rank'], name='blog_relatedpost_rank_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} ({self.score:.2f})"
 
 
 class Comment(models.Model):
@@ -195,6 +278,13 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['post', '-created_at'],
+                condition=models.Q(is_approved=True, parent__isnull=True),
+                name='blog_comment_approved_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"Comment by {self.name} on {self.post.title}"
@@ -218,15 +308,78 @@ class NewsletterSubscriber(models.Model):
         return self.email
 
 
+class NewsletterIssue(models.Model):
+    """Newsletter issue, delivered to active subscribers by blog.newsletter"""
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+    ]
+
+    subject = models.CharField(max_length=200)
+    content = models.TextField(help_text="Issue content (Markdown supported)")
+    content_html = models.TextField(blank=True, editable=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+
+    # Delivery progress: subscribers are sent in primary key order up to
+    # audience_max_id, and last_subscriber_id is the checkpoint to resume from
+    audience_max_id = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    last_subscriber_id = models.PositiveBigIntegerField(default=0, editable=False)
+    sent_count = models.PositiveIntegerField(default=0, editable=False)
+    failed_count = models.PositiveIntegerField(default=0, editable=False)
+    locked_until = models.DateTimeField(null=True, blank=True, editable=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    sent_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def save(self, *args, **kwargs):
+        self.content_html, _toc = markup.render(self.content, baselevel=2)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'content_html'}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.subject
+
+
 class PostView(models.Model):
     """Track post views"""
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='post_views')
     ip_address = models.GenericIPAddressField()
     user_agent = models.TextField(blank=True)
-    viewed_at = models.DateTimeField(auto_now_add=True)
+    # Set at capture time; rows are written later in batches
+    viewed_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-viewed_at']
+        indexes = [
+            models.Index(fields=['viewed_at'], name='blog_postview_viewed_at_idx'),
+        ]
     
     def __str__(self):
         return f"View of {self.post.title} from {self.ip_address}"
+
+
+class PostViewDaily(models.Model):
+    """Daily rollup of post views, maintained by the rollup_post_views command"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='daily_views')
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    unique_ips = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name_plural = "Post view rollups"
+        ordering = ['-day', '-views']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'day'], name='blog_postviewdaily_post_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'post'], name='blog_pvd_day_post_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.post.title} on {self.day}: {self.views} views"
@@ -0,0 +1,202 @@
+"""
+Newsletter delivery.
+
+``start(issue)`` fixes the audience (active subscribers up to the current
+highest primary key) and queues ``send_issue``. Each run of that task holds
+a lease on the issue, so two workers never send the same issue at once. It
+streams subscribers in primary key order with ``iterator(chunk_size=...)``
+and sends them in batches of ``NEWSLETTER_BATCH_SIZE`` through one pooled
+SMTP connection (``core.mail``), paced to ``NEWSLETTER_RATE_LIMIT`` messages
+a second. After ``NEWSLETTER_TASK_BUDGET`` seconds it queues itself again,
+so no run outlives the task lock timeout.
+
+Progress is checkpointed after every message. A crashed or retried run
+resumes after the last subscriber recorded as sent, so at most the one
+message in flight can go out twice. A message the server rejects (refused
+recipient, 5xx reply to the data) is counted as failed and skipped;
+connection errors (disconnect, 421, socket errors) fail the task, which
+the queue retries from the checkpoint.
+
+``start`` refuses to send while ``SITE_URL`` is still the placeholder, since
+every unsubscribe link is built from it.
+
+The issue body is rendered once per run with placeholder markers, and each
+message only substitutes the subscriber's name and unsubscribe link.
+Memory stays flat however many subscribers there are.
+"""
+import smtplib
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import escape
+
+from core import metrics
+from core.mail import is_connection_error
+from core.tasks import task
+from .models import NewsletterIssue, NewsletterSubscriber
+
+UNSUBSCRIBE_SALT = 'blog.newsletter.unsubscribe'
+
+PLACEHOLDER_SITE_URL = 'https://yourdomain.com'
+
+# Substituted per subscriber into the once-rendered issue
+NAME_MARKER = '%%subscriber_name%%'
+UNSUBSCRIBE_MARKER = '%%unsubscribe_url%%'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def unsubscribe_token(subscriber_id):
+    return signing.dumps(subscriber_id, salt=UNSUBSCRIBE_SALT, compress=True)
+
+
+def read_unsubscribe_token(token):
+    """Subscriber id from ``token``; raises signing.BadSignature"""
+    return signing.loads(token, salt=UNSUBSCRIBE_SALT)
+
+
+def unsubscribe_url(subscriber_id):
+    path = reverse('blog:newsletter_unsubscribe', args=[unsubscribe_token(subscriber_id)])
+    return f'{settings.SITE_URL.rstrip("/")}{path}'
+
+
+def render_issue(issue):
+    """Return (text, html) for ``issue`` with the per-subscriber markers in place"""
+    context = {
+        'issue': issue,
+        'subscriber_name': NAME_MARKER,
+        'unsubscribe_url': UNSUBSCRIBE_MARKER,
+        'SITE_NAME': settings.SITE_NAME,
+        'SITE_URL': settings.SITE_URL,
+    }
+    return (
+        render_to_string('blog/emails/newsletter.txt', context),
+        render_to_string('blog/emails/newsletter.html', context),
+    )
+
+
+def personalise(template, name, url, html=False):
+    if html:
+        name, url = escape(name), escape(url)
+    return template.replace(NAME_MARKER, name).replace(UNSUBSCRIBE_MARKER, url)
+
+
+def build_message(issue, rendered, subscriber_id, email, name, connection):
+    text, html = rendered
+    name = name or 'there'
+    url = unsubscribe_url(subscriber_id)
+    message = EmailMultiAlternatives(
+        subject=issue.subject,
+        body=personalise(text, name, url),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email],
+        headers={
+            'List-Unsubscribe': f'<{url}>',
+            'List-Unsubscribe-Post': 'List-Unsubscribe=One-Click',
+        },
+        connection=connection,
+    )
+    message.attach_alternative(personalise(html, name, url, html=True), 'text/html')
+    return message
+
+
+def start(issue):
+    """Fix the audience of a draft ``issue`` and queue its delivery"""
+    site_url = settings.SITE_URL.rstrip('/')
+    if not site_url or site_url == PLACEHOLDER_SITE_URL:
+        raise ImproperlyConfigured(
+            "Set SITE_URL before sending a newsletter; unsubscribe links are built from it"
+        )
+    with transaction.atomic():
+        audience = NewsletterSubscriber.objects.filter(is_active=True).aggregate(
+            last=Max('pk')
+        )['last'] or 0
+        started = NewsletterIssue.objects.filter(pk=issue.pk, status='draft').update(
+            status='sending', audience_max_id=audience, started_at=timezone.now(),
+        )
+        if started:
+            send_issue.delay(issue.pk)
+    return bool(started)
+
+
+def _acquire(issue_id, budget):
+    """Lease the issue for one run; False when another run holds it"""
+    now = timezone.now()
+    return NewsletterIssue.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        pk=issue_id, status='sending',
+    ).update(locked_until=now + timedelta(seconds=budget + 60))
+
+
+def _checkpoint(issue_id, subscriber_id, sent):
+    changes = {'last_subscriber_id': subscriber_id}
+    if sent:
+        changes['sent_count'] = F('sent_count') + 1
+    else:
+        changes['failed_count'] = F('failed_count') + 1
+    NewsletterIssue.objects.filter(pk=issue_id).update(**changes)
+
+
+def deliver(issue, deadline):
+    """Send ``issue`` from its checkpoint until done or ``deadline``; True when done"""
+    batch_size = _setting('NEWSLETTER_BATCH_SIZE', 100)
+    rate = _setting('NEWSLETTER_RATE_LIMIT', 10)
+    rendered = render_issue(issue)
+    subscribers = NewsletterSubscriber.objects.filter(
+        is_active=True,
+        pk__gt=issue.last_subscriber_id,
+        pk__lte=issue.audience_max_id,
+    ).order_by('pk').values_list('pk', 'email', 'name').iterator(chunk_size=batch_size)
+
+    while True:
+        batch = list(islice(subscribers, batch_size))
+        if not batch:
+            return True
+        started = time.monotonic()
+        # One connection per batch; closing returns it to the pool
+        with get_connection() as connection:
+            for subscriber_id, email, name in batch:
+                message = build_message(issue, rendered, subscriber_id, email, name, connection)
+                try:
+                    sent = message.send() == 1
+                except smtplib.SMTPException as e:
+                    if is_connection_error(e):
+                        raise
+                    sent = False
+                _checkpoint(issue.pk, subscriber_id, sent)
+                metrics.incr('newsletter.sent' if sent else 'newsletter.failed')
+        if rate:
+            # Sleep off whatever is left of this batch's share of the rate
+            pause = len(batch) / rate - (time.monotonic() - started)
+            if pause > 0:
+                time.sleep(pause)
+        if time.monotonic() >= deadline:
+            return False
+
+
+@task(max_attempts=10)
+def send_issue(issue_id):
+    budget = _setting('NEWSLETTER_TASK_BUDGET', 240)
+    if not _acquire(issue_id, budget):
+        return
+    try:
+        issue = NewsletterIssue.objects.get(pk=issue_id)
+        done = deliver(issue, time.monotonic() + budget)
+    finally:
+        NewsletterIssue.objects.filter(pk=issue_id).update(locked_until=None)
+    if done:
+        NewsletterIssue.objects.filter(pk=issue_id).update(status='sent', sent_at=timezone.now())
+    else:
+        send_issue.delay(issue_id)
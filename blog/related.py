@@ -0,0 +1,47 @@
+"""
+Precomputed related-posts graph.
+
+For each published post the best ``RELATED_POSTS_LIMIT`` other posts are
+stored in ``RelatedPost``, scored by ``core.related`` from shared tags
+(weighted by rarity) and the same category, plus a small recency boost for
+the candidate.
+"""
+from core.related import RelatedGraph
+
+from .models import Post, RelatedPost
+
+RECENCY_WEIGHT = 0.5
+RECENCY_HALF_LIFE_DAYS = 180
+
+
+class PostGraph(RelatedGraph):
+    model = Post
+    edge_model = RelatedPost
+    owner_field = 'post'
+    visible = {'status': 'published'}
+    limit_setting = 'RELATED_POSTS_LIMIT'
+    boost_fields = ('published_at', 'created_at')
+    
+    def boost(self, values, now):
+        published_at, created_at = values
+        age_days = max((now - (published_at or created_at)).total_seconds() / 86400, 0)
+        return RECENCY_WEIGHT * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+graph = PostGraph()
+
+
+def update_post(post_id):
+    """Recompute edges for a post whose tags, category or visibility changed,
+    and for every post whose list it could enter or leave."""
+    return graph.update(post_id)
+
+
+def refresh(post_ids):
+    """Recompute edges for ``post_ids`` only"""
+    return graph.refresh(post_ids)
+
+
+def rebuild_all(batch_size=1000):
+    """Recompute the whole graph"""
+    return graph.rebuild_all(batch_size=batch_size)
@@ -0,0 +1,295 @@
+"""
+Full-text search for blog posts.
+
+One API (``search_posts`` / ``apply_search``) over three backends chosen by
+database vendor:
+
+* PostgreSQL: a ``search_vector`` tsvector column on ``blog_post`` with a GIN
+  index, ranked with ``ts_rank_cd`` and highlighted with ``ts_headline``.
+* SQLite: an FTS5 shadow table ``blog_post_fts`` keyed by post id, ranked with
+  ``bm25`` and highlighted with ``snippet``.
+* Anything else: the previous ``icontains`` scan, ranked title-first.
+
+The column and the shadow table are created by migration 0005 and kept up to
+date by tasks queued from the signals in ``blog.signals``.
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, TextField, Value, When
+from django.utils.html import escape
+
+from core.tasks import task
+from .models import Post
+
+# Highlight sentinels are swapped for <mark> after the text is escaped
+HL_START = '\x02'
+HL_STOP = '\x03'
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+SEARCH_LIMIT = 100
+
+
+@dataclass
+class SearchHit:
+    post_id: int
+    rank: float
+    highlight: str = ''
+
+
+def tokenize(query):
+    """Split a user query into plain word tokens (drops all query syntax)"""
+    return WORD_RE.findall(query.lower())[:16]
+
+
+def render_highlight(text):
+    """Escape a snippet and turn highlight sentinels into <mark> tags"""
+    if not text:
+        return ''
+    return (
+        escape(text)
+        .replace(HL_START, '<mark>')
+        .replace(HL_STOP, '</mark>')
+    )
+
+
+class BaseSearchBackend:
+    """Backend interface; also the icontains fallback for other databases"""
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        title_q = Q()
+        body_q = Q()
+        for token in tokens:
+            title_q &= Q(title__icontains=token)
+            body_q &= (
+                Q(title__icontains=token) |
+                Q(excerpt__icontains=token) |
+                Q(content__icontains=token) |
+                Q(tags__name__icontains=token)
+            )
+        rows = (
+            Post.objects.filter(status='published').filter(body_q)
+            .annotate(title_match=Case(
+                When(title_q, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+            .order_by('-title_match', '-published_at')
+            .values_list('pk', 'title_match')
+            .distinct()[:limit]
+        )
+        return [SearchHit(pk, float(title_match)) for pk, title_match in rows]
+
+    def index_posts(self, post_ids):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """tsvector column + GIN index"""
+
+    config = 'english'
+
+    VECTOR_SQL = """
+        setweight(to_tsvector(%(config)s, coalesce(p.title, '')), 'A') ||
+        setweight(to_tsvector(%(config)s, coalesce(p.subtitle, '') || ' ' || coalesce(p.excerpt, '')), 'B') ||
+        setweight(to_tsvector(%(config)s, coalesce((
+            SELECT string_agg(t.name, ' ')
+            FROM blog_tag t JOIN blog_post_tags pt ON pt.tag_id = t.id
+            WHERE pt.post_id = p.id
+        ), '')), 'B') ||
+        setweight(to_tsvector(%(config)s, coalesce(p.content, '')), 'C')
+    """
+
+    def build_tsquery(self, tokens):
+        # Tokens are plain \w+ words; the last one is a prefix match
+        terms = [f"'{token}'" for token in tokens]
+        terms[-1] += ':*'
+        return ' & '.join(terms)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        sql = f"""
+            SELECT ranked.id, ranked.rank, ts_headline(
+                %(config)s,
+                coalesce(ranked.excerpt, '') || ' ' || ranked.content,
+                ranked.query,
+                'StartSel={HL_START}, StopSel={HL_STOP}, MaxWords=35, MinWords=15, ShortWord=2'
+            )
+            FROM (
+                SELECT p.id, p.excerpt, p.content, q.query,
+                       ts_rank_cd(p.search_vector, q.query) AS rank
+                FROM blog_post p, to_tsquery(%(config)s, %(tsquery)s) AS q(query)
+                WHERE p.status = 'published' AND p.search_vector @@ q.query
+                ORDER BY rank DESC, p.published_at DESC
+                LIMIT %(limit)s
+            ) ranked
+            ORDER BY ranked.rank DESC
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {
+                'config': self.config,
+                'tsquery': self.build_tsquery(tokens),
+                'limit': limit,
+            })
+            return [
+                SearchHit(pk, rank, render_highlight(headline))
+                for pk, rank, headline in cursor.fetchall()
+            ]
+
+    def index_posts(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE blog_post AS p SET search_vector = {self.VECTOR_SQL} "
+                f"WHERE p.id = ANY(%(ids)s)",
+                {'config': self.config, 'ids': post_ids},
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE blog_post AS p SET search_vector = {self.VECTOR_SQL}",
+                {'config': self.config},
+            )
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """FTS5 shadow table with rowid = post id"""
+
+    # bm25 column weights: title, excerpt, tags, content
+    WEIGHTS = (10.0, 4.0, 4.0, 1.0)
+
+    def build_match(self, tokens):
+        # Quoted terms are literal in FTS5; the last one is a prefix match
+        terms = [f'"{token}"' for token in tokens]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        weights = ', '.join(str(w) for w in self.WEIGHTS)
+        sql = f"""
+            SELECT f.rowid, bm25(blog_post_fts, {weights}) AS rank,
+                   snippet(blog_post_fts, -1, ?, ?, '…', 24)
+            FROM blog_post_fts f
+            JOIN blog_post p ON p.id = f.rowid
+            WHERE blog_post_fts MATCH ? AND p.status = 'published'
+            ORDER BY rank
+            LIMIT ?
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql.replace('?', '%s'),
+                [HL_START, HL_STOP, self.build_match(tokens), limit],
+            )
+            # bm25 is "lower is better"; flip it so higher rank means better
+            return [
+                SearchHit(pk, -rank, render_highlight(snippet))
+                for pk, rank, snippet in cursor.fetchall()
+            ]
+
+    def index_posts(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        self.remove_posts(post_ids)
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO blog_post_fts (rowid, title, excerpt, tags, content)
+                SELECT p.id, p.title, coalesce(p.subtitle, '') || ' ' || p.excerpt,
+                       coalesce((
+                           SELECT group_concat(t.name, ' ')
+                           FROM blog_tag t JOIN blog_post_tags pt ON pt.tag_id = t.id
+                           WHERE pt.post_id = p.id
+                       ), ''),
+                       p.content
+                FROM blog_post p WHERE p.id IN ({placeholders})
+                """,
+                post_ids,
+            )
+
+    def remove_posts(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM blog_post_fts WHERE rowid IN ({placeholders})",
+                post_ids,
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM blog_post_fts")
+        self.index_posts(Post.objects.values_list('pk', flat=True))
+
+
+def get_backend():
+    """Return the search backend for the default database"""
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    return BaseSearchBackend()
+
+
+@task
+def index_posts(post_ids):
+    """Refresh the full-text index rows for ``post_ids``"""
+    get_backend().index_posts(post_ids)
+
+
+@task
+def remove_posts(post_ids):
+    get_backend().remove_posts(post_ids)
+
+
+def search_posts(query, limit=SEARCH_LIMIT):
+    """Return ranked SearchHits for published posts matching ``query``"""
+    return get_backend().search(query, limit=limit)
+
+
+def apply_search(queryset, query, limit=SEARCH_LIMIT):
+    """Restrict ``queryset`` to search hits, ordered by relevance.
+
+    Each post gets a ``search_highlight`` attribute holding an escaped HTML
+    snippet with matches wrapped in <mark>.
+    """
+    hits = search_posts(query, limit=limit)
+    if not hits:
+        return queryset.none()
+    return (
+        queryset.filter(pk__in=[hit.post_id for hit in hits])
+        .annotate(
+            search_position=Case(
+                *[When(pk=hit.post_id, then=Value(i)) for i, hit in enumerate(hits)],
+                output_field=IntegerField(),
+            ),
+            search_highlight=Case(
+                *[When(pk=hit.post_id, then=Value(hit.highlight)) for hit in hits],
+                default=Value(''),
+                output_field=TextField(),
+            ),
+        )
+        .order_by('search_position')
+    )
@@ -0,0 +1,102 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Post, Tag
+from . import fragments, related, search
+
+
+def reindex_posts(post_ids):
+    """Queue a search index refresh for ``post_ids``"""
+    post_ids = list(post_ids)
+    if post_ids:
+        search.index_posts.delay(post_ids)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reindex_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    search.remove_posts.delay([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            reindex_posts([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        reindex_posts(pk_set)
+    elif action == 'pre_clear':
+        # pk_set is not provided when clearing; collect the posts beforehand
+        reindex_posts(instance.posts.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        reindex_posts(instance.posts.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_deleted(sender, instance, **kwargs):
+    reindex_posts(instance.posts.values_list('pk', flat=True))
+
+
+# Fields that change which posts are related to which
+RELATED_FIELDS = ('category_id', 'status', 'published_at')
+
+
+@receiver(pre_save, sender=Post)
+def post_related_fields_changed(sender, instance, raw=False, **kwargs):
+    instance._related_dirty = True
+    instance._was_published = False
+    if raw or not instance.pk:
+        return
+    old = Post.objects.filter(pk=instance.pk).values(*RELATED_FIELDS).first()
+    if old is not None:
+        instance._related_dirty = any(
+            old[name] != getattr(instance, name) for name in RELATED_FIELDS
+        )
+        instance._was_published = old['status'] == 'published'
+
+
+@receiver(post_save, sender=Post)
+def post_saved_update_related(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_related_dirty', True):
+        pk = instance.pk
+        transaction.on_commit(lambda: related.update_post(pk))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed_update_related(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    post_ids = [instance.pk] if not reverse else list(pk_set or ())
+    for pk in post_ids:
+        transaction.on_commit(lambda pk=pk: related.update_post(pk))
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleted_update_related(sender, instance, **kwargs):
+    # Found before the delete, while the post's tags and edges still exist
+    affected = related.graph.affected(instance.pk) - {instance.pk}
+    if affected:
+        transaction.on_commit(lambda: related.refresh(affected))
+
+
+@receiver(post_save, sender=Post)
+def post_saved_update_fragments(sender, instance, raw=False, **kwargs):
+    # Sidebars only show published posts; drafts never bump them
+    if not raw and (instance.status == 'published' or getattr(instance, '_was_published', False)):
+        fragments.invalidate_published_posts()
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted_update_fragments(sender, instance, **kwargs):
+    if instance.status == 'published':
+        fragments.invalidate_published_posts()
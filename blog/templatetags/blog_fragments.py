@@ -0,0 +1,23 @@
+from django import template
+
+from .. import fragments
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def blog_categories(context):
+    """Active categories with published post counts (cached)"""
+    return fragments.render_categories(context.get('request'))
+
+
+@register.simple_tag(takes_context=True)
+def blog_tags(context):
+    """First 15 active tags (cached)"""
+    return fragments.render_tags(context.get('request'))
+
+
+@register.simple_tag(takes_context=True)
+def blog_recent_posts(context):
+    """Five most recent published posts, skipping the featured ones (cached)"""
+    return fragments.render_recent_posts(context.get('request'))
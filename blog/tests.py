@@ -1,3 +1,361 @@
-from django.test import TestCase
+import random
+import smtplib
+import unittest
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import metrics
+
+from . import newsletter, related
+from .analytics import PostViewRecorder
+from .management.commands.rollup_post_views import Command as RollupCommand
+from .models import (
+    Category, NewsletterIssue, NewsletterSubscriber, Post, PostView, PostViewDaily, RelatedPost,
+    Tag,
+)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "EXPLAIN assertions target PostgreSQL")
+class HotQueryIndexTests(TestCase):
+    """The planner picks the partial published-post indexes on a realistic table"""
+    POSTS = 100000
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='author')
+        cls.categories = [
+            Category.objects.create(name=f'Category {i}', slug=f'category-{i}') for i in range(10)
+        ]
+        now = timezone.now()
+        Post.objects.bulk_create([
+            Post(
+                title=f'Post {i}',
+                slug=f'post-{i}',
+                content='Body',
+                author=author,
+                category=cls.categories[i % len(cls.categories)],
+                # One in ten is a draft or archived, one in fifty featured
+                status='draft' if i % 20 == 0 else 'archived' if i % 20 == 1 else 'published',
+                is_featured=i % 50 == 0,
+                published_at=now - timedelta(minutes=i),
+            )
+            for i in range(cls.POSTS)
+        ], batch_size=5000)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE blog_post')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=f"\n{plan}")
+
+    def test_list_order_uses_partial_index(self):
+        queryset = Post.objects.filter(status='published').order_by(*Post._meta.ordering)[:12]
+        self.assertUsesIndex(queryset, 'blog_post_pub_order_idx')
+
+    def test_category_list_uses_partial_index(self):
+        queryset = Post.objects.filter(
+            status='published', category=self.categories[3],
+        ).order_by(*Post._meta.ordering)[:12]
+        self.assertUsesIndex(queryset, 'blog_post_pub_cat_order_idx')
+
+    def test_neighbour_lookup_uses_partial_index(self):
+        pivot = timezone.now() - timedelta(days=30)
+        queryset = Post.objects.filter(
+            status='published', published_at__lt=pivot,
+        ).order_by('-published_at', '-id')[:1]
+        self.assertUsesIndex(queryset, 'blog_post_pub_nav_idx')
+
+
+class PostViewRecorderTests(TestCase):
+    """Views are queued on the request thread and written in batches"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='author')
+        cls.post = Post.objects.create(title='Post', slug='post', content='Body', author=author)
+
+    def setUp(self):
+        metrics.reset()
+        self.recorder = PostViewRecorder(max_size=5, batch_size=2)
+        # Flushed by hand, not by a background thread
+        self.recorder.ensure_started = lambda: None
+
+    def record(self, count):
+        return [self.recorder.record(self.post, '203.0.113.7', 'agent') for _ in range(count)]
+
+    def test_full_queue_drops_views(self):
+        self.assertEqual(self.record(7), [True] * 5 + [False] * 2)
+        self.assertEqual(metrics.get('post_views.dropped'), 2)
+        self.assertFalse(PostView.objects.exists())
+
+    def test_flush_writes_queue_in_batches(self):
+        self.record(5)
+        with self.assertNumQueries(3):
+            self.assertEqual(self.recorder.flush(), 5)
+        self.assertEqual(self.recorder.queued(), 0)
+        self.assertEqual(PostView.objects.filter(post=self.post).count(), 5)
+        self.assertEqual(metrics.get('post_views.persisted'), 5)
+
+    def test_failed_batch_counted_and_later_views_still_written(self):
+        self.record(3)
+        with mock.patch.object(
+            PostView.objects, 'bulk_create', side_effect=DatabaseError('gone'),
+        ), self.assertLogs('django', 'ERROR'):
+            self.assertEqual(self.recorder.flush(), 0)
+        self.assertEqual(metrics.get('post_views.failed'), 2)
+        self.assertEqual(self.recorder.flush(), 1)
+        self.assertEqual(PostView.objects.count(), 1)
+
+
+class PostViewRollupTests(TestCase):
+    """rollup_post_views aggregates per day and prunes only rolled-up raw rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='author')
+        cls.post = Post.objects.create(title='Post', slug='post', content='Body', author=author)
+        now = timezone.now()
+        PostView.objects.bulk_create([
+            PostView(post=cls.post, ip_address=ip, viewed_at=now - timedelta(days=days))
+            for days, ip in [
+                (0, '203.0.113.1'), (0, '203.0.113.1'), (0, '203.0.113.2'),
+                (100, '203.0.113.1'), (100, '203.0.113.3'),
+            ]
+        ])
+
+    def rollup(self, *args):
+        call_command('rollup_post_views', *args, stdout=StringIO())
+        return {
+            (row.day, row.views, row.unique_ips)
+            for row in PostViewDaily.objects.filter(post=self.post)
+        }
+
+    def test_rollup_counts_views_and_unique_ips_per_day(self):
+        today = timezone.localdate()
+        old = timezone.localdate(timezone.now() - timedelta(days=100))
+        self.assertEqual(
+            self.rollup('--retention-days', '0'), {(today, 3, 2), (old, 2, 2)},
+        )
+        # Rerunning recomputes the last (partial) day instead of adding to it
+        PostView.objects.create(post=self.post, ip_address='203.0.113.4')
+        self.assertIn((today, 4, 3), self.rollup('--retention-days', '0'))
+
+    def test_prune_waits_for_rollup_and_deletes_in_chunks(self):
+        self.assertEqual(RollupCommand().prune(30, chunk_size=1, pause=0), 0)
+        self.assertEqual(PostView.objects.count(), 5)
+
+        old = timezone.localdate(timezone.now() - timedelta(days=100))
+        daily = self.rollup('--retention-days', '30', '--chunk-size', '1')
+        self.assertIn((old, 2, 2), daily)
+        self.assertEqual(PostView.objects.count(), 3)
+        self.assertFalse(
+            PostView.objects.filter(viewed_at__lt=timezone.now() - timedelta(days=30)).exists()
+        )
+
+
+class RelatedPostsTests(TestCase):
+    """Incremental updates load only candidates and agree with a full rebuild"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(7)
+        author = User.objects.create(username='author')
+        cls.categories = [
+            Category.objects.create(name=f'Category {i}', slug=f'category-{i}') for i in range(4)
+        ]
+        cls.tags = [Tag.objects.create(name=f'Tag {i}', slug=f'tag-{i}') for i in range(8)]
+        now = timezone.now()
+        cls.posts = []
+        for i in range(40):
+            post = Post.objects.create(
+                title=f'Post {i}',
+                slug=f'post-{i}',
+                content='Body',
+                author=author,
+                category=cls.categories[i % 3],
+                status='draft' if i % 10 == 0 else 'published',
+                published_at=now - timedelta(days=i * 7),
+            )
+            # Tags 0-5 only; the last two are kept for the updates below
+            post.tags.set(rng.sample(cls.tags[:6], rng.randint(0, 3)))
+            cls.posts.append(post)
+        cls.loner = Post.objects.create(
+            title='Loner', slug='loner', content='Body', author=author,
+            category=cls.categories[3], status='published', published_at=now,
+        )
+        related.rebuild_all()
+
+    def edges(self, owners=None):
+        edges = RelatedPost.objects.all()
+        if owners is not None:
+            edges = edges.filter(post_id__in=owners)
+        return {
+            (post_id, related_id, rank, round(score, 4))
+            for post_id, related_id, rank, score in
+            edges.values_list('post_id', 'related_id', 'rank', 'score')
+        }
+
+    def assertMatchesRebuild(self, owners=None):
+        # Visibility changes move the tag weights of every ranking; an update
+        # only recomputes the rankings they reach, so those are compared
+        incremental = self.edges(owners)
+        related.rebuild_all()
+        self.assertEqual(incremental, self.edges(owners))
+
+    def test_scoped_corpus_skips_unrelated_posts(self):
+        post = self.posts[1]
+        corpus = related.graph.load([post.pk])
+        self.assertIn(post.pk, corpus.categories)
+        self.assertNotIn(self.loner.pk, corpus.categories)
+        self.assertEqual(corpus.total, Post.objects.filter(status='published').count())
+
+    def test_tag_change_matches_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[1].tags.set([self.tags[6], self.tags[2]])
+            self.posts[2].tags.add(self.tags[6])
+        self.assertMatchesRebuild()
+
+    def test_category_change_matches_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[3].category = self.categories[3]
+            self.posts[3].save()
+        self.assertMatchesRebuild()
+
+    def test_publish_updates_affected_rankings(self):
+        post = self.posts[10]
+        with self.captureOnCommitCallbacks(execute=True):
+            post.status = 'published'
+            post.save()
+        self.assertTrue(RelatedPost.objects.filter(related=post).exists())
+        self.assertMatchesRebuild(related.graph.affected(post.pk))
+
+    def test_unpublish_updates_affected_rankings(self):
+        post = self.posts[4]
+        affected = related.graph.affected(post.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            post.status = 'archived'
+            post.save()
+        self.assertFalse(RelatedPost.objects.filter(related=post).exists())
+        self.assertMatchesRebuild(affected)
+
+    def test_delete_updates_affected_rankings(self):
+        affected = related.graph.affected(self.posts[5].pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[5].delete()
+        self.assertMatchesRebuild(affected - {self.posts[5].pk})
+
+
+class LegacyExcerptTests(TestCase):
+    """Excerpts generated by the old save() are regenerated, hand-written ones kept"""
+    CONTENT = '## Intro\n\n' + 'Some **bold** words here. ' * 20
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='author')
+        cls.legacy = Post.objects.create(
+            title='Legacy', slug='legacy', content=cls.CONTENT, author=author,
+        )
+        cls.written = Post.objects.create(
+            title='Written', slug='written', content=cls.CONTENT, author=author,
+            excerpt='Written by hand.',
+        )
+        # As left by the old save(): raw Markdown cut at 200 characters, no snippets
+        Post.objects.filter(pk=cls.legacy.pk).update(
+            excerpt=cls.CONTENT[:200] + '...', snippets={},
+        )
+
+    def test_save_regenerates_legacy_excerpt(self):
+        post = Post.objects.get(pk=self.legacy.pk)
+        post.save()
+        self.assertNotIn('**', post.excerpt)
+        self.assertEqual(post.excerpt, post.snippets['excerpt'])
+
+    def test_rerender_posts_picks_up_legacy_excerpts(self):
+        call_command('rerender_posts', model=['post'], workers=1, stdout=StringIO())
+        legacy = Post.objects.get(pk=self.legacy.pk)
+        self.assertEqual(legacy.excerpt, legacy.snippets['excerpt'])
+        self.assertEqual(Post.objects.get(pk=self.written.pk).excerpt, 'Written by hand.')
+
+
+class ScriptedBackend(BaseEmailBackend):
+    """Email backend raising ``ERRORS[address]`` for scripted recipients"""
+    ERRORS = {}
+    sent = []
+
+    def send_messages(self, messages):
+        for message in messages:
+            error = self.ERRORS.get(message.to[0])
+            if error is not None:
+                raise error
+            self.sent.append(message.to[0])
+        return len(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='blog.tests.ScriptedBackend',
+    SITE_URL='https://example.com',
+    NEWSLETTER_RATE_LIMIT=0,
+)
+class NewsletterDeliveryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subscribers = [
+            NewsletterSubscriber.objects.create(email=f'reader{i}@example.com') for i in range(5)
+        ]
+
+    def setUp(self):
+        ScriptedBackend.ERRORS = {}
+        ScriptedBackend.sent = []
+        self.issue = NewsletterIssue.objects.create(subject='Issue', content='Hello')
+
+    def deliver(self):
+        with self.captureOnCommitCallbacks():
+            self.assertTrue(newsletter.start(self.issue))
+        self.issue.refresh_from_db()
+        return newsletter.deliver(self.issue, deadline=float('inf'))
+
+    @override_settings(SITE_URL='https://yourdomain.com')
+    def test_start_refuses_placeholder_site_url(self):
+        with self.assertRaises(ImproperlyConfigured):
+            newsletter.start(self.issue)
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.status, 'draft')
+
+    def test_rejected_message_counted_failed_and_skipped(self):
+        ScriptedBackend.ERRORS = {
+            'reader1@example.com': smtplib.SMTPDataError(554, b'Message rejected'),
+            'reader3@example.com': smtplib.SMTPRecipientsRefused({}),
+        }
+        self.assertTrue(self.deliver())
+        self.issue.refresh_from_db()
+        self.assertEqual((self.issue.sent_count, self.issue.failed_count), (3, 2))
+        self.assertEqual(self.issue.last_subscriber_id, self.subscribers[-1].pk)
+        self.assertEqual(
+            ScriptedBackend.sent, ['reader0@example.com', 'reader2@example.com', 'reader4@example.com'],
+        )
+
+    def test_connection_errors_fail_the_run_at_the_checkpoint(self):
+        for error in (
+            smtplib.SMTPServerDisconnected('Connection unexpectedly closed'),
+            smtplib.SMTPDataError(421, b'Closing connection'),
+            ConnectionResetError(),
+        ):
+            with self.subTest(error=error):
+                ScriptedBackend.ERRORS = {'reader2@example.com': error}
+                ScriptedBackend.sent = []
+                self.issue = NewsletterIssue.objects.create(subject='Issue', content='Hello')
+                with self.assertRaises(type(error)):
+                    self.deliver()
+                self.issue.refresh_from_db()
+                self.assertEqual((self.issue.sent_count, self.issue.failed_count), (2, 0))
+                self.assertEqual(self.issue.last_subscriber_id, self.subscribers[1].pk)
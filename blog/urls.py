@@ -10,5 +10,6 @@ urlpatterns = [
     path('tag/<slug:slug>/', views.TagView.as_view(), name='tag'),
     path('<slug:slug>/', views.PostDetailView.as_view(), name='detail'),
     path('newsletter/subscribe/', views.newsletter_subscribe, name='newsletter_subscribe'),
+    path('newsletter/unsubscribe/<str:token>/', views.newsletter_unsubscribe, name='newsletter_unsubscribe'),
     path('ajax/search/', views.post_search, name='search'),
 ]
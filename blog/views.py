@@ -1,42 +1,69 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView
-from django.db.models import Q
+from django.db.models import Count, Max, Q
 from django.core.paginator import Paginator
+from django.conf import settings
+from django.core import signing
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+from core import neighbours, ratelimit, typeahead
+from core.conditional import ConditionalGetMixin
+from core.counts import CachedCountPaginator
+from core.pagination import KeysetPaginationMixin
+from core.counters import view_counter
+from core.page_cache import add_hit_hook, add_tags, model_tag
+from .analytics import popular_posts, record_post_view
+from .newsletter import read_unsubscribe_token
+from .search import apply_search
 from .models import Category, Tag, Post, Comment, NewsletterSubscriber
 
 
-class PostListView(ListView):
+class PublishedPostsConditionalMixin(ConditionalGetMixin):
+    """Validators cover every published post, since sidebars list them too"""
+    conditional_models = (Category, Tag)
+    
+    def get_validator_queryset(self):
+        return Post.objects.filter(status='published')
+
+
+class PostKeysetMixin(KeysetPaginationMixin):
+    """Cursor pagination in the model's default order, made unique by id"""
+    keyset_ordering = ['-is_featured', '-published_at', '-created_at', 'id']
+    ajax_template_name = 'blog/partials/post_page.html'
+    # Offset mode still shows page numbers; its COUNT(*) goes through the cache
+    paginator_class = CachedCountPaginator
+
+
+class PostListView(PublishedPostsConditionalMixin, PostKeysetMixin, ListView):
     """Blog post list view"""
     model = Post
     template_name = 'blog/post_list.html'
     context_object_name = 'posts'
     paginate_by = 6
+    # Trending widget comes from the daily rollup, not from post rows
+    conditional_period = 3600
     
     def get_queryset(self):
         queryset = Post.objects.filter(
             status='published'
         ).select_related('category', 'author').prefetch_related('tags')
         
-        # Search
+        # Search (ranked full-text search)
         search_query = self.request.GET.get('q')
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(content__icontains=search_query) |
-                Q(excerpt__icontains=search_query) |
-                Q(tags__name__icontains=search_query)
-            ).distinct()
+            queryset = apply_search(queryset, search_query)
         
         return queryset
     
+    def use_keyset(self):
+        # Search results are ordered by relevance, not by the keyset
+        return not self.request.GET.get('q') and super().use_keyset()
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get categories
-        context['categories'] = Category.objects.filter(is_active=True)
-        
-        # Get popular tags
-        context['tags'] = Tag.objects.filter(is_active=True)[:15]
+        # Categories, tags and recent posts are cached sidebar fragments
+        # (blog.fragments)
         
         # Get featured posts
         context['featured_posts'] = Post.objects.filter(
@@ -44,12 +71,10 @@ class PostListView(ListView):
             is_featured=True
         ).select_related('category')[:3]
         
-        # Recent posts for sidebar
-        context['recent_posts'] = Post.objects.filter(
-            status='published'
-        ).exclude(
-            id__in=[p.id for p in context['featured_posts']]
-        )[:5]
+        # Trending posts, read from the daily rollup
+        context['popular_posts'] = popular_posts(
+            days=getattr(settings, 'POPULAR_POSTS_DAYS', 30)
+        )
         
         # Search query
         context['search_query'] = self.request.GET.get('q', '')
@@ -57,44 +82,54 @@ class PostListView(ListView):
         return context
 
 
-class PostDetailView(DetailView):
+def count_post_view(request, post_id):
+    """Buffered view count increment plus analytics capture"""
+    post = Post(pk=post_id)
+    view_counter.incr(post)
+    record_post_view(request, post)
+
+
+class PostDetailView(PublishedPostsConditionalMixin, DetailView):
     """Blog post detail view"""
     model = Post
     template_name = 'blog/post_detail.html'
     context_object_name = 'post'
     slug_url_kwarg = 'slug'
+    conditional_models = (Category, Tag, Comment)
     
     def get_queryset(self):
         return Post.objects.filter(
             status='published'
         ).select_related('category', 'author').prefetch_related('tags', 'comments')
     
+    def get_validator_aggregates(self):
+        this_post = Q(slug=self.kwargs['slug'])
+        return {
+            'current': Max('pk', filter=this_post),
+            'comment_latest': Max('comments__updated_at', filter=this_post),
+            'comment_count': Count('comments', filter=this_post),
+        }
+    
+    def not_modified(self, request, row):
+        count_post_view(request, row['current'])
+    
     def get(self, request, *args, **kwargs):
-        # Increment view count
         response = super().get(request, *args, **kwargs)
-        post = self.get_object()
-        post.views_count += 1
-        post.save(update_fields=['views_count'])
+        if response.status_code == 304:
+            # Counted in not_modified()
+            return response
+        count_post_view(request, self.object.pk)
+        # Keep counting when this page is served from the page cache
+        add_hit_hook(request, 'blog.views.count_post_view', self.object.pk)
         return response
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post = self.get_object()
+        post = self.object
         
-        # Get related posts
+        # Get related posts (precomputed graph)
         context['related_posts'] = post.related_posts[:3]
         
-        # Get categories for sidebar
-        context['categories'] = Category.objects.filter(is_active=True)
-        
-        # Get popular tags
-        context['tags'] = Tag.objects.filter(is_active=True)[:15]
-        
-        # Recent posts for sidebar
-        context['recent_posts'] = Post.objects.filter(
-            status='published'
-        ).exclude(id=post.id)[:5]
-        
         # Approved comments
         context['comments'] = post.comments.filter(
             is_approved=True,
@@ -104,21 +139,13 @@ class PostDetailView(DetailView):
         # Comment form
         context['comment_form'] = None  # Will be added if implementing comments
         
-        # Next and previous posts
-        context['next_post'] = Post.objects.filter(
-            status='published',
-            published_at__gt=post.published_at
-        ).order_by('published_at').first()
-        
-        context['previous_post'] = Post.objects.filter(
-            status='published',
-            published_at__lt=post.published_at
-        ).order_by('-published_at').first()
+        # Next and previous posts (one cached lookup)
+        context['previous_post'], context['next_post'] = neighbours.get(post, self.request)
         
         return context
 
 
-class CategoryView(ListView):
+class CategoryView(PublishedPostsConditionalMixin, PostKeysetMixin, ListView):
     """View posts by category"""
     model = Post
     template_name = 'blog/post_list.html'
@@ -139,13 +166,11 @@ class CategoryView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
-        context['categories'] = Category.objects.filter(is_active=True)
-        context['tags'] = Tag.objects.filter(is_active=True)[:15]
         context['page_title'] = f"Posts in {self.category.name}"
         return context
 
 
-class TagView(ListView):
+class TagView(PublishedPostsConditionalMixin, PostKeysetMixin, ListView):
     """View posts by tag"""
     model = Post
     template_name = 'blog/post_list.html'
@@ -166,13 +191,11 @@ class TagView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['tag'] = self.tag
-        context['categories'] = Category.objects.filter(is_active=True)
-        context['tags'] = Tag.objects.filter(is_active=True)[:15]
         context['page_title'] = f"Posts tagged with #{self.tag.name}"
         return context
 
 
-class FeaturedPostsView(ListView):
+class FeaturedPostsView(PublishedPostsConditionalMixin, PostKeysetMixin, ListView):
     """View featured posts"""
     model = Post
     template_name = 'blog/post_list.html'
@@ -187,13 +210,19 @@ class FeaturedPostsView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.filter(is_active=True)
-        context['tags'] = Tag.objects.filter(is_active=True)[:15]
         context['page_title'] = "Featured Articles"
         context['showing_featured'] = True
         return context
 
 
+def newsletter_limited(request, retry_after):
+    return render(request, 'blog/partials/newsletter_message.html', {
+        'message': 'Too many attempts. Please try again later.',
+        'message_type': 'error'
+    }, status=429)
+
+
+@ratelimit.limit('newsletter', response=newsletter_limited)
 def newsletter_subscribe(request):
     """Handle newsletter subscription"""
     if request.method == 'POST':
@@ -230,24 +259,45 @@ def newsletter_subscribe(request):
     return redirect('blog:list')
 
 
+@never_cache
+@csrf_exempt
+def newsletter_unsubscribe(request, token):
+    """Unsubscribe link from newsletter emails; POST is the RFC 8058 one-click form"""
+    try:
+        subscriber_id = read_unsubscribe_token(token)
+    except signing.BadSignature:
+        return render(request, 'blog/newsletter_unsubscribe.html', {'invalid': True}, status=400)
+    
+    # GET only confirms, so link scanners in mail clients cannot unsubscribe anyone
+    if request.method == 'POST':
+        NewsletterSubscriber.objects.filter(pk=subscriber_id).update(is_active=False)
+        return render(request, 'blog/newsletter_unsubscribe.html', {'unsubscribed': True})
+    return render(request, 'blog/newsletter_unsubscribe.html', {})
+
+
 def post_search(request):
     """AJAX search for posts"""
     query = request.GET.get('q', '')
+    # Results are plain dicts, so the page cache can't collect their tags
+    add_tags(request, model_tag(Post), model_tag(Category))
     
     posts = []
     if query:
-        posts_list = Post.objects.filter(
-            status='published'
-        ).filter(
-            Q(title__icontains=query) |
-            Q(excerpt__icontains=query)
-        )[:5]
+        # In-memory prefix index first, full-text search for the long tail
+        posts = typeahead.lookup('post', query, limit=5)
+    if query and posts is None:
+        posts_list = apply_search(
+            Post.objects.filter(status='published').select_related('category'),
+            query,
+            limit=5
+        )
         
         posts = [{
             'title': p.title,
             'slug': p.slug,
             'featured_image': p.featured_image.url if p.featured_image else None,
             'excerpt': p.excerpt[:100] + '...' if len(p.excerpt) > 100 else p.excerpt,
+            'highlight': p.search_highlight,
             'category': p.category.name if p.category else None,
         } for p in posts_list]
     
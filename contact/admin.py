@@ -1,9 +1,13 @@
 from django.contrib import admin
+from core.counts import EstimatedCountPaginator
 from .models import ContactMessage, ContactInfo, FAQ, SocialLink
 
 
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
+    # Planner estimates instead of COUNT(*) on large tables (PostgreSQL)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_display = [
         'name', 'email', 'subject', 'reason', 
         'status', 'is_important', 'created_at'
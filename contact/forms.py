@@ -107,12 +107,8 @@ class ContactForm(forms.ModelForm):
         if not self.request:
             return None
         
-        x_forwarded_for = self.request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = self.request.META.get('REMOTE_ADDR')
-        return ip
+        from .views import get_client_ip
+        return get_client_ip(self.request)
 
 
 class NewsletterForm(forms.ModelForm):
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from core.tasks import task
+from .models import ContactMessage
+
+
+@task(max_attempts=8)
+def send_notification_email(message_id):
+    """Email the site owner about a new contact message; raises so SMTP errors retry"""
+    message = ContactMessage.objects.filter(pk=message_id).first()
+    if message is None:
+        return
+    subject = f"New Contact Message: {message.subject}"
+    body = f"""
+New contact message received:
+
+From: {message.name} <{message.email}>
+Subject: {message.subject}
+Reason: {message.get_reason_display()}
+
+Message:
+{message.message}
+
+---
+Reply to: {message.email}
+    """
+    
+    send_mail(
+        subject=subject,
+        message=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[settings.CONTACT_EMAIL],
+    )
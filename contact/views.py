@@ -1,13 +1,15 @@
 from django.shortcuts import render, redirect
 from django.views.generic import TemplateView, FormView
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.conf import settings
 from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from core import ratelimit
 from .models import ContactMessage, ContactInfo, FAQ, SocialLink
 from .forms import ContactForm, NewsletterForm, QuickContactForm
+from . import tasks
 
 
+@method_decorator(ratelimit.limit('contact'), name='dispatch')
 class ContactView(FormView):
     """Contact page view with form"""
     template_name = 'contact/contact.html'
@@ -59,35 +61,8 @@ class ContactView(FormView):
         return super().form_invalid(form)
     
     def send_notification_email(self, message):
-        """Send email notification for new contact message"""
-        try:
-            subject = f"New Contact Message: {message.subject}"
-            body = f"""
-New contact message received:
-
-From: {message.name} <{message.email}>
-Subject: {message.subject}
-Reason: {message.get_reason_display()}
-
-Message:
-{message.message}
-
----
-Reply to: {message.email}
-            """
-            
-            send_mail(
-                subject=subject,
-                message=body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[settings.CONTACT_EMAIL],
-                fail_silently=True
-            )
-        except Exception as e:
-            # Log the error but don't fail the form submission
-            import logging
-            logger = logging.getLogger('django')
-            logger.error(f"Failed to send contact notification email: {e}")
+        """Queue the email notification; SMTP runs in the task worker"""
+        tasks.send_notification_email.delay(message.pk)
 
 
 class ContactSuccessView(TemplateView):
@@ -105,6 +80,14 @@ class FAQView(TemplateView):
         return context
 
 
+def quick_contact_limited(request, retry_after):
+    return JsonResponse({
+        'success': False,
+        'message': 'Too many messages. Please try again later.'
+    }, status=429)
+
+
+@ratelimit.limit('contact', response=quick_contact_limited)
 def quick_contact(request):
     """AJAX quick contact form handler"""
     if request.method == 'POST':
@@ -140,10 +123,14 @@ def quick_contact(request):
 
 
 def get_client_ip(request):
-    """Get client IP address from request"""
+    """Get client IP address from request.
+    
+    The first X-Forwarded-For entries are whatever the client sent; only the
+    last one, appended by the proxy in front of the app, can be trusted.
+    """
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
+        ip = x_forwarded_for.split(',')[-1].strip()
     else:
         ip = request.META.get('REMOTE_ADDR')
     return ip
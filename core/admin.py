@@ -0,0 +1,21 @@
+from django.contrib import admin
+from . import tasks
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'updated_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    readonly_fields = [
+        'name', 'args', 'kwargs', 'attempts', 'locked_at', 'locked_by',
+        'last_error', 'created_at', 'updated_at',
+    ]
+    
+    actions = ['retry_tasks']
+    
+    def retry_tasks(self, request, queryset):
+        count = tasks.retry(queryset)
+        self.message_user(request, f"{count} task(s) re-queued.")
+    retry_tasks.short_description = "Retry selected tasks"
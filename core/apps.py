@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    verbose_name = 'Core'
+    
+    def ready(self):
+        from django.core import checks
+        from . import ratelimit, signals
+        checks.register(ratelimit.check_cache)
+        signals.connect()
+        signals.connect_page_cache()
+        signals.connect_neighbours()
+        signals.connect_images()
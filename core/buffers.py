@@ -0,0 +1,86 @@
+"""
+Base class for per-process write-behind buffers.
+
+Subclasses collect work in memory and implement ``flush()``; a daemon thread
+started lazily in each worker process calls it every ``interval`` seconds and
+once more at interpreter exit. Threads are started after gunicorn forks
+(``preload_app``), so each worker owns its own flusher. Call ``wake()`` to
+request an early flush without doing the work on the request thread.
+
+The thread closes its database connection around every flush when it is
+broken or past ``CONN_MAX_AGE``, as Django does around each request, so a
+database restart or failover costs one failed flush instead of every flush
+until the process restarts.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.db import close_old_connections
+
+logger = logging.getLogger('django')
+
+
+class BackgroundFlusher:
+    """Periodically flush an in-memory buffer from a daemon thread"""
+    
+    def __init__(self, name, interval=10):
+        self.name = name
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+    
+    def flush(self):
+        raise NotImplementedError
+    
+    def ensure_started(self):
+        """Start the flusher thread for the current process if needed"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            self._stop = threading.Event()
+            thread = threading.Thread(
+                target=self._run,
+                name=f'{self.name}-flusher',
+                daemon=True,
+            )
+            thread.start()
+            atexit.register(self.safe_flush)
+            self._pid = pid
+    
+    def safe_flush(self):
+        """Flush, logging instead of raising on errors"""
+        try:
+            return self.flush()
+        except Exception as e:
+            logger.error(f"{self.name}: flush failed: {e}")
+            return 0
+    
+    def wake(self):
+        """Ask the flusher thread to flush now"""
+        self._wake.set()
+    
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+    
+    def flush_from_thread(self):
+        """One flush of the flusher thread, on a connection known to be usable"""
+        close_old_connections()
+        try:
+            return self.safe_flush()
+        finally:
+            close_old_connections()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush_from_thread()
@@ -0,0 +1,357 @@
+"""
+Two-tier cache backend: a bounded per-process LRU in front of Redis.
+
+Reads check the in-process tier first and fall back to the shared tier
+(django-redis by default), copying what they find into the LRU. Writes go to
+the shared tier, update this process's LRU and publish the key on a Redis
+pub/sub channel; a subscriber thread in every worker process drops the key
+from its own LRU. Local entries also expire after ``LOCAL_TIMEOUT`` seconds,
+which bounds staleness if an invalidation message is ever missed (the
+subscriber clears the whole LRU whenever it reconnects).
+
+Keys used for coordination (locks, counters that are polled) should skip the
+local tier; they are matched against ``LOCAL_EXCLUDE`` glob patterns.
+
+Configuration::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.TwoTierCache',
+            'LOCATION': 'redis://localhost:6379/0',
+            'OPTIONS': {
+                'LOCAL_MAX_ENTRIES': 5000,
+                'LOCAL_MAX_BYTES': 16 * 1024 * 1024,
+                'LOCAL_TIMEOUT': 5,
+                'SHARED_OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+            },
+        }
+    }
+
+The LRU and the subscriber are per process, shared by every thread's
+backend instance, and recreated after a fork.
+"""
+import fnmatch
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+from . import metrics
+
+logger = logging.getLogger('django')
+
+_MISSING = object()
+
+
+class LocalTier:
+    """Thread-safe LRU of pickled values bounded by entry count, bytes and TTL"""
+
+    def __init__(self, max_entries=5000, max_bytes=16 * 1024 * 1024, timeout=5):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, blob = item
+            if expires <= time.monotonic():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return blob
+
+    def set(self, key, blob, timeout=None):
+        if timeout is None or timeout > self.timeout:
+            timeout = self.timeout
+        if timeout <= 0 or len(blob) > self.max_bytes:
+            self.delete(key)
+            return
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (time.monotonic() + timeout, blob)
+            self._bytes += len(blob)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._pop(oldest)
+                metrics.incr('cache.local.evictions')
+
+    def _pop(self, key):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= len(item[1])
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+            }
+
+
+class Invalidator:
+    """Per-process pub/sub subscriber that drops keys other workers changed"""
+
+    def __init__(self, local, channel):
+        self.local = local
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self.connected = False
+        self._started = False
+        self._lock = threading.Lock()
+
+    def ensure_started(self, client):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            threading.Thread(
+                target=self._run, args=(client,),
+                name='cache-invalidator', daemon=True
+            ).start()
+
+    def publish(self, client, key):
+        try:
+            client.publish(self.channel, f'{self.origin} {key}')
+        except Exception as e:
+            # Other workers fall back to LOCAL_TIMEOUT expiry
+            metrics.incr('cache.invalidation.failed')
+            logger.warning(f"Cache invalidation publish failed: {e}")
+
+    def _run(self, client):
+        while True:
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Messages may have been missed while disconnected
+                self.local.clear()
+                self.connected = True
+                for message in pubsub.listen():
+                    data = message.get('data')
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    origin, _, key = str(data).partition(' ')
+                    if origin == self.origin:
+                        continue
+                    metrics.incr('cache.invalidation.received')
+                    if key == '*':
+                        self.local.clear()
+                    else:
+                        self.local.delete(key)
+            except Exception as e:
+                logger.warning(f"Cache invalidation subscriber reconnecting: {e}")
+            self.connected = False
+            self.local.clear()
+            time.sleep(1)
+
+
+_process_state = {}
+_process_lock = threading.Lock()
+
+
+def _get_process_state(name, options):
+    """Return this process's (LocalTier, Invalidator) for the cache ``name``"""
+    pid = os.getpid()
+    state = _process_state.get(name)
+    if state is not None and state[0] == pid:
+        return state[1], state[2]
+    with _process_lock:
+        state = _process_state.get(name)
+        if state is None or state[0] != pid:
+            local = LocalTier(
+                max_entries=options.get('LOCAL_MAX_ENTRIES', 5000),
+                max_bytes=options.get('LOCAL_MAX_BYTES', 16 * 1024 * 1024),
+                timeout=options.get('LOCAL_TIMEOUT', 5),
+            )
+            invalidator = Invalidator(local, options['CHANNEL'])
+            state = _process_state[name] = (pid, local, invalidator)
+    return state[1], state[2]
+
+
+class TwoTierCache(BaseCache):
+    """Per-process LRU in front of a shared (Redis) cache"""
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        shared_class = import_string(
+            options.get('SHARED_BACKEND', 'django_redis.cache.RedisCache')
+        )
+        self.shared = shared_class(server, {
+            **params,
+            'OPTIONS': options.get('SHARED_OPTIONS', {}),
+        })
+        self.local_exclude = tuple(options.get('LOCAL_EXCLUDE', ('*:lock',)))
+        prefix = params.get('KEY_PREFIX', '')
+        self.local, self.invalidator = _get_process_state(f'{server}|{prefix}', {
+            'CHANNEL': f'cache:{prefix}:invalidate',
+            **options,
+        })
+
+    # Pub/sub needs a raw redis client; other shared backends rely on TTLs
+    def _redis(self):
+        client = getattr(self.shared, 'client', None)
+        if client is None or not hasattr(client, 'get_client'):
+            return None
+        redis = client.get_client(write=True)
+        self.invalidator.ensure_started(redis)
+        return redis
+
+    def _local_key(self, key, version):
+        if any(fnmatch.fnmatchcase(key, pattern) for pattern in self.local_exclude):
+            return None
+        return self.make_key(key, version)
+
+    def _remember(self, local_key, value, timeout=DEFAULT_TIMEOUT):
+        if local_key is None:
+            return
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        # None (forever) is capped at LOCAL_TIMEOUT by the local tier
+        self.local.set(local_key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), timeout)
+
+    def _changed(self, *local_keys):
+        redis = self._redis()
+        for local_key in local_keys:
+            if local_key is None:
+                continue
+            self.local.delete(local_key)
+            if redis is not None:
+                self.invalidator.publish(redis, local_key)
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            blob = self.local.get(local_key)
+            if blob is not None:
+                metrics.incr('cache.local.hit')
+                return pickle.loads(blob)
+            metrics.incr('cache.local.miss')
+        self._redis()
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            metrics.incr('cache.shared.miss')
+            return default
+        metrics.incr('cache.shared.hit')
+        self._remember(local_key, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remaining = []
+        for key in keys:
+            local_key = self._local_key(key, version)
+            blob = self.local.get(local_key) if local_key is not None else None
+            if blob is not None:
+                found[key] = pickle.loads(blob)
+            else:
+                remaining.append(key)
+        if found:
+            metrics.incr('cache.local.hit', len(found))
+        if remaining:
+            metrics.incr('cache.local.miss', len(remaining))
+            self._redis()
+            shared = self.shared.get_many(remaining, version=version)
+            metrics.incr('cache.shared.hit', len(shared))
+            metrics.incr('cache.shared.miss', len(remaining) - len(shared))
+            for key, value in shared.items():
+                self._remember(self._local_key(key, version), value)
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout=timeout, version=version)
+        local_key = self._local_key(key, version)
+        self._changed(local_key)
+        self._remember(local_key, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout=timeout, version=version)
+        for key, value in data.items():
+            local_key = self._local_key(key, version)
+            self._changed(local_key)
+            if key not in (failed or ()):
+                self._remember(local_key, value, timeout)
+        return failed or []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._changed(self._local_key(key, version))
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        deleted = self.shared.delete(key, version=version)
+        self._changed(self._local_key(key, version))
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        self.shared.delete_many(keys, version=version)
+        self._changed(*(self._local_key(key, version) for key in keys))
+
+    def has_key(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None and self.local.get(local_key) is not None:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        self._changed(self._local_key(key, version))
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        self.shared.clear()
+        self.local.clear()
+        redis = self._redis()
+        if redis is not None:
+            self.invalidator.publish(redis, '*')
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    def stats(self):
+        """Per-tier counters and local memory use for the metrics endpoint"""
+        return {
+            'local': {
+                **self.local.stats(),
+                'hit_rate': metrics.ratio('cache.local.hit', 'cache.local.miss'),
+            },
+            'shared': {
+                'hit_rate': metrics.ratio('cache.shared.hit', 'cache.shared.miss'),
+            },
+            'invalidation': {
+                'subscribed': self.invalidator.connected,
+                'channel': self.invalidator.channel,
+            },
+        }
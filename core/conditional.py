@@ -0,0 +1,175 @@
+"""
+Conditional GET (ETag / Last-Modified) for content views.
+
+Validators come from one aggregate query over everything a page shows (the
+latest ``updated_at`` and the row count) plus the page cache's tag versions
+for what that query can't see: models without timestamps (categories, tags,
+technologies and the site chrome) and rows leaving the list (deletes,
+unpublishing). A tag version is the time of the tag's last change, so it
+moves ``Last-Modified`` as well as the ETag. When the client already holds
+the current version the view answers 304 before any template work.
+
+Tag versions are only shared between workers with a shared cache, so this is
+off unless ``CONDITIONAL_GET_ENABLED`` (on by default with Redis). Only
+anonymous requests without pending flash messages are handled; anything
+personalised renders normally.
+"""
+import hashlib
+import time
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Count, Max, Subquery
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+from . import metrics, page_cache
+
+
+def is_conditional_request(request):
+    if not getattr(settings, 'CONDITIONAL_GET_ENABLED', False):
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return False
+    return 'messages' not in request.COOKIES
+
+
+def latest_of(queryset, field='updated_at'):
+    """Aggregate for ``compute_validators``: latest ``field`` of another queryset"""
+    return Max(Subquery(queryset.order_by(f'-{field}').values(field)[:1]))
+
+
+def compute_validators(queryset, models=(), period=None, **aggregates):
+    """Return (etag, last_modified, row) from a single aggregate over ``queryset``.
+
+    ``models`` adds the change versions of models without ``updated_at``;
+    ``period`` (seconds) expires the ETag for content derived from time,
+    such as trending widgets.
+    """
+    row = queryset.order_by().aggregate(
+        latest=Max('updated_at'),
+        count=Count('pk', distinct=True),
+        **aggregates
+    )
+    versions = page_cache.get_tag_versions(
+        ['site', page_cache.list_tag(queryset.model)]
+        + [page_cache.model_tag(model) for model in models]
+    )
+    parts = [getattr(settings, 'CONDITIONAL_GET_VERSION', '')]
+    parts += [f'{key}={row[key]}' for key in sorted(row)]
+    parts += [f'{tag}={versions[tag]}' for tag in sorted(versions)]
+    if period:
+        parts.append(f'period={int(time.time() // period)}')
+    etag = '"%s"' % hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+    timestamps = [value.timestamp() for value in row.values() if isinstance(value, datetime)]
+    timestamps += [version / 1e9 for version in versions.values()]
+    last_modified = int(max(timestamps))
+    return etag, last_modified, row
+
+
+def set_validators(response, etag, last_modified):
+    if response.status_code != 200:
+        return response
+    if etag and not response.has_header('ETag'):
+        response['ETag'] = etag
+    if last_modified and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(last_modified)
+    # Revalidate every time rather than trusting heuristic freshness
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def record(name, not_modified):
+    outcome = 'not_modified' if not_modified else 'modified'
+    metrics.incr(f'conditional.{outcome}')
+    metrics.incr(f'conditional.{name}.{outcome}')
+
+
+def check(request, etag, last_modified, name):
+    """Return a 304 response if the client's copy is current, else None"""
+    headers = set_validators(HttpResponse(), etag, last_modified)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=headers
+    )
+    not_modified = response is not headers
+    record(name, not_modified)
+    return response if not_modified else None
+
+
+def revalidate(request, response, name):
+    """Apply the validators already on ``response`` (e.g. a page cache hit)"""
+    if not is_conditional_request(request):
+        return response
+    etag = response.get('ETag')
+    last_modified = parse_http_date_safe(response.get('Last-Modified', ''))
+    if not etag and not last_modified:
+        return response
+    result = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response
+    )
+    record(name, result is not response)
+    return result
+
+
+class ConditionalGetMixin:
+    """Answer conditional GETs from validators computed before rendering.
+
+    Subclasses describe what the page shows with ``get_validator_queryset``
+    (rows with ``updated_at``), ``conditional_models`` (models without it)
+    and ``get_validator_aggregates``. An aggregate named ``current`` that
+    comes back NULL (the requested object does not exist) skips conditional
+    handling so the view can raise its 404.
+    """
+    conditional_models = ()
+    conditional_period = None
+
+    def get_validator_queryset(self):
+        return self.get_queryset()
+
+    def get_validator_aggregates(self):
+        return {}
+
+    def not_modified(self, request, row):
+        """Hook for side effects that must still happen on a 304"""
+
+    def get(self, request, *args, **kwargs):
+        if not is_conditional_request(request):
+            return super().get(request, *args, **kwargs)
+
+        etag, last_modified, row = compute_validators(
+            self.get_validator_queryset(),
+            models=self.conditional_models,
+            period=self.conditional_period,
+            **self.get_validator_aggregates()
+        )
+        if row.get('current', True) is None:
+            return super().get(request, *args, **kwargs)
+
+        response = check(request, etag, last_modified, type(self).__name__)
+        if response is not None:
+            self.not_modified(request, row)
+            return response
+        return set_validators(super().get(request, *args, **kwargs), etag, last_modified)
+
+
+def conditional_page(validators_func, name):
+    """Decorator for function views; ``validators_func(request, *args, **kwargs)``
+    returns (etag, last_modified, row) like ``compute_validators``"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_conditional_request(request):
+                return view(request, *args, **kwargs)
+            etag, last_modified, _row = validators_func(request, *args, **kwargs)
+            response = check(request, etag, last_modified, name)
+            if response is not None:
+                return response
+            return set_validators(view(request, *args, **kwargs), etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,150 @@
+"""
+Cheaper row counts.
+
+* ``cached_count`` / ``CachedCountPaginator``: exact counts for public
+  listings, cached under the change versions of every model the query
+  touches (the ``model:<label>`` tags bumped by the page cache signals), so
+  any write through the ORM invalidates them. Bulk writes that bypass
+  signals are bounded by ``COUNT_CACHE_TIMEOUT``.
+* ``estimated_count`` / ``EstimatedCountPaginator``: planner estimates on
+  PostgreSQL (``pg_class.reltuples`` for whole tables, ``EXPLAIN`` row
+  estimates for filtered changelists). Above ``ESTIMATED_COUNT_THRESHOLD``
+  rows the estimate is used instead of scanning; below it, and on other
+  databases, counts are exact. The admin shows an estimated count as
+  ``~N``, and a page number past the estimated end serves the last page
+  rather than an error.
+"""
+import hashlib
+import json
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from . import metrics, page_cache, stampede
+
+
+@lru_cache(maxsize=None)
+def _models_by_table():
+    tables = {}
+    for model in apps.get_models(include_auto_created=True):
+        if model._meta.auto_created:
+            # m2m through tables change with either side's m2m_changed
+            tables[model._meta.db_table] = [
+                field.related_model for field in model._meta.fields if field.is_relation
+            ]
+        else:
+            tables[model._meta.db_table] = [model]
+    return tables
+
+
+def query_models(queryset):
+    """Models whose tables appear in ``queryset``'s FROM/JOIN clauses"""
+    tables = _models_by_table()
+    models = {queryset.model}
+    for alias in queryset.query.alias_map.values():
+        models.update(tables.get(alias.table_name, ()))
+    return models
+
+
+def cached_count(queryset):
+    """Exact ``queryset.count()``, cached until a model it touches changes"""
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    tags = sorted(page_cache.model_tag(model) for model in query_models(queryset))
+    versions = page_cache.get_tag_versions(tags)
+    raw = repr((queryset.db, sql, params, sorted(versions.items())))
+    key = f'count:{hashlib.sha1(raw.encode()).hexdigest()}'
+    built = []
+
+    def count():
+        built.append(True)
+        return queryset.count()
+
+    result = stampede.get_or_set(
+        key, count, getattr(settings, 'COUNT_CACHE_TIMEOUT', 300)
+    )
+    metrics.incr(f'counts.cached.{"miss" if built else "hit"}')
+    return result
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator whose COUNT(*) goes through ``cached_count``"""
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            return cached_count(self.object_list)
+        return super().count
+
+
+def _table_estimate(queryset):
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # reltuples is -1 until the table has been analyzed
+    return row[0] if row and row[0] >= 0 else None
+
+
+def _plan_estimate(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimated_count(queryset, threshold=None):
+    """Return (count, is_estimate) for ``queryset``"""
+    if threshold is None:
+        threshold = getattr(settings, 'ESTIMATED_COUNT_THRESHOLD', 100000)
+    if connections[queryset.db].vendor == 'postgresql':
+        try:
+            if queryset.query.where:
+                estimate = _plan_estimate(queryset)
+            else:
+                estimate = _table_estimate(queryset)
+        except EmptyResultSet:
+            return 0, False
+        if estimate is not None and estimate > threshold:
+            metrics.incr('counts.estimated')
+            return estimate, True
+    return queryset.count(), False
+
+
+class EstimatedCountPaginator(Paginator):
+    """Admin paginator that uses planner estimates for large result sets.
+
+    Use with ``show_full_result_count = False`` so the changelist does not
+    count the unfiltered table separately.
+    """
+
+    is_estimate = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        count, self.is_estimate = estimated_count(self.object_list)
+        return count
+
+    def validate_number(self, number):
+        # Estimates move between requests; a stale page link is not an error
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.is_estimate or int(number) < 1:
+                raise
+            return self.num_pages
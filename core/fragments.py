@@ -0,0 +1,57 @@
+"""
+Versioned template fragment cache.
+
+A fragment is a partial template plus the function that queries its data.
+Its cache key includes the current versions of the tags it depends on (the
+same tag versions the page cache uses, e.g. ``model:blog.category``), so a
+change bumps the version and the next render misses. A hit costs one cache
+round trip and no SQL: the queries only run inside the rebuild, which is
+single-flight through ``core.stampede``.
+
+Pages rendering a fragment inherit its tags, so the full-page cache is
+purged along with it.
+
+Without a shared cache each worker would only see its own invalidations, so
+fragments render live unless ``FRAGMENT_CACHE_ENABLED`` (on by default with
+Redis).
+"""
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from . import metrics, page_cache, stampede
+
+
+def render(name, template_name, get_context, tags, vary=(), request=None):
+    """Render ``template_name`` with ``get_context()``, cached per tag versions.
+
+    ``vary`` holds extra values the output depends on (e.g. the active
+    filter); ``request`` lets the page cache pick up the fragment's tags.
+    """
+    if request is not None:
+        page_cache.add_tags(request, *tags)
+    if not getattr(settings, 'FRAGMENT_CACHE_ENABLED', False):
+        return mark_safe(render_to_string(template_name, get_context()))
+
+    versions = page_cache.get_tag_versions(tags)
+    raw = repr((sorted(versions.items()), tuple(vary)))
+    key = f'fragment:{name}:{hashlib.sha1(raw.encode()).hexdigest()}'
+    built = []
+
+    def build():
+        built.append(True)
+        return render_to_string(template_name, get_context())
+
+    html = stampede.get_or_set(
+        key, build, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60)
+    )
+    metrics.incr(f'fragment.{"miss" if built else "hit"}')
+    return mark_safe(html)
+
+
+def invalidate(*tags):
+    """Bump ``tags`` once the current transaction commits"""
+    transaction.on_commit(lambda: page_cache.invalidate_tags(*tags))
@@ -0,0 +1,213 @@
+"""
+Responsive image variants.
+
+Uploads in ``IMAGE_FIELDS`` are resized with Pillow into the width buckets
+in ``IMAGE_VARIANT_WIDTHS`` and encoded as AVIF and WebP (when this Pillow
+build supports them) plus a JPEG fallback, or PNG for images with
+transparency. Variants are written through the field's storage next to the
+originals, under a directory named by the SHA-256 of the original bytes and
+the pipeline settings. Regenerating the same upload is therefore a no-op, and
+identical uploads share one set of files.
+
+Each original's manifest (``core.models.ResponsiveImage``) is cached by
+name. The ``responsive_image`` template tag reads it to emit ``<picture>``
+with ``srcset``/``sizes``, and falls back to the original until the variants
+exist.
+
+Generation is queued as a background task (``core.tasks``) with the
+upload's transaction, so it never runs on the request thread, and failures are
+retried. ``manage.py generate_image_variants`` backfills existing uploads.
+"""
+import hashlib
+import io
+import json
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+from . import metrics, page_cache
+from .tasks import task
+
+PIPELINE_VERSION = 1
+
+# Image fields that get variants, by model label
+IMAGE_FIELDS = {
+    'blog.Post': ['featured_image'],
+    'projects.Project': ['thumbnail'],
+    'projects.ProjectImage': ['image'],
+    'home.Testimonial': ['photo'],
+    'home.PersonalInfo': ['profile_photo'],
+}
+
+# format: (Pillow format, MIME type, file extension, save options)
+FORMATS = {
+    'avif': ('AVIF', 'image/avif', 'avif', {'quality': 55}),
+    'webp': ('WEBP', 'image/webp', 'webp', {'quality': 78, 'method': 4}),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'png': ('PNG', 'image/png', 'png', {'optimize': True}),
+}
+
+VARIANT_ROOT = 'variants'
+
+MANIFEST_TIMEOUT = 60 * 60 * 24
+# Pending originals are looked up again soon, so new variants show up quickly
+MISSING_TIMEOUT = 60
+
+
+def get_widths():
+    return sorted(getattr(settings, 'IMAGE_VARIANT_WIDTHS', [320, 640, 960, 1280, 1920]))
+
+
+def get_formats(has_alpha):
+    """Modern formats this Pillow build can encode, then the fallback"""
+    modern = [
+        name for name in getattr(settings, 'IMAGE_VARIANT_FORMATS', ['avif', 'webp'])
+        if features.check(name)
+    ]
+    return modern + ['png' if has_alpha else 'jpeg']
+
+
+def _signature():
+    """Pipeline settings that change the generated files"""
+    return json.dumps([
+        PIPELINE_VERSION,
+        get_widths(),
+        get_formats(False),
+        {name: options for name, (_f, _m, _e, options) in FORMATS.items()},
+    ]).encode()
+
+
+def manifest_key(name):
+    return f'images:{hashlib.sha1(name.encode()).hexdigest()}'
+
+
+def get_manifest(name):
+    """Return {'width', 'height', 'variants'} for ``name``, or None while pending"""
+    from .models import ResponsiveImage
+    key = manifest_key(name)
+    manifest = cache.get(key)
+    if manifest is None:
+        row = ResponsiveImage.objects.filter(name=name).values(
+            'width', 'height', 'variants'
+        ).first()
+        manifest = row or False
+        cache.set(key, manifest, MANIFEST_TIMEOUT if row else MISSING_TIMEOUT)
+    return manifest or None
+
+
+def _target_widths(width):
+    widths = get_widths()
+    targets = {w for w in widths if w < width}
+    targets.add(min(width, widths[-1]))
+    return sorted(targets)
+
+
+def _encode(image, format_name):
+    pil_format, _mime, _ext, options = FORMATS[format_name]
+    if format_name == 'jpeg' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def _render_variants(storage, data, directory, force):
+    image = Image.open(io.BytesIO(data))
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    width, height = image.size
+
+    variants = {}
+    for target in _target_widths(width):
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.LANCZOS
+        )
+        for format_name in get_formats(has_alpha):
+            name = f'{directory}/{target}w.{FORMATS[format_name][2]}'
+            if force or not storage.exists(name):
+                if force and storage.exists(name):
+                    storage.delete(name)
+                name = storage.save(name, _encode(resized, format_name))
+                metrics.incr('images.variants.encoded')
+            variants.setdefault(format_name, []).append([target, name])
+    return width, height, variants
+
+
+def generate(storage, name, force=False):
+    """Create the variants for the original ``name``; return its manifest row"""
+    from .models import ResponsiveImage
+    with storage.open(name, 'rb') as original:
+        data = original.read()
+    digest = hashlib.sha256(data)
+    digest.update(_signature())
+    content_hash = digest.hexdigest()
+
+    existing = ResponsiveImage.objects.filter(name=name).first()
+    if existing is not None and existing.content_hash == content_hash and not force:
+        return existing
+    # The same bytes uploaded under another name already have variants
+    twin = None if force else (
+        ResponsiveImage.objects.filter(content_hash=content_hash).exclude(name=name).first()
+    )
+    if twin is not None:
+        width, height, variants = twin.width, twin.height, twin.variants
+    else:
+        directory = f'{VARIANT_ROOT}/{content_hash[:2]}/{content_hash}'
+        width, height, variants = _render_variants(storage, data, directory, force)
+
+    row, _created = ResponsiveImage.objects.update_or_create(name=name, defaults={
+        'content_hash': content_hash,
+        'width': width,
+        'height': height,
+        'variants': variants,
+    })
+    cache.set(
+        manifest_key(name),
+        {'width': width, 'height': height, 'variants': variants},
+        MANIFEST_TIMEOUT,
+    )
+    metrics.incr('images.generated')
+    return row
+
+
+def generate_for(instance, field_names, force=False):
+    """Generate variants for ``instance``'s images; return how many were processed"""
+    done = 0
+    for field_name in field_names:
+        image = getattr(instance, field_name)
+        if image:
+            generate(image.storage, image.name, force=force)
+            done += 1
+    if done:
+        # Cached pages still point at the originals
+        tags = [page_cache.obj_tag(instance), page_cache.model_tag(type(instance))]
+        if instance._meta.label in page_cache.SITE_WIDE_MODELS:
+            tags.append('site')
+        page_cache.invalidate_tags(*tags)
+    return done
+
+
+def pending_fields(instance):
+    """Image fields of ``instance`` whose current file has no variants yet"""
+    return [
+        field_name for field_name in IMAGE_FIELDS[instance._meta.label]
+        if getattr(instance, field_name) and get_manifest(getattr(instance, field_name).name) is None
+    ]
+
+
+@task
+def generate_variants(label, pk, field_names):
+    instance = apps.get_model(label)._default_manager.filter(pk=pk).first()
+    if instance is not None:
+        generate_for(instance, field_names)
+
+
+def schedule(instance, field_names):
+    """Queue variant generation for ``instance``'s ``field_names``"""
+    generate_variants.delay(instance._meta.label, instance.pk, list(field_names))
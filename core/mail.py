@@ -0,0 +1,180 @@
+"""
+SMTP backend that keeps connections open between messages.
+
+Django's SMTP backend connects, runs STARTTLS, logs in and quits for every
+``send_mail`` call. ``EmailBackend`` here returns the connection to a
+per-process pool on ``close()`` instead, and the next backend instance
+(the next ``send_mail``, or the next task in the same worker) checks it out
+again. A batch passed to ``send_messages`` goes through one connection, as
+with the stock backend.
+
+A pooled connection idle for more than ``EMAIL_POOL_HEALTH_CHECK`` seconds is
+probed with NOOP before it is handed out, and one older than
+``EMAIL_POOL_MAX_AGE`` is quit rather than reused. When the server drops the
+connection mid-send (disconnect or a 421 reply), the message is retried once
+on a fresh connection. At most ``EMAIL_POOL_SIZE`` idle connections are kept
+per server. The pool belongs to one process: a forked child starts empty.
+"""
+import atexit
+import os
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail.backends import smtp
+from django.core.mail.message import sanitize_address
+
+from . import metrics
+
+_lock = threading.Lock()
+_pool = {}
+_pool_pid = os.getpid()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _quit(connection):
+    try:
+        connection.quit()
+    except (smtplib.SMTPException, OSError):
+        connection.close()
+
+
+def _checkout(key):
+    """Pop an idle connection for ``key``: (connection, opened_at) or None"""
+    global _pool, _pool_pid
+    with _lock:
+        if _pool_pid != os.getpid():
+            # The parent's sockets are not ours to use or to quit
+            _pool, _pool_pid = {}, os.getpid()
+        idle = _pool.get(key)
+        entry = idle.pop() if idle else None
+    if entry is None:
+        return None
+    connection, opened_at, last_used = entry
+    now = time.monotonic()
+    if now - opened_at > _setting('EMAIL_POOL_MAX_AGE', 300):
+        _quit(connection)
+        metrics.incr('mail.connections.expired')
+        return _checkout(key)
+    if now - last_used > _setting('EMAIL_POOL_HEALTH_CHECK', 15):
+        try:
+            healthy = connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            healthy = False
+        if not healthy:
+            connection.close()
+            metrics.incr('mail.connections.unhealthy')
+            return _checkout(key)
+    return connection, opened_at
+
+
+def _checkin(key, connection, opened_at):
+    with _lock:
+        if _pool_pid == os.getpid():
+            idle = _pool.setdefault(key, [])
+            if len(idle) < _setting('EMAIL_POOL_SIZE', 2):
+                idle.append((connection, opened_at, time.monotonic()))
+                return
+    _quit(connection)
+
+
+def close_pool():
+    """Quit every idle pooled connection of this process"""
+    with _lock:
+        idle = [entry for entries in _pool.values() for entry in entries]
+        _pool.clear()
+        mine = _pool_pid == os.getpid()
+    if mine:
+        for connection, _opened_at, _last_used in idle:
+            _quit(connection)
+
+
+atexit.register(close_pool)
+
+
+def is_connection_error(error):
+    """The server dropped, or is about to drop, the connection"""
+    return isinstance(error, smtplib.SMTPServerDisconnected) or (
+        isinstance(error, smtplib.SMTPResponseException) and error.smtp_code == 421
+    )
+
+
+class EmailBackend(smtp.EmailBackend):
+    """``django.core.mail.backends.smtp.EmailBackend`` with pooled connections"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened_at = None
+
+    @property
+    def pool_key(self):
+        return (
+            self.host, self.port, self.username, self.password,
+            self.use_tls, self.use_ssl, self.ssl_certfile, self.ssl_keyfile,
+        )
+
+    def open(self):
+        if self.connection:
+            return False
+        pooled = _checkout(self.pool_key)
+        if pooled is not None:
+            self.connection, self.opened_at = pooled
+            metrics.incr('mail.connections.reused')
+            # True: whoever opened it closes it, which hands it back
+            return True
+        return self._connect()
+
+    def _connect(self):
+        self.connection = None
+        opened = super().open()
+        if opened:
+            self.opened_at = time.monotonic()
+            metrics.incr('mail.connections.opened')
+        return opened
+
+    def close(self):
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        if connection.sock is None:
+            # Closed after a failed send
+            return
+        _checkin(self.pool_key, connection, self.opened_at)
+
+    def _send(self, email_message):
+        if self.connection is None or not email_message.recipients():
+            return False
+        encoding = email_message.encoding or settings.DEFAULT_CHARSET
+        from_email = sanitize_address(email_message.from_email, encoding)
+        recipients = [
+            sanitize_address(addr, encoding) for addr in email_message.recipients()
+        ]
+        message = email_message.message().as_bytes(linesep='\r\n')
+        for attempt in (1, 2):
+            try:
+                self.connection.sendmail(from_email, recipients, message)
+                metrics.incr('mail.sent')
+                return True
+            except smtplib.SMTPException as e:
+                if not is_connection_error(e):
+                    if not self.fail_silently:
+                        raise
+                    return False
+                self.connection.close()
+                if attempt == 2 or not self._reconnect():
+                    if not self.fail_silently:
+                        raise
+                    return False
+
+    def _reconnect(self):
+        metrics.incr('mail.reconnects')
+        try:
+            return bool(self._connect())
+        except OSError:
+            if not self.fail_silently:
+                raise
+            return False
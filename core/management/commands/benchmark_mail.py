@@ -0,0 +1,81 @@
+import statistics
+import time
+
+from django.core.mail import EmailMessage
+from django.core.mail.backends import smtp
+from django.core.management.base import BaseCommand, CommandError
+
+from core import mail, metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Send messages one send_mail-style call at a time through Django's SMTP "
+        "backend and through core.mail's pooled backend, and compare latency and "
+        "connections opened. Point it at a local stand-in, e.g. "
+        "'python -m aiosmtpd -n -l localhost:1025'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument('--port', type=int, default=1025)
+        parser.add_argument('--tls', action='store_true', help="Use STARTTLS")
+        parser.add_argument('--messages', type=int, default=50)
+        parser.add_argument('--max-ms', type=float,
+                            help="Fail when a pooled send averages slower than this")
+
+    def handle(self, *args, **options):
+        if options['messages'] < 1:
+            raise CommandError("--messages must be positive")
+        connection_options = {
+            'host': options['host'],
+            'port': options['port'],
+            'username': '',
+            'password': '',
+            'use_tls': options['tls'],
+            'timeout': 10,
+        }
+
+        def run(backend_class):
+            timings = []
+            for i in range(options['messages']):
+                message = EmailMessage(
+                    f"Benchmark {i}", "Pooled SMTP benchmark",
+                    'benchmark@example.com', ['inbox@example.com'],
+                )
+                started = time.perf_counter()
+                # A new backend per message, as send_mail() does
+                backend_class(**connection_options).send_messages([message])
+                timings.append((time.perf_counter() - started) * 1000)
+            return timings
+
+        mail.close_pool()
+        try:
+            stock = run(smtp.EmailBackend)
+            opened = metrics.get('mail.connections.opened')
+            pooled = run(mail.EmailBackend)
+            opened = metrics.get('mail.connections.opened') - opened
+        except OSError as e:
+            raise CommandError(f"Cannot reach {options['host']}:{options['port']}: {e}")
+        finally:
+            mail.close_pool()
+
+        for label, timings, connections in (
+            ('stock', stock, len(stock)),
+            ('pooled', pooled, opened),
+        ):
+            p95 = sorted(timings)[int(len(timings) * 0.95) - 1] if len(timings) > 1 else timings[0]
+            self.stdout.write(
+                f"{label:<7} mean {statistics.mean(timings):7.2f} ms   "
+                f"p95 {p95:7.2f} ms   connections {connections}"
+            )
+        speedup = statistics.mean(stock) / statistics.mean(pooled)
+        self.stdout.write(f"speedup {speedup:.1f}x")
+
+        if opened != 1:
+            raise CommandError(f"Pooled backend opened {opened} connections, expected 1")
+        if options['max_ms'] is not None and statistics.mean(pooled) > options['max_ms']:
+            raise CommandError(
+                f"Pooled sends averaged {statistics.mean(pooled):.2f} ms, over {options['max_ms']} ms"
+            )
+        self.stdout.write(self.style.SUCCESS("OK: one connection served every message"))
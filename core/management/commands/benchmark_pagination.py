@@ -0,0 +1,113 @@
+import statistics
+import time
+
+from django.core.paginator import Paginator
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.pagination import KeysetPaginator
+
+
+def post_queryset():
+    from blog.models import Post
+    return Post.objects.filter(status='published'), ['-is_featured', '-published_at', '-created_at', 'id']
+
+
+def project_queryset():
+    from projects.models import Project
+    return Project.objects.filter(is_published=True), ['-featured', '-created_at', '-id']
+
+
+def seed_posts(count):
+    from django.contrib.auth.models import User
+    from blog.models import Post
+    author = User.objects.order_by('pk').first() or User.objects.create(username='benchmark')
+    now = timezone.now()
+    Post.objects.bulk_create([
+        Post(
+            title=f'Benchmark post {i}', slug=f'benchmark-post-{i}', author=author,
+            excerpt='Benchmark', content='Benchmark', status='published',
+            is_featured=i % 50 == 0, published_at=now - timezone.timedelta(minutes=i),
+        )
+        for i in range(count)
+    ], batch_size=1000)
+
+
+def seed_projects(count):
+    from projects.models import Project
+    Project.objects.bulk_create([
+        Project(
+            title=f'Benchmark project {i}', slug=f'benchmark-project-{i}',
+            description='Benchmark', content='Benchmark', is_published=True,
+            featured=1 if i % 50 == 0 else 0,
+        )
+        for i in range(count)
+    ], batch_size=1000)
+
+
+TARGETS = {
+    'post': (post_queryset, seed_posts, 6),
+    'project': (project_queryset, seed_projects, 9),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare offset (Paginator) and keyset (cursor) pagination latency for "
+        "page 1 and a deep page. --seed adds synthetic rows inside a transaction "
+        "that is rolled back afterwards."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=sorted(TARGETS), default='post')
+        parser.add_argument('--page', type=int, default=500, help="Deep page to measure")
+        parser.add_argument('--per-page', type=int)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Synthetic rows to add for the run (rolled back)")
+    
+    def handle(self, *args, **options):
+        get_queryset, seed, per_page = TARGETS[options['model']]
+        per_page = options['per_page'] or per_page
+        with transaction.atomic():
+            if options['seed']:
+                seed(options['seed'])
+            self.run(get_queryset, per_page, options['page'], options['repeat'])
+            transaction.set_rollback(True)
+    
+    def run(self, get_queryset, per_page, deep_page, repeat):
+        queryset, keys = get_queryset()
+        total = queryset.count()
+        deep_page = min(deep_page, max(1, -(-total // per_page)))
+        self.stdout.write(f"rows: {total}, per page: {per_page}, deep page: {deep_page}")
+        
+        # Walk the cursors up to the deep page (not timed)
+        paginator = KeysetPaginator(queryset, keys, per_page)
+        cursors = {1: None}
+        cursor = None
+        for number in range(1, deep_page):
+            cursor = paginator.page(cursor).next_cursor
+            if cursor is None:
+                break
+            cursors[number + 1] = cursor
+        deep_page = max(cursors)
+        
+        def offset(number):
+            # Paginator.page() runs COUNT(*); listing the page runs OFFSET
+            list(Paginator(queryset.order_by(*keys), per_page).page(number).object_list)
+        
+        def keyset(number):
+            list(paginator.page(cursors[number]).object_list)
+        
+        for label, fetch in (('offset', offset), ('keyset', keyset)):
+            for number in (1, deep_page):
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    fetch(number)
+                    timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(
+                    f"{label:<7} page {number:<5} "
+                    f"median={statistics.median(timings):.2f} ms  max={max(timings):.2f} ms"
+                )
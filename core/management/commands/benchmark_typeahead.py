@@ -0,0 +1,65 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.typeahead import PrefixIndex
+
+WORDS = (
+    'django python orm query cache redis postgres index search template view model '
+    'form admin signal middleware async celery docker deploy gunicorn nginx api rest '
+    'graphql auth token session migration test fixture pagination keyset htmx static '
+    'storage image upload email queue worker performance scaling profiling logging'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark the typeahead prefix index on synthetic documents: "
+        "build time, node count and per-keystroke lookup latency."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--docs', type=int, default=10000)
+        parser.add_argument('--queries', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=42)
+    
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        titles = [
+            ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))) + f' part {i}'
+            for i in range(options['docs'])
+        ]
+        
+        index = PrefixIndex()
+        started = time.perf_counter()
+        for i, title in enumerate(titles):
+            index.add(i, {'title': title}, title)
+        build = time.perf_counter() - started
+        
+        # Simulate typing: every prefix of one or two words from real titles
+        keystrokes = []
+        for _ in range(options['queries']):
+            words = rng.choice(titles).split()[:rng.randint(1, 2)]
+            text = ' '.join(words)
+            keystrokes.extend(text[:n] for n in range(1, len(text) + 1))
+        
+        timings = []
+        for query in keystrokes:
+            t0 = time.perf_counter()
+            index.search(query, 5)
+            timings.append((time.perf_counter() - t0) * 1e6)
+        timings.sort()
+        
+        def pct(p):
+            return timings[min(len(timings) - 1, int(len(timings) * p))]
+        
+        self.stdout.write(f"documents:   {len(titles)}")
+        self.stdout.write(f"trie nodes:  {index.nodes} (complete={index.complete})")
+        self.stdout.write(f"build time:  {build * 1000:.1f} ms")
+        self.stdout.write(f"keystrokes:  {len(timings)}")
+        self.stdout.write(
+            f"latency us:  mean={statistics.mean(timings):.1f} "
+            f"p50={pct(0.5):.1f} p95={pct(0.95):.1f} p99={pct(0.99):.1f} max={timings[-1]:.1f}"
+        )
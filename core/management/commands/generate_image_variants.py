@@ -0,0 +1,57 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import images
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate responsive image variants for existing uploads. Originals "
+        "whose content hash already has variants are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', dest='models', action='append', choices=sorted(images.IMAGE_FIELDS),
+            help="Only process this model (repeatable)",
+        )
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Re-encode every variant, even when its hash is current",
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError("--workers must be positive")
+
+        def run(instance, field_names):
+            try:
+                return images.generate_for(instance, field_names, force=options['force'])
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for label in options['models'] or list(images.IMAGE_FIELDS):
+                field_names = images.IMAGE_FIELDS[label]
+                started = time.perf_counter()
+                queryset = apps.get_model(label)._default_manager.only('pk', *field_names)
+                futures = [
+                    executor.submit(run, instance, field_names)
+                    for instance in queryset.iterator()
+                ]
+                processed = failed = 0
+                for future in futures:
+                    try:
+                        processed += future.result()
+                    except Exception as e:
+                        failed += 1
+                        self.stderr.write(f"{label}: {e}")
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label}: {processed} image(s), {failed} failed ({elapsed:.1f}s)"
+                )
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import search
+from core.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = "Rebuild the site-wide search index, streaming each model in chunks."
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', dest='doc_types', action='append',
+            choices=sorted(search.SOURCES),
+            help="Only rebuild this document type (repeatable)",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help="Rows fetched and written per batch",
+        )
+    
+    def handle(self, *args, **options):
+        doc_types = options['doc_types'] or list(search.SOURCES)
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be positive")
+        
+        for doc_type in doc_types:
+            source = search.SOURCES[doc_type]
+            queryset = source.queryset().order_by('pk')
+            if doc_type == 'post':
+                queryset = queryset.prefetch_related('tags')
+            elif doc_type == 'project':
+                queryset = queryset.prefetch_related('technologies')
+            
+            seen = 0
+            batch = []
+            for instance in queryset.iterator(chunk_size=chunk_size):
+                batch.append(search.build_document(source, instance))
+                if len(batch) >= chunk_size:
+                    search.save_documents(batch)
+                    seen += len(batch)
+                    batch = []
+            if batch:
+                search.save_documents(batch)
+                seen += len(batch)
+            
+            # Drop documents for objects that are gone or no longer visible
+            visible = source.queryset().values('pk')
+            stale = search.delete_documents(
+                SearchDocument.objects
+                .filter(doc_type=doc_type)
+                .exclude(object_id__in=visible)
+            )
+            self.stdout.write(f"{doc_type}: indexed {seen}, removed {stale} stale document(s)")
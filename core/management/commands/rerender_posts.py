@@ -0,0 +1,97 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import markup, page_cache
+
+MODELS = {
+    'post': 'blog.Post',
+    'project': 'projects.Project',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Render stored Markdown HTML for posts and projects. Rows whose "
+        "markup hash is current are skipped, unless they still carry a legacy "
+        "generated excerpt; rendering runs in worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', dest='models', action='append', choices=sorted(MODELS),
+            help="Only render this model (repeatable)",
+        )
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help="Rows read, rendered and written per batch",
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Render every row, even when its hash is current",
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--workers and --batch-size must be positive")
+        # Workers only render; keep the parent's DB connections out of the fork
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            for name in options['models'] or list(MODELS):
+                model = apps.get_model(MODELS[name])
+                started = time.perf_counter()
+                rendered, skipped = self.render_model(model, executor, options)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{name}: rendered {rendered}, skipped {skipped} ({elapsed:.1f}s)"
+                )
+
+    def render_model(self, model, executor, options):
+        render = partial(markup.render_sources, model.markup_fields, model.markup_baselevel)
+        derived = getattr(model, 'derived_fields', [])
+        columns = markup.columns(model) + derived
+        queryset = model._default_manager.order_by('pk').only(
+            'pk', 'markup_hash', *model.markup_fields, *derived
+        )
+        rendered = skipped = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch[:options['batch_size']])
+            if not batch:
+                return rendered, skipped
+            last_pk = batch[-1].pk
+
+            pending = []
+            for instance in batch:
+                sources = markup.get_sources(instance)
+                if (
+                    options['force']
+                    or instance.markup_hash != markup.fingerprint(sources)
+                    or (derived and instance.has_legacy_excerpt())
+                ):
+                    pending.append((instance, sources))
+            skipped += len(batch) - len(pending)
+            if not pending:
+                continue
+
+            results = executor.map(render, [sources for _instance, sources in pending])
+            for (instance, _sources), values in zip(pending, results):
+                for column, value in values.items():
+                    setattr(instance, column, value)
+                if derived:
+                    instance.derive_text()
+            changed = [instance for instance, _sources in pending]
+            # bulk_update skips the save signals, so purge cached pages here
+            model._default_manager.bulk_update(changed, columns)
+            page_cache.invalidate_tags(
+                page_cache.model_tag(model),
+                *(page_cache.obj_tag(instance) for instance in changed),
+            )
+            rendered += len(changed)
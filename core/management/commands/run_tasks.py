@@ -0,0 +1,51 @@
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core import tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background tasks (core.tasks). Runs until SIGTERM/SIGINT, "
+        "finishing the current task first; --burst exits once the queue is empty."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help="Tasks claimed per round trip")
+        parser.add_argument('--poll-interval', type=float,
+                            default=getattr(settings, 'TASK_POLL_INTERVAL', 1.0),
+                            help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--burst', action='store_true',
+                            help="Exit when no task is due")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive")
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        stopping = threading.Event()
+
+        def stop(signum, frame):
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.stdout.write(f"Worker {worker} started")
+
+        total = 0
+        while not stopping.is_set():
+            close_old_connections()
+            ran = tasks.run_pending(worker, options['batch_size'])
+            total += ran
+            if not ran:
+                if options['burst']:
+                    break
+                stopping.wait(options['poll_interval'])
+        close_old_connections()
+        self.stdout.write(f"Worker {worker} stopped after {total} task(s)")
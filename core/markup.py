@@ -0,0 +1,173 @@
+"""
+Markdown rendered at save time.
+
+Models list their Markdown sources in ``markup_fields`` ({source: html
+column}). ``render_fields`` converts them to sanitized HTML stored next to
+the source, so detail pages print a column instead of parsing Markdown per
+request. Headings get ids and permalink anchors, the first field's headings
+are stored in ``toc``, and fenced code blocks come out pre-highlighted by
+Pygments (styles in static/css/highlight.css).
+
+``markup_hash`` fingerprints the sources together with ``RENDERER_VERSION``,
+so saves that leave the Markdown alone skip rendering. After changing the
+pipeline, bump the version and run ``manage.py rerender_posts``.
+
+``plain_text``, ``reading_time`` and ``truncate_words`` turn the rendered
+HTML into the stored text fields list pages print as-is.
+"""
+import hashlib
+import html
+import json
+import math
+from functools import partial
+from html.parser import HTMLParser
+
+import markdown
+import nh3
+from markdown.extensions.toc import slugify_unicode
+
+RENDERER_VERSION = 2
+
+WORDS_PER_MINUTE = 225
+
+ALLOWED_ATTRIBUTES = {
+    **nh3.ALLOWED_ATTRIBUTES,
+    # Pygments token classes, heading/footnote ids
+    '*': {'class', 'id'},
+    'a': nh3.ALLOWED_ATTRIBUTES['a'] | {'title'},
+    'abbr': {'title'},
+    'img': nh3.ALLOWED_ATTRIBUTES['img'] | {'title', 'loading'},
+}
+
+
+def _slugify(prefix, value, separator):
+    return prefix + slugify_unicode(value, separator)
+
+
+def _toc(tokens):
+    return [
+        {
+            'level': token['level'],
+            'id': token['id'],
+            'name': html.unescape(token['name']),
+            'children': _toc(token['children']),
+        }
+        for token in tokens
+    ]
+
+
+def render(text, baselevel=2, id_prefix=''):
+    """Return (html, toc) for Markdown ``text``.
+
+    ``baselevel`` is the tag a top-level ``#`` heading becomes; ``id_prefix``
+    keeps heading ids unique when several fields share a page.
+    """
+    md = markdown.Markdown(
+        extensions=['extra', 'sane_lists', 'codehilite', 'toc'],
+        extension_configs={
+            'codehilite': {'css_class': 'highlight', 'guess_lang': False},
+            'toc': {
+                'baselevel': baselevel,
+                'permalink': '#',
+                'permalink_class': 'heading-anchor',
+                'slugify': partial(_slugify, id_prefix),
+            },
+        },
+    )
+    output = md.convert(text)
+    return nh3.clean(output, attributes=ALLOWED_ATTRIBUTES), _toc(md.toc_tokens)
+
+
+INLINE_TAGS = {
+    'a', 'abbr', 'b', 'code', 'del', 'em', 'i', 'ins', 'kbd', 'mark',
+    'q', 's', 'small', 'span', 'strong', 'sub', 'sup', 'u',
+}
+
+
+class _TextExtractor(HTMLParser):
+    """Collect text nodes, skipping the heading permalink anchors"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.in_anchor = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a' and ('class', 'heading-anchor') in attrs:
+            self.in_anchor = True
+        if tag not in INLINE_TAGS:
+            # Keep words in adjacent blocks (<li>a</li><li>b</li>) apart
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag == 'a':
+            self.in_anchor = False
+        if tag not in INLINE_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self.in_anchor:
+            self.parts.append(data)
+
+
+def plain_text(output):
+    """Visible text of rendered HTML with whitespace collapsed"""
+    extractor = _TextExtractor()
+    extractor.feed(output)
+    extractor.close()
+    return ' '.join(''.join(extractor.parts).split())
+
+
+def reading_time(word_count, words_per_minute=WORDS_PER_MINUTE):
+    """Whole minutes to read ``word_count`` words, at least one"""
+    return max(1, math.ceil(word_count / words_per_minute))
+
+
+def truncate_words(words, count):
+    """Join the first ``count`` of ``words``, like the truncatewords filter"""
+    if len(words) <= count:
+        return ' '.join(words)
+    return ' '.join(words[:count]) + '…'
+
+
+def fingerprint(sources):
+    raw = json.dumps([RENDERER_VERSION, sources], sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def get_sources(instance):
+    return {source: getattr(instance, source) or '' for source in instance.markup_fields}
+
+
+def columns(model):
+    """Columns written by ``render_fields`` for ``model``"""
+    return [*model.markup_fields.values(), 'toc', 'markup_hash']
+
+
+def render_sources(markup_fields, baselevel, sources):
+    """Render {source: text} to {column: value}.
+
+    Takes and returns plain data so ``rerender_posts`` can run it in worker
+    processes.
+    """
+    values = {}
+    for index, (source, target) in enumerate(markup_fields.items()):
+        output, toc = render(
+            sources[source], baselevel, id_prefix='' if index == 0 else f'{source}-'
+        )
+        values[target] = output
+        if index == 0:
+            values['toc'] = toc
+    values['markup_hash'] = fingerprint(sources)
+    return values
+
+
+def render_fields(instance, force=False):
+    """Refresh ``instance``'s rendered columns; return the ones that changed"""
+    sources = get_sources(instance)
+    if not force and instance.markup_hash == fingerprint(sources):
+        return []
+    values = render_sources(instance.markup_fields, instance.markup_baselevel, sources)
+    for name, value in values.items():
+        setattr(instance, name, value)
+    return list(values)
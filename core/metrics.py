@@ -0,0 +1,50 @@
+"""
+Lightweight in-process counters for caches, buffers and other internals.
+
+Every gunicorn worker keeps its own counters; the staff-only metrics endpoint
+reports the snapshot of the worker that served the request.
+"""
+import os
+import threading
+from collections import Counter
+
+_lock = threading.Lock()
+_counters = Counter()
+
+
+def incr(name, amount=1):
+    """Increment the named counter"""
+    with _lock:
+        _counters[name] += amount
+
+
+def get(name):
+    """Return the current value of the named counter"""
+    with _lock:
+        return _counters[name]
+
+
+def ratio(numerator, *others):
+    """Return numerator / (numerator + others), or None when nothing was counted"""
+    with _lock:
+        hits = _counters[numerator]
+        total = hits + sum(_counters[name] for name in others)
+    if not total:
+        return None
+    return round(hits / total, 4)
+
+
+def snapshot():
+    """Return a copy of all counters for this worker"""
+    with _lock:
+        counters = dict(_counters)
+    return {
+        'pid': os.getpid(),
+        'counters': dict(sorted(counters.items())),
+    }
+
+
+def reset():
+    """Clear all counters (used by the metrics endpoint and tests)"""
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,58 @@
+import time
+
+from . import conditional, metrics, page_cache, stampede
+
+
+class PageCacheMiddleware:
+    """Serve anonymous GETs from the tag-invalidated full-page cache.
+    
+    Must come after AuthenticationMiddleware (to see the user) and after
+    CsrfViewMiddleware, whose response phase sets the cookie for the fresh
+    CSRF token inserted into cached pages. Keep it last, so hits still get
+    the headers added by the response phase of every middleware above
+    (X-Frame-Options, security headers).
+    
+    Only one request per URL renders a missing or stale page at a time;
+    concurrent requests get the stale copy, or wait for the fresh one when
+    there is nothing to serve yet.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        if not page_cache.is_cacheable_request(request):
+            return self.get_response(request)
+        
+        entry, fresh = page_cache.lookup(request)
+        if fresh:
+            return self.serve(request, entry, 'HIT')
+        
+        key = page_cache.cache_key(request)
+        token = stampede.acquire(key)
+        if token is None:
+            if entry is not None:
+                return self.serve(request, entry, 'STALE')
+            entry = page_cache.wait_for(request)
+            if entry is not None:
+                return self.serve(request, entry, 'WAIT')
+            metrics.incr('page_cache.wait_timeout')
+        
+        metrics.incr('page_cache.miss')
+        try:
+            started = time.perf_counter()
+            response = self.get_response(request)
+            if page_cache.is_cacheable_response(response):
+                page_cache.store(request, response, time.perf_counter() - started)
+                response['X-Page-Cache'] = 'MISS'
+        finally:
+            if token is not None:
+                stampede.release(key, token)
+        return response
+    
+    def serve(self, request, entry, status):
+        metrics.incr('page_cache.hit')
+        metrics.incr(f'page_cache.hit.{status.lower()}')
+        response = page_cache.respond(request, entry)
+        response['X-Page-Cache'] = status
+        return conditional.revalidate(request, response, 'page_cache')
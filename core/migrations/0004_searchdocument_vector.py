@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # Generated, so every write through the ORM keeps it current
+        schema_editor.execute("""
+            ALTER TABLE core_searchdocument ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(body, '')), 'B')
+            ) STORED
+        """)
+        schema_editor.execute(
+            "CREATE INDEX core_searchdocument_vector_gin "
+            "ON core_searchdocument USING GIN (search_vector)"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5("
+            "title, body, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO core_searchdocument_fts (rowid, title, body) "
+            "SELECT id, title, body FROM core_searchdocument"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS core_searchdocument_vector_gin")
+        schema_editor.execute("ALTER TABLE core_searchdocument DROP COLUMN IF EXISTS search_vector")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS core_searchdocument_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_task'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,80 @@
+from django.db import models
+from django.utils import timezone
+
+
+class SearchDocument(models.Model):
+    """Denormalized search document for any searchable object on the site"""
+    DOC_TYPES = [
+        ('post', 'Article'),
+        ('project', 'Project'),
+        ('faq', 'FAQ'),
+        ('service', 'Service'),
+    ]
+    
+    doc_type = models.CharField(max_length=20, choices=DOC_TYPES)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=500)
+    body = models.TextField(blank=True)
+    url = models.CharField(max_length=500)
+    weight = models.FloatField(default=1.0, help_text="Relevance multiplier for this document")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['doc_type', 'object_id']
+        constraints = [
+            models.UniqueConstraint(fields=['doc_type', 'object_id'], name='core_searchdocument_object'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_doc_type_display()}: {self.title}"
+
+
+class ResponsiveImage(models.Model):
+    """Resized variants generated for an uploaded image (see core.images)"""
+    name = models.CharField(max_length=255, unique=True, help_text="Storage name of the original")
+    content_hash = models.CharField(max_length=64, db_index=True)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    # {format: [[width, storage name], ...]} with widths ascending
+    variants = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class Task(models.Model):
+    """Queued background job (see core.tasks)"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DEAD = 'dead'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DEAD, 'Dead'),
+    ]
+    
+    name = models.CharField(max_length=200, help_text="Dotted path of the task function")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='core_task_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
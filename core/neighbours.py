@@ -0,0 +1,127 @@
+"""
+Previous/next links for detail pages.
+
+A sequence is the visible rows of a model in a fixed key order (the last key
+unique). An object's neighbours come back in one query: two single-row index
+seeks, built with the keyset predicates from ``core.pagination``, as scalar
+subqueries the outer query matches by primary key. The pair is cached per
+object under the version of the sequence tag, which the signals in
+``core.signals`` bump only when a save or delete could move a row in the
+sequence or change what its link shows (keys, visibility, ``fields``).
+
+NULL keys sort where the database puts them, as in keyset pagination (first
+on SQLite and MySQL, last on PostgreSQL), so rows without a date still get
+neighbours instead of breaking the lookup.
+
+Without a shared cache a worker never sees another worker's version bumps,
+so ``NEIGHBOURS_CACHE_TIMEOUT`` defaults to a minute instead of a day.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Subquery
+
+from . import page_cache, stampede
+from .pagination import KeysetPaginator
+
+
+class Sequence:
+    def __init__(self, label, keys, visible, fields):
+        self.label = label
+        self.keys = keys
+        self.visible = visible
+        self.fields = fields
+
+    def get_model(self):
+        return apps.get_model(self.label)
+
+    @property
+    def tag(self):
+        return f'neighbours:{self.label.lower()}'
+
+    def get_queryset(self):
+        return self.get_model()._default_manager.filter(**self.visible)
+
+    @property
+    def watched(self):
+        """Columns whose change can alter some object's neighbours"""
+        model = self.get_model()
+        names = [key.lstrip('-') for key in self.keys] + list(self.visible) + list(self.fields)
+        return sorted({model._meta.get_field(name).attname for name in names})
+
+    def is_visible(self, values):
+        model = self.get_model()
+        return all(
+            values[model._meta.get_field(name).attname] == value
+            for name, value in self.visible.items()
+        )
+
+    def affects(self, old, instance):
+        """Whether saving ``instance`` over the ``old`` values changes the sequence"""
+        new = {name: getattr(instance, name) for name in self.watched}
+        if old is None:
+            return self.is_visible(new)
+        if not self.is_visible(old) and not self.is_visible(new):
+            return False
+        return old != new
+
+    def fetch(self, obj):
+        """(previous, next) for ``obj``, straight from the database"""
+        queryset = self.get_queryset().only(*self.watched)
+        paginator = KeysetPaginator(queryset, self.keys, 1)
+        values = paginator.values(obj)
+        previous_pk = queryset.filter(paginator.before(values)).order_by(
+            *paginator.ordering(reverse=True)
+        ).values('pk')[:1]
+        next_pk = queryset.filter(paginator.after(values)).order_by(
+            *paginator.ordering()
+        ).values('pk')[:1]
+        rows = queryset.order_by().annotate(
+            previous_pk=Subquery(previous_pk), next_pk=Subquery(next_pk),
+        ).filter(Q(pk=F('previous_pk')) | Q(pk=F('next_pk')))
+        previous = following = None
+        for row in rows:
+            if row.pk == row.next_pk:
+                following = row
+            else:
+                previous = row
+        return previous, following
+
+
+# Models with previous/next navigation on their detail pages
+SEQUENCES = {
+    'blog.Post': Sequence(
+        'blog.Post', ['published_at', 'id'],
+        visible={'status': 'published'}, fields=['title', 'slug'],
+    ),
+    'projects.Project': Sequence(
+        'projects.Project', ['created_at', 'id'],
+        visible={'is_published': True}, fields=['title', 'slug'],
+    ),
+}
+
+
+def sequence_for_model(model):
+    return SEQUENCES[model._meta.label]
+
+
+def get(obj, request=None):
+    """Return (previous, next) for ``obj``, cached until its sequence changes.
+
+    ``request`` lets the page cache purge the page along with the pair.
+    """
+    sequence = sequence_for_model(type(obj))
+    version = page_cache.get_tag_versions([sequence.tag])[sequence.tag]
+    key = f'{sequence.tag}:{obj.pk}:{version}'
+    pair = stampede.get_or_set(
+        key, lambda: sequence.fetch(obj),
+        getattr(settings, 'NEIGHBOURS_CACHE_TIMEOUT', 60 * 60 * 24),
+    )
+    if request is not None:
+        page_cache.add_tags(request, sequence.tag)
+    return pair
+
+
+def invalidate(sequence):
+    """Drop every cached pair in ``sequence`` once the transaction commits"""
+    transaction.on_commit(lambda: page_cache.invalidate_tags(sequence.tag))
@@ -0,0 +1,267 @@
+"""
+Full-page cache for anonymous GET requests with tag-based invalidation.
+
+A cached page remembers the version of every tag it was built from:
+
+* ``obj:<app.model>:<pk>`` for each model instance the page rendered
+  (collected from the template context, including prefetched and
+  ``select_related`` objects),
+* ``list:<app.model>`` for each queryset it listed,
+* ``site`` for the site-wide chrome every page shows.
+
+Model signals bump the matching tag versions, so editing a post only purges
+pages that rendered that post. Lists are only purged when a row is added,
+removed, or changes a field that decides whether or where it is listed.
+
+CSRF tokens are stored as a placeholder and replaced with a fresh token for
+every hit, so pages with the newsletter or contact forms can be cached.
+Rebuilds are single-flight (see ``core.stampede``): while one request
+renders a missing or stale page, others serve the stale copy or wait for it.
+Views with per-request side effects (view counting) register hit hooks with
+``add_hit_hook`` so the side effect still happens when the view is skipped.
+"""
+import hashlib
+import re
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page
+from django.db.models import Model, QuerySet
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.module_loading import import_string
+
+from . import metrics, stampede
+
+CSRF_PLACEHOLDER = '__PAGE_CACHE_CSRF_TOKEN__'
+CSRF_INPUT_RE = re.compile(
+    r'(<input type="hidden" name="csrfmiddlewaretoken" value=")[^"]*(")'
+)
+
+# Validators and caching directives replayed on hits
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+
+IGNORED_QUERY_PARAMS = {'fbclid', 'gclid', 'ref'}
+
+# Models whose rows appear on every page (header/footer)
+SITE_WIDE_MODELS = {
+    'home.SiteConfiguration',
+    'home.PersonalInfo',
+    'contact.ContactInfo',
+    'contact.SocialLink',
+}
+
+# Write-heavy or internal models that never affect rendered pages directly
+IGNORED_MODELS = {
+    'blog.PostView',
+    'blog.PostViewDaily',
+    'blog.NewsletterSubscriber',
+    'blog.NewsletterIssue',
+    'contact.ContactMessage',
+    'core.SearchDocument',
+}
+
+
+def obj_tag(instance):
+    return f'obj:{instance._meta.label_lower}:{instance.pk}'
+
+
+def list_tag(model):
+    return f'list:{model._meta.label_lower}'
+
+
+def model_tag(model):
+    """Bumped on any change to ``model``; used by conditional GET validators"""
+    return f'model:{model._meta.label_lower}'
+
+
+def _tag_key(tag):
+    return f'pagetag:{tag}'
+
+
+def get_tag_versions(tags):
+    """Return {tag: version}, creating versions for tags seen for the first time.
+
+    A version is the time (ns) of the tag's last invalidation, or of its first
+    use, which is never earlier; conditional GET uses it as a change time.
+    """
+    keys = {_tag_key(tag): tag for tag in tags}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        # Time-based so a recreated tag never matches an old snapshot
+        seed = time.time_ns()
+        for key in missing:
+            cache.add(key, seed, None)
+        found.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in found.items()}
+
+
+def invalidate_tags(*tags):
+    """Bump tag versions, invalidating every cached page built from them"""
+    keys = [_tag_key(tag) for tag in tags]
+    current = cache.get_many(keys)
+    now = time.time_ns()
+    # Always move forward, even within one clock tick or behind a skewed clock
+    cache.set_many({key: max(now, current.get(key, 0) + 1) for key in keys}, None)
+    metrics.incr('page_cache.invalidations', len(tags))
+
+
+def add_hit_hook(request, func_path, *args):
+    """Call ``func_path(request, *args)`` whenever this page is served from cache"""
+    hooks = getattr(request, '_page_cache_hooks', [])
+    hooks.append((func_path, args))
+    request._page_cache_hooks = hooks
+
+
+def add_tags(request, *tags):
+    """Make the page cached for ``request`` depend on extra tags (fragments)"""
+    request._page_cache_tags = getattr(request, '_page_cache_tags', set()) | set(tags)
+
+
+def collect_tags(context):
+    """Derive cache tags from a rendered template context"""
+    tags = {'site'}
+    seen = set()
+
+    def add_instance(instance, depth=0):
+        key = (type(instance), instance.pk)
+        if key in seen:
+            return
+        seen.add(key)
+        tags.add(obj_tag(instance))
+        if depth:
+            return
+        # One level of select_related / prefetch_related objects
+        for related in instance._state.fields_cache.values():
+            if isinstance(related, Model):
+                add_instance(related, depth + 1)
+        for related in getattr(instance, '_prefetched_objects_cache', {}).values():
+            add_queryset(related, depth + 1)
+
+    def add_queryset(queryset, depth=0):
+        tags.add(list_tag(queryset.model))
+        if queryset._result_cache is not None:
+            for item in queryset._result_cache:
+                if isinstance(item, Model):
+                    add_instance(item, depth)
+
+    for value in (context or {}).values():
+        if isinstance(value, Model):
+            add_instance(value)
+        elif isinstance(value, QuerySet):
+            add_queryset(value)
+        elif isinstance(value, Page):
+            items = value.object_list
+            if isinstance(items, QuerySet):
+                add_queryset(items)
+            else:
+                for item in items:
+                    if isinstance(item, Model):
+                        tags.add(list_tag(type(item)))
+                        add_instance(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, Model):
+                    tags.add(list_tag(type(item)))
+                    add_instance(item)
+    return tags
+
+
+def cache_key(request):
+    params = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        if key not in IGNORED_QUERY_PARAMS and not key.startswith('utm_')
+        for value in values
+    )
+    # AJAX requests can get a partial template for the same URL
+    xhr = request.headers.get('x-requested-with', '')
+    raw = f'{request.get_host()}{request.path}?{urlencode(params)}|{xhr}'
+    return 'page:' + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def is_cacheable_request(request):
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.path.startswith(tuple(getattr(settings, 'PAGE_CACHE_EXCLUDE_PATHS', ()))):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return False
+    # Anything carrying session state or flash messages renders per visitor
+    if settings.SESSION_COOKIE_NAME in request.COOKIES or 'messages' in request.COOKIES:
+        return False
+    return True
+
+
+def is_cacheable_response(response):
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.has_header('Cache-Control'):
+        cache_control = response['Cache-Control']
+        if 'private' in cache_control or 'no-store' in cache_control:
+            return False
+    # Only the CSRF cookie may be set; anything else is per-visitor state
+    return all(name == settings.CSRF_COOKIE_NAME for name in response.cookies)
+
+
+def store(request, response, delta=0.0):
+    """Cache ``response``; ``delta`` is how long it took to render (for XFetch)"""
+    context = getattr(response, 'context_data', None)
+    tags = collect_tags(context) | getattr(request, '_page_cache_tags', set())
+    content = CSRF_INPUT_RE.sub(
+        lambda m: m.group(1) + CSRF_PLACEHOLDER + m.group(2),
+        response.content.decode(response.charset),
+    )
+    entry = {
+        'content': content,
+        'content_type': response.get('Content-Type'),
+        'headers': {
+            name: response[name] for name in CACHED_HEADERS if response.has_header(name)
+        },
+        'tags': get_tag_versions(tags),
+        'hooks': getattr(request, '_page_cache_hooks', []),
+    }
+    stampede.store(
+        cache_key(request), entry,
+        getattr(settings, 'PAGE_CACHE_TIMEOUT', 600), delta,
+        getattr(settings, 'PAGE_CACHE_STALE_TIMEOUT', 300),
+    )
+
+
+def lookup(request):
+    """Return (entry, fresh) for the cached page, or (None, False)"""
+    stored = cache.get(cache_key(request))
+    if stored is None:
+        return None, False
+    entry = stored['value']
+    if get_tag_versions(entry['tags']) != entry['tags']:
+        metrics.incr('page_cache.stale')
+        return entry, False
+    return entry, stampede.is_fresh(stored)
+
+
+def wait_for(request):
+    """Wait for the page another request is rendering; return its entry or None"""
+    stored = stampede.wait_for(
+        cache_key(request), getattr(settings, 'PAGE_CACHE_LOCK_WAIT', 3)
+    )
+    return stored['value'] if stored is not None else None
+
+
+def respond(request, entry):
+    """Build a response for ``request`` from a cached entry"""
+    content = entry['content']
+    if CSRF_PLACEHOLDER in content:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    for func_path, args in entry.get('hooks', ()):
+        import_string(func_path)(request, *args)
+    response = HttpResponse(content, content_type=entry['content_type'])
+    for name, value in entry.get('headers', {}).items():
+        response[name] = value
+    return response
@@ -0,0 +1,198 @@
+"""
+Keyset (seek) pagination.
+
+Instead of ``COUNT(*)`` plus ``OFFSET``, each page continues from the sort
+key of the last row on the previous one, so page 500 costs the same index
+seek as page 1. The position travels as an opaque cursor: the last row's
+key values as URL-safe base64 JSON, decoded back through the model fields.
+
+The ``ORDER BY`` is plain, so it matches ``Meta.ordering`` and the indexes
+built from it, and NULLs land where the database puts them: PostgreSQL and
+Oracle sort NULL as the largest value (first when descending), SQLite and
+MySQL as the smallest. ``after`` and ``before`` follow the same placement.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.http import Http404
+from django.utils.cache import patch_vary_headers
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    """One page of results plus the cursor to the next one"""
+
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor, cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Paginate ``queryset`` by ``keys`` (e.g. ``['-published_at', 'id']``).
+
+    The last key must be unique so every row has a distinct position.
+    """
+
+    # Vendors whose ORDER BY treats NULL as larger than any value
+    NULLS_LARGEST = ('postgresql', 'oracle')
+
+    def __init__(self, queryset, keys, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.nulls_largest = connections[queryset.db].vendor in self.NULLS_LARGEST
+        self.keys = []
+        for key in keys:
+            name = key.lstrip('-')
+            field = queryset.model._meta.get_field(name)
+            self.keys.append((field.attname, field, key.startswith('-')))
+
+    def ordering(self, reverse=False):
+        """ORDER BY for the keys, or for walking them backwards"""
+        return [
+            F(name).desc() if descending != reverse else F(name).asc()
+            for name, _field, descending in self.keys
+        ]
+
+    def nulls_first(self, descending):
+        return descending == self.nulls_largest
+
+    def encode(self, obj):
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in self.values(obj)
+        ]
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError('wrong number of values')
+            return [
+                None if value is None else field.to_python(value)
+                for (_name, field, _descending), value in zip(self.keys, values)
+            ]
+        except Exception as e:
+            raise InvalidCursor(f'Invalid cursor: {e}') from e
+
+    def after(self, values):
+        """Filter for rows strictly after ``values`` in key order"""
+        condition = Q()
+        equal = Q()
+        for (name, field, descending), value in zip(self.keys, values):
+            nulls_first = self.nulls_first(descending)
+            if value is None:
+                # Followed by every non-NULL value when NULLs come first, else by nothing
+                beyond = Q(**{f'{name}__isnull': False}) if nulls_first else Q(pk__in=[])
+                tie = Q(**{f'{name}__isnull': True})
+            else:
+                beyond = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+                if field.null and not nulls_first:
+                    beyond |= Q(**{f'{name}__isnull': True})
+                tie = Q(**{name: value})
+            condition |= equal & beyond
+            equal &= tie
+        return condition
+
+    def before(self, values):
+        """Filter for rows strictly before ``values`` in key order"""
+        condition = Q()
+        equal = Q()
+        for (name, field, descending), value in zip(self.keys, values):
+            nulls_first = self.nulls_first(descending)
+            if value is None:
+                beyond = Q(pk__in=[]) if nulls_first else Q(**{f'{name}__isnull': False})
+                tie = Q(**{f'{name}__isnull': True})
+            else:
+                beyond = Q(**{f"{name}__{'gt' if descending else 'lt'}": value})
+                if field.null and nulls_first:
+                    beyond |= Q(**{f'{name}__isnull': True})
+                tie = Q(**{name: value})
+            condition |= equal & beyond
+            equal &= tie
+        return condition
+
+    def values(self, obj):
+        return [getattr(obj, name) for name, _field, _descending in self.keys]
+
+    def page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.ordering())
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode(cursor)))
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        next_cursor = self.encode(rows[-1]) if has_next else None
+        return KeysetPage(rows, next_cursor, cursor)
+
+
+class KeysetPaginationMixin:
+    """Cursor pagination for ListViews, used when ``KEYSET_PAGINATION`` is on
+    or the request carries a ``cursor``.
+
+    AJAX requests ("load more") get ``ajax_template_name`` with just the next
+    page of items.
+    """
+    keyset_ordering = None
+    ajax_template_name = None
+
+    def use_keyset(self):
+        return bool(self.keyset_ordering) and (
+            'cursor' in self.request.GET
+            or getattr(settings, 'KEYSET_PAGINATION', False)
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, self.keyset_ordering, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor') or None)
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if getattr(page, 'is_keyset', False) and page.has_next():
+            params = self.request.GET.copy()
+            params.pop('page', None)
+            params['cursor'] = page.next_cursor
+            context['next_page_url'] = f'?{params.urlencode()}'
+        return context
+
+    def get_template_names(self):
+        is_ajax = self.request.headers.get('x-requested-with') == 'XMLHttpRequest'
+        if self.ajax_template_name and is_ajax and self.use_keyset():
+            return [self.ajax_template_name]
+        return super().get_template_names()
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        if self.ajax_template_name:
+            patch_vary_headers(response, ['X-Requested-With'])
+        return response
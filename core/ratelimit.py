@@ -0,0 +1,196 @@
+"""
+Token-bucket rate limiting for form endpoints.
+
+``RATE_LIMITS`` maps a scope to its buckets, each ``(capacity, period)``:
+up to ``capacity`` requests at once, refilled evenly over ``period`` seconds.
+A bucket is kept per client IP (``ip``), per submitted address (``email``,
+hashed; skipped when the form has none) and for the whole scope (``global``).
+
+``@limit(scope)`` checks a POST against every bucket of its scope before the
+view runs, so a rejected request costs no form validation, database write or
+email. A request is let through only if every bucket has a token, and then
+takes one from each. Otherwise the view is skipped, and the response is a 429
+with ``Retry-After`` set to when the emptiest bucket will have a token again.
+
+With a Redis cache, one Lua script reads, refills and takes from all the
+buckets atomically, using the Redis clock, so every worker and node shares
+the limits. Without Redis, only a process-local cache (LocMemCache, for
+development and tests) is supported: a process lock makes get/set on it
+atomic, but each process then has its own limits. Other shared backends
+cannot take tokens atomically across processes, so ``check_cache`` fails
+the system checks when the limiter is enabled with one. If Redis is
+unreachable the request is allowed: the limiter never takes the forms down
+with it.
+"""
+import functools
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.shortcuts import render
+
+from . import metrics
+
+logger = logging.getLogger('django')
+
+# KEYS: one per bucket; ARGV: capacity and refill rate (tokens/second) per bucket
+TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local tokens = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    tokens[i] = level
+    if level < 1 then
+        wait = math.max(wait, (1 - level) / rate)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local level = tokens[i]
+    if wait == 0 then
+        level = level - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(level), 'ts', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+end
+return tostring(wait)
+"""
+
+_lock = threading.Lock()
+
+
+def _redis():
+    """Raw client of a django-redis cache (directly or as the shared tier), or None"""
+    shared = getattr(cache, 'shared', cache)
+    client = getattr(shared, 'client', None)
+    if client is None or not hasattr(client, 'get_client'):
+        return None
+    return client.get_client(write=True)
+
+
+def check_cache(app_configs=None, **kwargs):
+    """System check: buckets are only atomic with Redis or a process-local cache"""
+    if not getattr(settings, 'RATE_LIMIT_ENABLED', False) or _redis() is not None:
+        return []
+    backend = caches['default']
+    if not isinstance(getattr(backend, 'shared', backend), LocMemCache):
+        return [checks.Error(
+            "RATE_LIMIT_ENABLED needs a Redis cache (REDIS_URL); this cache backend "
+            "cannot take tokens atomically across processes.",
+            id='core.E001',
+        )]
+    if not settings.DEBUG:
+        return [checks.Warning(
+            "Rate limits are kept per process without Redis; set REDIS_URL to share them.",
+            id='core.W001',
+        )]
+    return []
+
+
+def _client_ip(request):
+    from contact.views import get_client_ip
+    return get_client_ip(request) or 'unknown'
+
+
+def _email(request):
+    email = request.POST.get('email', '').strip().lower()
+    return hashlib.sha1(email.encode()).hexdigest() if email else None
+
+
+IDENTITIES = {
+    'ip': _client_ip,
+    'email': _email,
+    'global': lambda request: 'all',
+}
+
+
+def buckets_for(scope, request):
+    """[(key, capacity, period)] for the buckets ``request`` draws from"""
+    buckets = []
+    for name, (capacity, period) in getattr(settings, 'RATE_LIMITS', {}).get(scope, {}).items():
+        identity = IDENTITIES[name](request)
+        if identity is not None:
+            buckets.append((f'ratelimit:{scope}:{name}:{identity}', capacity, period))
+    return buckets
+
+
+def _take_redis(redis, buckets):
+    shared = getattr(cache, 'shared', cache)
+    keys = [shared.make_key(key) for key, _capacity, _period in buckets]
+    args = []
+    for _key, capacity, period in buckets:
+        args += [capacity, capacity / period]
+    return float(redis.register_script(TAKE_SCRIPT)(keys=keys, args=args))
+
+
+def _take_cache(buckets):
+    now = time.time()
+    with _lock:
+        stored = cache.get_many([key for key, _capacity, _period in buckets])
+        levels = {}
+        wait = 0
+        for key, capacity, period in buckets:
+            level, ts = stored.get(key, (capacity, now))
+            level = min(capacity, level + max(0, now - ts) * capacity / period)
+            levels[key] = level
+            if level < 1:
+                wait = max(wait, (1 - level) * period / capacity)
+        for key, capacity, period in buckets:
+            level = levels[key] - (0 if wait else 1)
+            cache.set(key, (level, now), math.ceil(period))
+    return wait
+
+
+def take(scope, request):
+    """Take a token from each of ``request``'s buckets; return seconds to wait (0 if allowed)"""
+    buckets = buckets_for(scope, request)
+    if not buckets:
+        return 0
+    redis = _redis()
+    if redis is None:
+        return _take_cache(buckets)
+    try:
+        return _take_redis(redis, buckets)
+    except Exception as e:
+        metrics.incr('ratelimit.errors')
+        logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+        return 0
+
+
+def too_many_requests(request, retry_after):
+    return render(request, 'errors/429.html', {'retry_after': retry_after}, status=429)
+
+
+def limit(scope, response=too_many_requests):
+    """Rate limit a view's POSTs by the ``RATE_LIMITS[scope]`` buckets.
+
+    ``response(request, retry_after)`` builds the 429 for rejected requests.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method == 'POST' and getattr(settings, 'RATE_LIMIT_ENABLED', True):
+                wait = take(scope, request)
+                if wait:
+                    metrics.incr(f'ratelimit.{scope}.limited')
+                    rejected = response(request, wait)
+                    rejected['Retry-After'] = str(math.ceil(wait))
+                    return rejected
+                metrics.incr(f'ratelimit.{scope}.allowed')
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,210 @@
+"""
+Precomputed "related items" rankings, shared by blog posts and projects.
+
+A ``RelatedGraph`` stores, for each visible object, the best ``limit`` other
+objects as edges (owner, related, score, rank). The score is made of:
+
+* shared tags, each weighted by rarity (inverse document frequency),
+* a bonus for the same category,
+* a per-candidate boost defined by the graph (recency, featured level).
+
+A graph with a ``fill_order`` tops up rankings that have fewer real matches
+than the limit with the first objects in that order.
+
+Scores are computed in memory from a compact ``Corpus``. A full rebuild
+loads every visible object. An update loads only what the rankings being
+recomputed are scored against: the objects sharing a tag or the category
+with them, the tag memberships needed for the weights, and the visible
+count. Rankings an update does not reach keep tag weights based on the
+previous visible count until the next full rebuild.
+"""
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+CATEGORY_WEIGHT = 1.0
+
+
+@dataclass
+class Corpus:
+    total: int = 0
+    categories: dict = field(default_factory=dict)
+    boosts: dict = field(default_factory=dict)
+    tags: dict = field(default_factory=lambda: defaultdict(set))
+    tag_members: dict = field(default_factory=lambda: defaultdict(set))
+    category_members: dict = field(default_factory=lambda: defaultdict(set))
+    fill: list = field(default_factory=list)
+
+    def add(self, pk, category_id, boost):
+        self.categories[pk] = category_id
+        self.boosts[pk] = boost
+        if category_id:
+            self.category_members[category_id].add(pk)
+
+    def idf(self, tag_id):
+        return math.log(1 + self.total / (1 + len(self.tag_members[tag_id])))
+
+    def related(self, pk, limit):
+        """Return [(related_pk, score)] for ``pk``, best first"""
+        if pk not in self.categories:
+            return []
+        scores = defaultdict(float)
+        for tag_id in self.tags.get(pk, ()):
+            weight = self.idf(tag_id)
+            for other in self.tag_members[tag_id]:
+                scores[other] += weight
+        category_id = self.categories[pk]
+        if category_id:
+            for other in self.category_members[category_id]:
+                scores[other] += CATEGORY_WEIGHT
+        scores.pop(pk, None)
+
+        for other in self.fill:
+            if len(scores) >= limit:
+                break
+            if other != pk:
+                scores.setdefault(other, 0.0)
+
+        ranked = [(other, score + self.boosts.get(other, 0.0)) for other, score in scores.items()]
+        ranked.sort(key=lambda pair: (-pair[1], -pair[0]))
+        return ranked[:limit]
+
+
+class RelatedGraph:
+    """Configuration and maintenance of one stored ranking; subclass per model"""
+    model = None
+    edge_model = None
+    # Edge foreign key to the object whose ranking the edge belongs to
+    owner_field = None
+    tags_field = 'tags'
+    category_field = 'category'
+    visible = {}
+    limit_setting = None
+    default_limit = 6
+    # Columns passed to boost(), and the order sparse rankings are filled from
+    boost_fields = ()
+    fill_order = None
+
+    def boost(self, values, now):
+        return 0.0
+
+    def limit(self):
+        return getattr(settings, self.limit_setting, self.default_limit)
+
+    def objects(self):
+        return self.model._default_manager.filter(**self.visible)
+
+    def links(self):
+        """(through model, owner column, tag column) of the tags field"""
+        tags = self.model._meta.get_field(self.tags_field)
+        owner, tag = f'{tags.m2m_field_name()}_id', f'{tags.m2m_reverse_field_name()}_id'
+        return tags.remote_field.through, owner, tag
+
+    def candidates(self, seeds):
+        """Visible ``seeds`` and the visible objects sharing a tag or the
+        category with any of them. Hidden seeds count too, so rankings they
+        just left are found."""
+        through, owner, tag = self.links()
+        category = f'{self.category_field}_id'
+        tags = through.objects.filter(**{f'{owner}__in': seeds}).values(tag)
+        categories = self.model._default_manager.filter(pk__in=seeds).values(category)
+        return self.objects().filter(
+            Q(pk__in=seeds)
+            | Q(**{f'{category}__in': categories})
+            | Q(pk__in=through.objects.filter(**{f'{tag}__in': tags}).values(owner))
+        )
+
+    def load(self, seeds=None):
+        """Corpus that can score ``seeds`` (every visible object when None)"""
+        through, owner, tag = self.links()
+        category = f'{self.category_field}_id'
+        if seeds is None:
+            objects = self.objects()
+            links = through.objects.filter(**{f'{owner}__in': objects.values('pk')})
+            total = None
+        else:
+            seeds = list(seeds)
+            objects = self.candidates(seeds)
+            # Memberships of tags the seeds don't have never reach their scores
+            links = through.objects.filter(**{
+                f'{owner}__in': objects.values('pk'),
+                f'{tag}__in': through.objects.filter(**{f'{owner}__in': seeds}).values(tag),
+            })
+            total = self.objects().count()
+
+        now = timezone.now()
+        corpus = Corpus()
+        fields = ('pk', category, *self.boost_fields)
+        for pk, category_id, *values in objects.values_list(*fields).iterator(chunk_size=2000):
+            corpus.add(pk, category_id, self.boost(values, now))
+        for object_id, tag_id in links.values_list(owner, tag).iterator(chunk_size=2000):
+            corpus.tags[object_id].add(tag_id)
+            corpus.tag_members[tag_id].add(object_id)
+        if self.fill_order:
+            # A ranking skips itself and its real matches, so limit + 1 always suffice
+            for pk, category_id, *values in (
+                self.objects().order_by(*self.fill_order).values_list(*fields)[:self.limit() + 1]
+            ):
+                corpus.fill.append(pk)
+                if pk not in corpus.categories:
+                    corpus.add(pk, category_id, self.boost(values, now))
+        corpus.total = len(corpus.categories) if total is None else total
+        return corpus
+
+    def store(self, corpus, pks, batch_size=1000):
+        """Replace stored edges for ``pks`` with freshly computed ones"""
+        pks = list(pks)
+        limit = self.limit()
+        owner = f'{self.owner_field}_id'
+        rows = []
+        for pk in pks:
+            rows.extend(
+                self.edge_model(**{owner: pk}, related_id=other, score=score, rank=rank)
+                for rank, (other, score) in enumerate(corpus.related(pk, limit))
+            )
+        edges = self.edge_model._default_manager
+        with transaction.atomic():
+            for start in range(0, len(pks), batch_size):
+                edges.filter(**{f'{owner}__in': pks[start:start + batch_size]}).delete()
+            edges.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
+    def refresh(self, pks):
+        """Recompute the rankings of ``pks`` from a corpus scoped to them"""
+        pks = set(pks)
+        return self.store(self.load(pks), pks) if pks else 0
+
+    def fill(self):
+        return list(
+            self.objects().order_by(*self.fill_order).values_list('pk', flat=True)[:self.limit() + 1]
+        ) if self.fill_order else []
+
+    def affected(self, pk, fill=False):
+        """Rankings ``pk`` could enter or leave after its tags, category,
+        visibility or boost changed.
+
+        ``fill`` also covers rankings topped up from the fill order, which all
+        contain one of its first entries.
+        """
+        found = {pk, *self.candidates([pk]).values_list('pk', flat=True)}
+        targets = [pk, *self.fill()] if fill else [pk]
+        found.update(
+            self.edge_model._default_manager.filter(related_id__in=targets)
+            .values_list(f'{self.owner_field}_id', flat=True)
+        )
+        return found
+
+    def update(self, pk, fill=False):
+        return self.refresh(self.affected(pk, fill=fill))
+
+    def rebuild_all(self, batch_size=1000):
+        """Recompute every ranking"""
+        corpus = self.load()
+        with transaction.atomic():
+            self.edge_model._default_manager.all().delete()
+            return self.store(corpus, list(corpus.categories), batch_size=batch_size)
@@ -0,0 +1,307 @@
+"""
+Unified site search over a denormalized ``SearchDocument`` table.
+
+Each searchable model is described by a source below: which rows are
+visible, how to turn one into a document, and a relevance weight. Documents
+are kept current by background tasks queued from ``core.signals`` and rebuilt
+in bulk by the ``rebuild_search_index`` command. A search is a single query on one table.
+
+Matching uses a stored index (migration 0004): on PostgreSQL a generated
+``search_vector`` tsvector column with a GIN index, on SQLite an FTS5 shadow
+table ``core_searchdocument_fts`` with rowid = document id, maintained here.
+Other databases fall back to an ``icontains`` scan. Every write bumps the
+``list:core.searchdocument`` page cache tag, which ``/search/`` depends on.
+"""
+import re
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+from . import page_cache
+from .models import SearchDocument
+from .tasks import task
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+BODY_MAX_LENGTH = 20000
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    doc_type: str
+    model: str
+    visible: Q
+    weight: float = 1.0
+    
+    def get_model(self):
+        return apps.get_model(self.model)
+    
+    def queryset(self):
+        return self.get_model()._default_manager.filter(self.visible)
+    
+    def is_visible(self, instance):
+        return self.queryset().filter(pk=instance.pk).exists()
+
+
+def _join(*parts):
+    return '\n'.join(strip_tags(str(p)) for p in parts if p)[:BODY_MAX_LENGTH]
+
+
+def post_document(post):
+    return {
+        'title': post.title,
+        'body': _join(
+            post.subtitle, post.excerpt, post.content,
+            ' '.join(tag.name for tag in post.tags.all()),
+        ),
+        'url': post.get_absolute_url(),
+    }
+
+
+def project_document(project):
+    return {
+        'title': project.title,
+        'body': _join(
+            project.subtitle, project.description, project.content,
+            project.key_features,
+            ' '.join(tech.name for tech in project.technologies.all()),
+        ),
+        'url': project.get_absolute_url(),
+    }
+
+
+def faq_document(faq):
+    from django.urls import reverse
+    return {
+        'title': faq.question,
+        'body': _join(faq.category, faq.answer),
+        'url': reverse('contact:faq'),
+    }
+
+
+def service_document(service):
+    from django.urls import reverse
+    return {
+        'title': service.title,
+        'body': _join(service.description, service.features),
+        'url': reverse('home:services'),
+    }
+
+
+SOURCES = {
+    'post': SearchSource('post', 'blog.Post', Q(status='published'), weight=1.0),
+    'project': SearchSource('project', 'projects.Project', Q(is_published=True), weight=1.2),
+    'faq': SearchSource('faq', 'contact.FAQ', Q(is_active=True), weight=0.8),
+    'service': SearchSource('service', 'home.Service', Q(is_active=True), weight=0.9),
+}
+
+BUILDERS = {
+    'post': post_document,
+    'project': project_document,
+    'faq': faq_document,
+    'service': service_document,
+}
+
+
+def source_for_model(model):
+    label = model._meta.label
+    for source in SOURCES.values():
+        if source.model == label:
+            return source
+    return None
+
+
+def build_document(source, instance):
+    data = BUILDERS[source.doc_type](instance)
+    return SearchDocument(
+        doc_type=source.doc_type,
+        object_id=instance.pk,
+        weight=source.weight,
+        **data
+    )
+
+
+def _fts_remove(ids):
+    if connection.vendor != 'sqlite' or not ids:
+        return
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM core_searchdocument_fts WHERE rowid IN ({placeholders})", ids
+        )
+
+
+def _fts_index(ids):
+    if connection.vendor != 'sqlite' or not ids:
+        return
+    _fts_remove(ids)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO core_searchdocument_fts (rowid, title, body) "
+            f"SELECT id, title, body FROM core_searchdocument WHERE id IN ({placeholders})",
+            ids,
+        )
+
+
+def documents_changed():
+    """Purge cached search result pages"""
+    page_cache.invalidate_tags(page_cache.list_tag(SearchDocument))
+
+
+def save_documents(documents):
+    """Insert or update documents in one statement"""
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['doc_type', 'object_id'],
+        update_fields=['title', 'body', 'url', 'weight', 'updated_at'],
+        batch_size=500,
+    )
+    if connection.vendor == 'sqlite':
+        # Upserts do not return ids here; look them up for the FTS rows
+        by_type = {}
+        for document in documents:
+            by_type.setdefault(document.doc_type, []).append(document.object_id)
+        for doc_type, object_ids in by_type.items():
+            _fts_index(list(
+                SearchDocument.objects.filter(doc_type=doc_type, object_id__in=object_ids)
+                .values_list('pk', flat=True)
+            ))
+    documents_changed()
+
+
+def delete_documents(queryset):
+    """Delete ``queryset``'s documents and their index rows; return how many"""
+    ids = list(queryset.values_list('pk', flat=True))
+    if not ids:
+        return 0
+    _fts_remove(ids)
+    SearchDocument.objects.filter(pk__in=ids).delete()
+    documents_changed()
+    return len(ids)
+
+
+def index_object(instance):
+    """Add, update or remove the document for ``instance``"""
+    source = source_for_model(type(instance))
+    if source is None:
+        return
+    if source.is_visible(instance):
+        save_documents([build_document(source, instance)])
+    else:
+        remove_object(source.doc_type, instance.pk)
+
+
+@task
+def reindex_object(label, pk):
+    """Task form of ``index_object``; deleted rows are left to ``remove_object``"""
+    instance = apps.get_model(label)._default_manager.filter(pk=pk).first()
+    if instance is not None:
+        index_object(instance)
+
+
+@task
+def reindex_objects(label, pks):
+    """Refresh the documents of several ``label`` rows (tag renames)"""
+    model = apps.get_model(label)
+    source = source_for_model(model)
+    visible = source.queryset().filter(pk__in=pks)
+    if label == 'blog.Post':
+        visible = visible.prefetch_related('tags')
+    elif label == 'projects.Project':
+        visible = visible.prefetch_related('technologies')
+    documents = [build_document(source, instance) for instance in visible]
+    if documents:
+        save_documents(documents)
+    hidden = set(pks) - {document.object_id for document in documents}
+    if hidden:
+        delete_documents(
+            SearchDocument.objects.filter(doc_type=source.doc_type, object_id__in=hidden)
+        )
+
+
+@task
+def remove_object(doc_type, object_id):
+    delete_documents(SearchDocument.objects.filter(doc_type=doc_type, object_id=object_id))
+
+
+def search(query, doc_types=None, limit=50):
+    """Return SearchDocuments matching ``query``, best first"""
+    tokens = WORD_RE.findall(query.lower())[:16]
+    if not tokens:
+        return SearchDocument.objects.none()
+    
+    documents = SearchDocument.objects.all()
+    if doc_types:
+        documents = documents.filter(doc_type__in=doc_types)
+    
+    if connection.vendor == 'postgresql':
+        # Plain words only; the last one is a prefix match
+        tsquery = ' & '.join(f"'{token}'" for token in tokens) + ':*'
+        rank = RawSQL(
+            "ts_rank_cd(core_searchdocument.search_vector, to_tsquery('english', %s))",
+            [tsquery],
+        )
+        return (
+            documents
+            .extra(
+                where=["core_searchdocument.search_vector @@ to_tsquery('english', %s)"],
+                params=[tsquery],
+            )
+            .annotate(rank=rank * F('weight'))
+            .order_by('-rank', '-updated_at')[:limit]
+        )
+    
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{token}"' for token in tokens) + '*'
+        params = [match]
+        type_filter = ''
+        if doc_types:
+            type_filter = f"AND d.doc_type IN ({', '.join(['%s'] * len(doc_types))})"
+            params += list(doc_types)
+        # bm25 is "lower is better"; title hits count ten times a body hit
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT d.id, -bm25(core_searchdocument_fts, 10.0, 1.0) * d.weight AS rank
+                FROM core_searchdocument_fts f
+                JOIN core_searchdocument d ON d.id = f.rowid
+                WHERE core_searchdocument_fts MATCH %s {type_filter}
+                ORDER BY rank DESC, d.updated_at DESC
+                LIMIT %s
+                """,
+                params + [limit],
+            )
+            ranks = dict(cursor.fetchall())
+        if not ranks:
+            return SearchDocument.objects.none()
+        rank = Case(
+            *(When(pk=pk, then=Value(value)) for pk, value in ranks.items()),
+            output_field=FloatField(),
+        )
+        return (
+            SearchDocument.objects.filter(pk__in=list(ranks))
+            .annotate(rank=rank)
+            .order_by('-rank', '-updated_at')
+        )
+    
+    # Portable ranking: every token must match; title matches count triple
+    match = Q()
+    score = Value(0.0)
+    for token in tokens:
+        match &= Q(title__icontains=token) | Q(body__icontains=token)
+        score = score + Case(
+            When(title__icontains=token, then=Value(3.0)),
+            default=Value(1.0),
+            output_field=FloatField(),
+        )
+    return (
+        documents.filter(match)
+        .annotate(rank=score * F('weight'))
+        .order_by('-rank', '-updated_at')[:limit]
+    )
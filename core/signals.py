@@ -0,0 +1,206 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+
+from . import images, neighbours, page_cache, search, typeahead
+
+
+def document_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.reindex_object.delay(sender._meta.label, instance.pk)
+
+
+def document_deleted(sender, instance, **kwargs):
+    source = search.source_for_model(sender)
+    search.remove_object.delay(source.doc_type, instance.pk)
+
+
+def document_m2m_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # Tags/technologies are part of the document body
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        search.reindex_object.delay(instance._meta.label, instance.pk)
+    elif pk_set:
+        for pk in pk_set:
+            search.reindex_object.delay(model._meta.label, pk)
+
+
+# Tag-like models whose names are part of other documents' bodies
+DOCUMENT_TAGS = {
+    'blog.Tag': ('blog.Post', 'posts'),
+    'projects.Technology': ('projects.Project', 'projects'),
+}
+
+
+def document_tag_changed(sender, instance, raw=False, created=False, **kwargs):
+    """Reindex the documents listing a renamed or deleted tag"""
+    if raw or created:
+        return
+    label, related_name = DOCUMENT_TAGS[sender._meta.label]
+    pks = list(getattr(instance, related_name).values_list('pk', flat=True))
+    if pks:
+        search.reindex_objects.delay(label, pks)
+
+
+def connect():
+    """Connect index maintenance signals for every search source"""
+    for source in search.SOURCES.values():
+        model = source.get_model()
+        uid = f'core.search.{source.doc_type}'
+        post_save.connect(document_saved, sender=model, dispatch_uid=uid)
+        post_delete.connect(document_deleted, sender=model, dispatch_uid=uid)
+    
+    from blog.models import Post
+    from projects.models import Project
+    m2m_changed.connect(document_m2m_changed, sender=Post.tags.through, dispatch_uid='core.search.post.tags')
+    m2m_changed.connect(document_m2m_changed, sender=Project.technologies.through, dispatch_uid='core.search.project.technologies')
+    for label in DOCUMENT_TAGS:
+        uid = f'core.search.{label}'
+        post_save.connect(document_tag_changed, sender=label, dispatch_uid=uid)
+        pre_delete.connect(document_tag_changed, sender=label, dispatch_uid=uid)
+    
+    for label in TYPEAHEAD_SOURCES:
+        uid = f'core.typeahead.{label}'
+        post_save.connect(typeahead_changed, sender=label, dispatch_uid=uid)
+        post_delete.connect(typeahead_changed, sender=label, dispatch_uid=uid)
+    for through in (Post.tags.through, Project.technologies.through):
+        m2m_changed.connect(typeahead_m2m_changed, sender=through, dispatch_uid=f'core.typeahead.{through._meta.label}')
+
+
+TYPEAHEAD_SOURCES = {
+    'blog.Post': 'post',
+    'blog.Tag': 'post',
+    'projects.Project': 'project',
+    'projects.Technology': 'project',
+}
+
+
+def typeahead_changed(sender, **kwargs):
+    if kwargs.get('raw'):
+        return
+    scope = TYPEAHEAD_SOURCES[sender._meta.label]
+    transaction.on_commit(lambda: typeahead.invalidate(scope))
+
+
+def typeahead_m2m_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        scope = 'post' if sender._meta.label == 'blog.Post_tags' else 'project'
+        transaction.on_commit(lambda: typeahead.invalidate(scope))
+
+
+def page_changed(sender, instance, raw=False, created=False, **kwargs):
+    """Purge cached pages that rendered ``instance``; lists too if membership changed"""
+    if raw:
+        return
+    tags = [page_cache.obj_tag(instance), page_cache.model_tag(sender)]
+    if created or getattr(instance, '_page_cache_list_changed', True):
+        tags.append(page_cache.list_tag(sender))
+    if sender._meta.label in page_cache.SITE_WIDE_MODELS:
+        tags.append('site')
+    transaction.on_commit(lambda: page_cache.invalidate_tags(*tags))
+
+
+def page_list_fields(model):
+    """Fields that decide whether or where a row appears in listings"""
+    concrete = {f.name: f for f in model._meta.concrete_fields}
+    names = {
+        name.lstrip('-') for name in model._meta.ordering
+        if isinstance(name, str) and name.lstrip('-') in concrete
+    }
+    names.update(
+        name for name in concrete
+        if name.startswith('is_') or name in ('status', 'featured', 'category')
+    )
+    return sorted(concrete[name].attname for name in names)
+
+
+def page_pre_save(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    fields = page_list_fields(sender)
+    old = sender._default_manager.filter(pk=instance.pk).values(*fields).first()
+    instance._page_cache_list_changed = old is None or any(
+        old[name] != getattr(instance, name) for name in fields
+    )
+
+
+def page_deleted(sender, instance, **kwargs):
+    tags = [
+        page_cache.obj_tag(instance),
+        page_cache.list_tag(sender),
+        page_cache.model_tag(sender),
+    ]
+    if sender._meta.label in page_cache.SITE_WIDE_MODELS:
+        tags.append('site')
+    transaction.on_commit(lambda: page_cache.invalidate_tags(*tags))
+
+
+def page_m2m_changed(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        tags = [page_cache.obj_tag(instance), page_cache.model_tag(type(instance))]
+        transaction.on_commit(lambda: page_cache.invalidate_tags(*tags))
+
+
+def connect_page_cache():
+    """Connect page cache invalidation for every content model"""
+    from django.apps import apps
+    for app_label in ('home', 'projects', 'blog', 'contact'):
+        for model in apps.get_app_config(app_label).get_models():
+            if model._meta.label in page_cache.IGNORED_MODELS:
+                continue
+            uid = f'core.page_cache.{model._meta.label}'
+            pre_save.connect(page_pre_save, sender=model, dispatch_uid=uid)
+            post_save.connect(page_changed, sender=model, dispatch_uid=uid)
+            post_delete.connect(page_deleted, sender=model, dispatch_uid=uid)
+            for m2m in model._meta.local_many_to_many:
+                m2m_changed.connect(
+                    page_m2m_changed, sender=m2m.remote_field.through,
+                    dispatch_uid=f'{uid}.{m2m.name}'
+                )
+
+
+def neighbours_pre_save(sender, instance, raw=False, **kwargs):
+    instance._neighbours_old = None
+    if raw or instance.pk is None:
+        return
+    sequence = neighbours.sequence_for_model(sender)
+    instance._neighbours_old = sender._default_manager.filter(
+        pk=instance.pk
+    ).values(*sequence.watched).first()
+
+
+def neighbours_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sequence = neighbours.sequence_for_model(sender)
+    if sequence.affects(getattr(instance, '_neighbours_old', None), instance):
+        neighbours.invalidate(sequence)
+
+
+def neighbours_deleted(sender, instance, **kwargs):
+    sequence = neighbours.sequence_for_model(sender)
+    if sequence.is_visible({name: getattr(instance, name) for name in sequence.watched}):
+        neighbours.invalidate(sequence)
+
+
+def connect_neighbours():
+    """Connect previous/next cache invalidation for every sequence"""
+    for label in neighbours.SEQUENCES:
+        uid = f'core.neighbours.{label}'
+        pre_save.connect(neighbours_pre_save, sender=label, dispatch_uid=uid)
+        post_save.connect(neighbours_saved, sender=label, dispatch_uid=uid)
+        post_delete.connect(neighbours_deleted, sender=label, dispatch_uid=uid)
+
+
+def image_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pending = images.pending_fields(instance)
+    if pending:
+        images.schedule(instance, pending)
+
+
+def connect_images():
+    """Generate responsive variants for uploads in every image field"""
+    for label in images.IMAGE_FIELDS:
+        post_save.connect(image_saved, sender=label, dispatch_uid=f'core.images.{label}')
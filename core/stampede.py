@@ -0,0 +1,170 @@
+"""
+Stampede-safe cache reads for values that are expensive to rebuild.
+
+``get_or_set`` combines three defences:
+
+* single flight: only the caller that wins ``cache.add`` on a lock key
+  recomputes; everyone else serves the previous value or waits briefly for
+  the winner's result,
+* probabilistic early recomputation (XFetch): as an entry nears its soft
+  expiry, readers recompute early with rising probability, scaled by how long
+  the last rebuild took, so one request usually refreshes it before anyone
+  sees a miss,
+* stale-while-revalidate: entries outlive their soft expiry by
+  ``stale_timeout``; in that window readers get the old value while one
+  caller refreshes it, optionally in a background thread.
+
+Entries are stored as ``{'value', 'expires', 'delta'}``. Callers that cannot
+express the rebuild as a function (the page cache renders the response for
+the current request) use ``acquire`` / ``release`` / ``wait_for`` directly.
+
+The lock is as shared as the cache backend: across gunicorn processes with a
+shared cache, within one process with LocMemCache.
+"""
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from . import metrics
+
+logger = logging.getLogger('django')
+
+
+def _setting(name, default):
+    return getattr(settings, f'STAMPEDE_{name}', default)
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def acquire(key):
+    """Try to become the one caller rebuilding ``key``; return a token or None"""
+    token = uuid.uuid4().hex
+    if cache.add(_lock_key(key), token, _setting('LOCK_TIMEOUT', 30)):
+        return token
+    return None
+
+
+def release(key, token):
+    lock_key = _lock_key(key)
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def wait_for(key, timeout=None):
+    """Poll for the entry another caller is building.
+
+    Returns None on timeout, or as soon as the lock is released without an
+    entry being stored (the rebuild failed or was not cacheable).
+    """
+    if timeout is None:
+        timeout = _setting('WAIT_TIMEOUT', 3)
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 0.2)
+        found = cache.get_many([key, _lock_key(key)])
+        if key in found:
+            return found[key]
+        if _lock_key(key) not in found:
+            return None
+    return None
+
+
+def is_fresh(entry, beta=None):
+    """XFetch check: False once expired, and with rising probability shortly before"""
+    if beta is None:
+        beta = _setting('BETA', 1.0)
+    now = time.time()
+    delta = entry.get('delta') or 0
+    if beta and delta:
+        # -log(u) for u in (0, 1] is an exponential draw: usually small, sometimes large
+        now -= delta * beta * math.log(1.0 - random.random())
+    return now < entry['expires']
+
+
+def store(key, value, timeout, delta=0.0, stale_timeout=None):
+    """Cache ``value`` fresh for ``timeout`` seconds and stale for ``stale_timeout`` more"""
+    if stale_timeout is None:
+        stale_timeout = _setting('STALE_TIMEOUT', 300)
+    entry = {'value': value, 'expires': time.time() + timeout, 'delta': delta}
+    cache.set(key, entry, timeout + stale_timeout)
+    return entry
+
+
+def expire(key, stale_timeout=None):
+    """Mark ``key`` for rebuild but keep serving its value while that happens"""
+    entry = cache.get(key)
+    if entry is None:
+        return
+    if stale_timeout is None:
+        stale_timeout = _setting('STALE_TIMEOUT', 300)
+    entry['expires'] = 0
+    cache.set(key, entry, stale_timeout)
+
+
+def _rebuild(key, compute, timeout, stale_timeout):
+    started = time.perf_counter()
+    value = compute()
+    store(key, value, timeout, time.perf_counter() - started, stale_timeout)
+    metrics.incr('stampede.rebuild')
+    return value
+
+
+def _rebuild_in_background(key, compute, timeout, stale_timeout, token):
+    def run():
+        try:
+            _rebuild(key, compute, timeout, stale_timeout)
+        except Exception as e:
+            logger.error(f"Background rebuild of '{key}' failed: {e}")
+        finally:
+            release(key, token)
+            connection.close()
+
+    threading.Thread(target=run, name=f'stampede-{key}', daemon=True).start()
+
+
+def get_or_set(key, compute, timeout, stale_timeout=None, beta=None,
+               wait_timeout=None, background=False):
+    """Return the cached value for ``key``, calling ``compute()`` at most once
+    across concurrent callers when it needs rebuilding.
+
+    With ``background=True`` a stale value is returned immediately and the
+    rebuild runs in a daemon thread.
+    """
+    entry = cache.get(key)
+    if entry is not None and is_fresh(entry, beta):
+        metrics.incr('stampede.hit')
+        return entry['value']
+
+    token = acquire(key)
+    if token is None:
+        if entry is not None:
+            metrics.incr('stampede.stale')
+            return entry['value']
+        entry = wait_for(key, wait_timeout)
+        if entry is not None:
+            metrics.incr('stampede.waited')
+            return entry['value']
+        # The winner failed or is too slow; rebuild rather than fail the request
+        metrics.incr('stampede.wait_timeout')
+        return _rebuild(key, compute, timeout, stale_timeout)
+
+    if entry is not None and background:
+        metrics.incr('stampede.stale')
+        _rebuild_in_background(key, compute, timeout, stale_timeout, token)
+        return entry['value']
+
+    try:
+        return _rebuild(key, compute, timeout, stale_timeout)
+    finally:
+        release(key, token)
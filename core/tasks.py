@@ -0,0 +1,174 @@
+"""
+Database-backed background tasks.
+
+``@task`` marks a function as a task. ``func.delay(*args, **kwargs)`` stores a
+``core.models.Task`` row in the current transaction, so the job exists only
+if the surrounding write commits, and ``manage.py run_tasks`` executes it.
+Arguments must be JSON-serializable: pass primary keys, not instances.
+
+Workers claim due rows with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+database supports it, and with a conditional UPDATE elsewhere (SQLite), so
+several workers can share the table without a broker. A failing task is
+retried with exponential backoff plus jitter: ``TASK_RETRY_BASE_DELAY`` *
+2 ** (attempt - 1) seconds, capped at ``TASK_RETRY_MAX_DELAY``. After
+``max_attempts`` the row stays in the table with status ``dead`` and the
+last traceback; that is the dead-letter queue, retried from the admin. Rows
+left ``running`` by a crashed worker are reclaimed after ``TASK_LOCK_TIMEOUT``
+seconds.
+
+With ``TASKS_EAGER`` on (tests, local development without a worker),
+``delay`` runs the task in-process once the transaction commits.
+"""
+import functools
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import metrics
+
+logger = logging.getLogger('django')
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+def task(func=None, *, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Register ``func`` as a task and give it ``delay()``"""
+    if func is None:
+        return functools.partial(task, max_attempts=max_attempts)
+    func.task_name = f'{func.__module__}.{func.__qualname__}'
+    func.max_attempts = max_attempts
+    func.delay = functools.partial(enqueue, func)
+    return func
+
+
+def enqueue(func, *args, **kwargs):
+    """Queue ``func(*args, **kwargs)``; returns the Task row (None when eager)"""
+    from .models import Task
+    metrics.incr('tasks.enqueued')
+    if getattr(settings, 'TASKS_EAGER', False):
+        transaction.on_commit(lambda: _run_eager(func, args, kwargs))
+        return None
+    return Task.objects.create(
+        name=func.task_name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=func.max_attempts,
+    )
+
+
+def _run_eager(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+        metrics.incr('tasks.succeeded')
+    except Exception as e:
+        metrics.incr('tasks.failed')
+        logger.error(f"Task {func.task_name} failed: {e}")
+
+
+def resolve(name):
+    func = import_string(name)
+    if getattr(func, 'task_name', None) != name:
+        raise ImportError(f"{name} is not a registered task")
+    return func
+
+
+def backoff(attempt):
+    """Seconds to wait before retrying after failed attempt number ``attempt``"""
+    base = getattr(settings, 'TASK_RETRY_BASE_DELAY', 10)
+    cap = getattr(settings, 'TASK_RETRY_MAX_DELAY', 60 * 60)
+    delay = min(cap, base * 2 ** (attempt - 1))
+    # Jitter spreads retries of tasks that failed together
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim(worker, limit):
+    """Mark up to ``limit`` due tasks as running for ``worker``; return them"""
+    from .models import Task
+    now = timezone.now()
+    due = Task.objects.filter(status=Task.QUEUED, run_at__lte=now).order_by('run_at', 'id')
+    changes = {
+        'status': Task.RUNNING,
+        'locked_at': now,
+        'locked_by': worker,
+        'attempts': F('attempts') + 1,
+    }
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                due.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit]
+            )
+            Task.objects.filter(pk__in=ids).update(**changes)
+    else:
+        # Whoever flips the status first owns the task
+        ids = [
+            pk for pk in due.values_list('pk', flat=True)[:limit]
+            if Task.objects.filter(pk=pk, status=Task.QUEUED).update(**changes)
+        ]
+    return list(Task.objects.filter(pk__in=ids).order_by('run_at', 'id'))
+
+
+def fail(task_row, error):
+    """Schedule a retry for ``task_row``, or move it to the dead letters"""
+    from .models import Task
+    changes = {'locked_at': None, 'locked_by': '', 'last_error': error}
+    if task_row.attempts >= task_row.max_attempts:
+        changes['status'] = Task.DEAD
+        metrics.incr('tasks.dead')
+        logger.error(
+            f"Task {task_row.name} #{task_row.pk} failed {task_row.attempts} time(s), giving up"
+        )
+    else:
+        changes['status'] = Task.QUEUED
+        changes['run_at'] = timezone.now() + timedelta(seconds=backoff(task_row.attempts))
+        metrics.incr('tasks.retried')
+    Task.objects.filter(pk=task_row.pk).update(**changes)
+
+
+def execute(task_row):
+    """Run a claimed task; delete it on success, retry or bury it on failure"""
+    from .models import Task
+    try:
+        func = resolve(task_row.name)
+        func(*task_row.args, **task_row.kwargs)
+    except Exception:
+        fail(task_row, traceback.format_exc())
+        return False
+    Task.objects.filter(pk=task_row.pk).delete()
+    metrics.incr('tasks.succeeded')
+    return True
+
+
+def reclaim_stale():
+    """Fail tasks whose worker stopped responding mid-run"""
+    from .models import Task
+    timeout = getattr(settings, 'TASK_LOCK_TIMEOUT', 10 * 60)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = Task.objects.filter(status=Task.RUNNING, locked_at__lt=cutoff)
+    for task_row in stale:
+        fail(task_row, f"Worker {task_row.locked_by} did not finish within {timeout}s")
+    return len(stale)
+
+
+def run_pending(worker, limit=10):
+    """Claim and run one batch of due tasks; return how many ran"""
+    reclaim_stale()
+    claimed = claim(worker, limit)
+    for task_row in claimed:
+        execute(task_row)
+    return len(claimed)
+
+
+def retry(queryset):
+    """Re-queue dead (or stuck) tasks with a fresh attempt budget"""
+    from .models import Task
+    return queryset.update(
+        status=Task.QUEUED, attempts=0, run_at=timezone.now(),
+        locked_at=None, locked_by='',
+    )
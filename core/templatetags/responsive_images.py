@@ -0,0 +1,46 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from .. import images
+
+register = template.Library()
+
+
+def _srcset(storage, variants):
+    return ', '.join(f'{storage.url(name)} {width}w' for width, name in variants)
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', **attrs):
+    """``<picture>`` with AVIF/WebP/fallback ``srcset``s for an uploaded image.
+
+    Extra keyword arguments (``class``, ``loading``...) become ``<img>``
+    attributes. Until the variants exist this is a plain ``<img>`` of the
+    original.
+    """
+    if not image:
+        return ''
+    attrs = {'loading': 'lazy', 'decoding': 'async', **attrs, 'alt': alt}
+    manifest = images.get_manifest(image.name)
+    if manifest is None:
+        return format_html('<img src="{}"{}>', image.url, flatatt(attrs))
+
+    storage = image.storage
+    variants = manifest['variants']
+    fallback_format = 'png' if 'png' in variants else 'jpeg'
+    fallback = variants[fallback_format]
+    # Browsers without srcset get a mid-sized fallback, not the largest
+    src = next((name for width, name in reversed(fallback) if width <= 1280), fallback[0][1])
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (images.FORMATS[format_name][1], _srcset(storage, variants[format_name]), sizes)
+            for format_name in variants if format_name != fallback_format
+        ),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}"{}></picture>',
+        sources, storage.url(src), _srcset(storage, fallback), sizes,
+        manifest['width'], manifest['height'], flatatt(attrs),
+    )
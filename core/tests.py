@@ -0,0 +1,629 @@
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.mail import get_connection, send_mail
+from django.db import connection, connections
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.utils import timezone
+
+from blog import fragments as blog_fragments
+from blog.models import Category, Post
+from contact.models import ContactMessage
+from projects.models import Project
+
+from . import mail, metrics, neighbours, ratelimit, stampede, tasks, typeahead
+from .counters import BufferedCounter
+from .models import Task
+from .pagination import KeysetPaginator
+
+class BackgroundFlusherTests(TransactionTestCase):
+    """The flusher thread recovers from a connection broken by a database restart"""
+
+    def setUp(self):
+        author = User.objects.create(username='author')
+        self.post = Post.objects.create(title='Post', slug='post', content='Body', author=author)
+        self.counter = BufferedCounter('test_counter')
+
+    def run_flusher(self):
+        """Two flushes on one thread's connection, killed before the first"""
+        results = []
+
+        def run():
+            # A persistent connection (CONN_MAX_AGE) left dead by a restart,
+            # which the backend then reports unusable
+            connection.ensure_connection()
+            connection.close_at = None
+            connection.connection.close()
+            with mock.patch.object(backend, 'is_usable', return_value=False):
+                results.append((self.counter.flush_from_thread(), self.counter.pending(self.post)))
+            results.append((self.counter.flush_from_thread(), self.counter.pending(self.post)))
+
+        backend = type(connections['default'])
+        # SQLite ignores close() on the in-memory test database; the main
+        # thread's connection keeps it alive, so let this thread's close
+        with mock.patch.object(backend, 'is_in_memory_db', return_value=False):
+            thread = threading.Thread(target=run)
+            thread.start()
+            thread.join()
+        return results
+
+    def test_flush_recovers_after_connection_loss(self):
+        with mock.patch.object(self.counter, 'ensure_started'):
+            self.counter.incr(self.post)
+        with self.assertLogs('django', 'ERROR'):
+            failed, recovered = self.run_flusher()
+        # The failed flush keeps the increment for the next one
+        self.assertEqual(failed, (0, 1))
+        self.assertEqual(recovered, (1, 0))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 1)
+
+
+@override_settings(TASKS_EAGER=False, TYPEAHEAD_VERSION_CHECK=0)
+class TypeaheadTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author')
+
+    def test_rebuild_inside_transaction_runs_inline(self):
+        registry = typeahead.TypeaheadRegistry()
+        self.assertEqual(registry.get('post').search('kestrel', 5)[0], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(
+                title='Kestrel notes', slug='kestrel', content='Body', author=self.author,
+                status='published', published_at=timezone.now(),
+            )
+        # A rebuild thread would race this test's transaction
+        with mock.patch('threading.Thread') as thread:
+            results, _confident = registry.get('post').search('kestrel', 5)
+        thread.assert_not_called()
+        self.assertEqual([result['slug'] for result in results], ['kestrel'])
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class PageCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='author')
+        cls.category = Category.objects.create(name='Notes', slug='notes')
+        cls.post = Post.objects.create(
+            title='Caching pages', slug='caching-pages', content='Body', author=author,
+            category=cls.category, status='published',
+        )
+        cls.project = Project.objects.create(
+            title='Cache server', slug='cache-server', description='Caching', content='Content',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hits_keep_response_middleware_headers(self):
+        url = '/blog/ajax/search/?q=caching'
+        miss = self.client.get(url)
+        hit = self.client.get(url)
+        self.assertEqual(miss['X-Page-Cache'], 'MISS')
+        self.assertEqual(hit['X-Page-Cache'], 'HIT')
+        self.assertEqual(hit['X-Frame-Options'], miss['X-Frame-Options'])
+
+    def test_post_search_purged_by_post_and_category_edits(self):
+        url = '/blog/ajax/search/?q=caching'
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.subtitle = 'Edited'
+            self.post.save()
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'MISS')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Renamed'
+            self.category.save()
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'HIT')
+
+    def test_sitemap_purged_by_publishing(self):
+        self.client.get('/sitemap.xml')
+        self.assertEqual(self.client.get('/sitemap.xml')['X-Page-Cache'], 'HIT')
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(
+                title='Fresh post', slug='fresh-post', content='Body', author=self.post.author,
+                status='published',
+            )
+        response = self.client.get('/sitemap.xml')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, post.get_absolute_url())
+
+    def test_project_search_purged_by_project_edits(self):
+        url = '/projects/ajax/search/?q=cache'
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.description = 'Edited'
+            self.project.save()
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'MISS')
+
+
+@override_settings(CONDITIONAL_GET_ENABLED=True)
+class ConditionalGetTests(TestCase):
+    URL = '/blog/'
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='author')
+        cls.category = Category.objects.create(name='Notes', slug='notes')
+        cls.posts = [
+            Post.objects.create(
+                title=f'Post {i}', slug=f'post-{i}', content='Body', author=author,
+                category=cls.category, status='published',
+            )
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def later(self):
+        """Run the next change a few seconds on, past Last-Modified's resolution"""
+        return mock.patch('time.time_ns', return_value=time.time_ns() + 5 * 10 ** 9)
+
+    def revalidate(self, first):
+        return (
+            self.client.get(self.URL, HTTP_IF_NONE_MATCH=first['ETag']),
+            self.client.get(self.URL, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']),
+        )
+
+    def assertModified(self, first):
+        by_etag, by_date = self.revalidate(first)
+        self.assertEqual((by_etag.status_code, by_date.status_code), (200, 200))
+        self.assertNotEqual(by_etag['ETag'], first['ETag'])
+
+    def test_unchanged_page_answers_304(self):
+        first = self.client.get(self.URL)
+        by_etag, by_date = self.revalidate(first)
+        self.assertEqual((by_etag.status_code, by_date.status_code), (304, 304))
+
+    def test_category_rename_changes_validators(self):
+        first = self.client.get(self.URL)
+        with self.later(), self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Renamed'
+            self.category.save()
+        self.assertModified(first)
+
+    def test_delete_changes_validators(self):
+        first = self.client.get(self.URL)
+        with self.later(), self.captureOnCommitCallbacks(execute=True):
+            self.posts[1].delete()
+        self.assertModified(first)
+
+    @override_settings(CONDITIONAL_GET_ENABLED=False)
+    def test_no_validators_without_shared_cache(self):
+        response = self.client.get(self.URL)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+
+class StampedeTests(SimpleTestCase):
+    """Concurrent misses on one key rebuild it exactly once"""
+    CALLERS = 200
+
+    def stampede(self, key, **kwargs):
+        rebuilds = []
+        results = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(self.CALLERS)
+
+        def compute():
+            with lock:
+                rebuilds.append(threading.get_ident())
+            time.sleep(0.2)
+            return 'fresh'
+
+        def caller():
+            try:
+                barrier.wait()
+                value = stampede.get_or_set(key, compute, timeout=60, **kwargs)
+                with lock:
+                    results.append(value)
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(self.CALLERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), self.CALLERS)
+        return rebuilds, results
+
+    def test_cold_key_rebuilt_once(self):
+        rebuilds, results = self.stampede(f'stampede:test:{uuid.uuid4().hex}', wait_timeout=10)
+        self.assertEqual(len(rebuilds), 1)
+        self.assertEqual(set(results), {'fresh'})
+
+    def test_expired_key_rebuilt_once_while_serving_stale(self):
+        key = f'stampede:test:{uuid.uuid4().hex}'
+        stampede.store(key, 'stale', 60)
+        stampede.expire(key)
+        rebuilds, results = self.stampede(key)
+        self.assertEqual(len(rebuilds), 1)
+        self.assertEqual(results.count('fresh'), 1)
+        self.assertEqual(results.count('stale'), self.CALLERS - 1)
+        self.assertEqual(stampede.get_or_set(key, lambda: 'again', timeout=60), 'fresh')
+
+
+@override_settings(FRAGMENT_CACHE_ENABLED=True)
+class FragmentCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        Category.objects.create(name='Notes', slug='notes')
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def test_sidebar_cached_until_its_tags_change(self):
+        self.assertIn('Notes', blog_fragments.render_categories())
+        blog_fragments.render_categories()
+        self.assertEqual(metrics.get('fragment.hit'), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Gardening', slug='gardening')
+        self.assertIn('Gardening', blog_fragments.render_categories())
+
+    def test_publishing_refreshes_recent_posts(self):
+        post = Post.objects.create(
+            title='Draft thoughts', slug='draft-thoughts', content='Body', author=self.author,
+        )
+        self.assertNotIn('Draft thoughts', blog_fragments.render_recent_posts())
+        with self.captureOnCommitCallbacks(execute=True):
+            post.status = 'published'
+            post.save()
+        self.assertIn('Draft thoughts', blog_fragments.render_recent_posts())
+
+    @override_settings(FRAGMENT_CACHE_ENABLED=False)
+    def test_renders_live_without_shared_cache(self):
+        blog_fragments.render_categories()
+        # As if saved by another worker: no invalidation reaches this one
+        Category.objects.bulk_create([Category(name='Gardening', slug='gardening')])
+        self.assertIn('Gardening', blog_fragments.render_categories())
+
+
+class KeysetPaginatorTests(TestCase):
+    """Cursor pages follow the model's own ORDER BY, NULL keys included"""
+    KEYS = ['-is_featured', '-published_at', '-created_at', 'id']
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='author')
+        now = timezone.now()
+        for i in range(14):
+            Post.objects.create(
+                title=f'Post {i}', slug=f'post-{i}', content='Body', author=author,
+                status='published', is_featured=i % 5 == 0,
+                # Some unpublished dates, and some ties
+                published_at=None if i % 4 == 0 else now - timedelta(days=i // 2),
+            )
+
+    def walk(self, paginator):
+        rows, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            rows.extend(page)
+            if not page.has_next():
+                return rows
+            cursor = page.next_cursor
+
+    def test_order_matches_meta_ordering(self):
+        paginator = KeysetPaginator(Post.objects.all(), self.KEYS, 3)
+        queryset = Post.objects.order_by(*paginator.ordering())
+        self.assertNotIn('NULLS', str(queryset.query))
+        self.assertEqual(
+            list(queryset),
+            list(Post.objects.order_by(*Post._meta.ordering, 'id')),
+        )
+
+    def test_pages_cover_every_row_in_order(self):
+        paginator = KeysetPaginator(Post.objects.all(), self.KEYS, 3)
+        expected = list(Post.objects.order_by(*paginator.ordering()))
+        self.assertEqual(self.walk(paginator), expected)
+
+    def test_before_is_the_mirror_of_after(self):
+        paginator = KeysetPaginator(Post.objects.all(), self.KEYS, 1)
+        expected = list(Post.objects.order_by(*paginator.ordering()))
+        for previous, post in zip(expected, expected[1:]):
+            values = paginator.values(post)
+            found = Post.objects.filter(paginator.before(values)).order_by(
+                *paginator.ordering(reverse=True)
+            ).first()
+            self.assertEqual(found, previous)
+
+
+class EstimatedCountAdminTests(TestCase):
+    """Changelists mark estimated counts and survive over-estimates"""
+    url = '/admin/contact/contactmessage/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        for i in range(3):
+            ContactMessage.objects.create(
+                name=f'Sender {i}', email=f'sender{i}@example.com', subject='Hello', message='Hi',
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_exact_count_shown_plainly(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, '3 contact messages')
+        self.assertNotContains(response, '~3')
+
+    def test_estimate_shown_as_approximate(self):
+        # Planner estimates need PostgreSQL; stand in a large over-estimate
+        with mock.patch('core.counts.estimated_count', return_value=(5000, True)):
+            response = self.client.get(self.url)
+        self.assertContains(response, '~5000 contact messages')
+
+    def test_page_past_estimate_is_clamped(self):
+        with mock.patch('core.counts.estimated_count', return_value=(5000, True)):
+            response = self.client.get(self.url, {'p': 999})
+        # Not the ?e=1 redirect an EmptyPage turns into
+        self.assertEqual(response.status_code, 200)
+
+
+RECORDED = []
+
+
+class NeighboursTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='author')
+        now = timezone.now()
+        cls.first, cls.middle, cls.draft, cls.last = [
+            Post.objects.create(
+                title=f'Post {i}', slug=f'post-{i}', content='Body', author=author,
+                status='draft' if i == 2 else 'published',
+                published_at=now - timedelta(days=4 - i),
+            )
+            for i in range(4)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_publishing_refreshes_links(self):
+        self.assertEqual(neighbours.get(self.middle), (self.first, self.last))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.status = 'published'
+            self.draft.save()
+        self.assertEqual(neighbours.get(self.middle), (self.first, self.draft))
+
+    def test_change_from_another_worker_shows_within_a_minute(self):
+        self.assertEqual(neighbours.get(self.middle), (self.first, self.last))
+        # Another worker's save bumps the version in its own LocMem cache only
+        Post.objects.filter(pk=self.draft.pk).update(status='published')
+        with mock.patch('time.time', return_value=time.time() + 61):
+            self.assertEqual(neighbours.get(self.middle), (self.first, self.draft))
+
+
+@tasks.task(max_attempts=3)
+def record(value):
+    RECORDED.append(value)
+
+
+@tasks.task(max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+@override_settings(TASKS_EAGER=False, TASK_RETRY_BASE_DELAY=10, TASK_LOCK_TIMEOUT=60)
+class TaskQueueTests(TestCase):
+
+    def setUp(self):
+        RECORDED.clear()
+
+    def test_claim_takes_each_due_task_once(self):
+        if connection.vendor == 'sqlite':
+            # The conditional UPDATE path, not SELECT ... SKIP LOCKED
+            self.assertFalse(connection.features.has_select_for_update_skip_locked)
+        first, second = record.delay(1), record.delay(2)
+        later = record.delay(3)
+        Task.objects.filter(pk=later.pk).update(run_at=timezone.now() + timedelta(hours=1))
+
+        claimed = tasks.claim('worker-a', 10)
+        self.assertEqual([row.pk for row in claimed], [first.pk, second.pk])
+        for row in claimed:
+            self.assertEqual((row.status, row.attempts, row.locked_by), (Task.RUNNING, 1, 'worker-a'))
+        self.assertEqual(tasks.claim('worker-b', 10), [])
+        self.assertEqual(Task.objects.get(pk=later.pk).status, Task.QUEUED)
+
+    def test_run_pending_executes_and_deletes(self):
+        record.delay('done')
+        self.assertEqual(tasks.run_pending('worker'), 1)
+        self.assertEqual(RECORDED, ['done'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failures_back_off_then_go_dead(self):
+        row = explode.delay()
+        before = timezone.now()
+        self.assertEqual(tasks.run_pending('worker'), 1)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts, row.locked_by), (Task.QUEUED, 1, ''))
+        self.assertIn('RuntimeError: boom', row.last_error)
+        # First retry waits TASK_RETRY_BASE_DELAY, jittered down to half
+        self.assertGreaterEqual(row.run_at, before + timedelta(seconds=5))
+        self.assertLessEqual(row.run_at, timezone.now() + timedelta(seconds=10))
+        self.assertEqual(tasks.run_pending('worker'), 0)
+
+        Task.objects.filter(pk=row.pk).update(run_at=timezone.now())
+        with self.assertLogs('django', 'ERROR'):
+            self.assertEqual(tasks.run_pending('worker'), 1)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), (Task.DEAD, 2))
+
+        tasks.retry(Task.objects.filter(pk=row.pk))
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), (Task.QUEUED, 0))
+
+    @override_settings(TASK_RETRY_MAX_DELAY=60)
+    def test_backoff_doubles_up_to_the_cap(self):
+        for attempt, delay in [(1, 10), (2, 20), (3, 40), (4, 60), (9, 60)]:
+            wait = tasks.backoff(attempt)
+            self.assertGreaterEqual(wait, delay / 2)
+            self.assertLessEqual(wait, delay)
+
+    def test_reclaim_stale_requeues_abandoned_tasks(self):
+        stale, busy = record.delay('stale'), record.delay('busy')
+        tasks.claim('crashed', 10)
+        Task.objects.filter(pk=stale.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertEqual(tasks.reclaim_stale(), 1)
+        stale.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual((stale.status, stale.locked_by), (Task.QUEUED, ''))
+        self.assertIn('crashed', stale.last_error)
+        self.assertEqual(busy.status, Task.RUNNING)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_runs_after_commit_without_rows(self):
+        with self.assertLogs('django', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            self.assertIsNone(record.delay('eager'))
+            self.assertEqual(RECORDED, [])
+            # Failures are logged, never raised into the request
+            explode.delay()
+        self.assertEqual(RECORDED, ['eager'])
+        self.assertFalse(Task.objects.exists())
+
+
+class SMTPSession(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: every command succeeds, DATA is recorded"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.reply('220 localhost ESMTP')
+        for line in self.rfile:
+            verb = line[:4].upper()
+            if verb in (b'EHLO', b'HELO'):
+                self.server.connections.append(self.request)
+                self.reply('250 localhost')
+            elif verb == b'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                body = []
+                for data in self.rfile:
+                    if data.rstrip(b'\r\n') == b'.':
+                        break
+                    body.append(data)
+                self.server.messages.append(b''.join(body))
+                self.reply('250 OK')
+            elif verb == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Local SMTP server recording each connection (by its EHLO) and message"""
+    daemon_threads = True
+
+    def __init__(self):
+        self.connections = []
+        self.messages = []
+        super().__init__(('127.0.0.1', 0), SMTPSession)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+@override_settings(EMAIL_POOL_HEALTH_CHECK=60, EMAIL_POOL_MAX_AGE=300)
+class PooledMailTests(SimpleTestCase):
+    SENDS = 50
+
+    def setUp(self):
+        self.server = SMTPStandIn()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(mail.close_pool)
+
+    def send(self, n):
+        connection = get_connection(
+            'core.mail.EmailBackend', host='127.0.0.1', port=self.server.port,
+            username='', password='', use_tls=False, use_ssl=False, timeout=5,
+        )
+        return send_mail('Hello', 'Body', 'from@example.com', [f'to{n}@example.com'],
+                         connection=connection)
+
+    def test_sends_share_one_connection(self):
+        timings = []
+        for n in range(self.SENDS):
+            started = time.perf_counter()
+            self.assertEqual(self.send(n), 1)
+            timings.append(time.perf_counter() - started)
+        self.assertEqual(len(self.server.messages), self.SENDS)
+        self.assertEqual(len(self.server.connections), 1)
+        # No connect or EHLO after the first: a pooled send is one round of commands
+        self.assertLess(max(timings[1:]), 0.25)
+        self.assertLess(sum(timings), 2.0)
+
+    def test_reconnects_after_server_drops_connection(self):
+        self.assertEqual(self.send(0), 1)
+        # The server side hangs up, as on an idle timeout
+        self.server.connections[0].shutdown(socket.SHUT_RDWR)
+
+        self.assertEqual(self.send(1), 1)
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(len(self.server.connections), 2)
+        self.assertEqual(self.send(2), 1)
+        self.assertEqual(len(self.server.connections), 2)
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS={'contact': {'ip': (2, 60)}})
+class RateLimitTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def post(self, forwarded_for):
+        return RequestFactory().post(
+            '/contact/', HTTP_X_FORWARDED_FOR=forwarded_for, REMOTE_ADDR='10.0.0.1',
+        )
+
+    def test_spoofed_forwarded_for_shares_the_proxy_hop_bucket(self):
+        waits = [
+            ratelimit.take('contact', self.post(f'198.51.100.{i}, 203.0.113.7'))
+            for i in range(3)
+        ]
+        self.assertEqual(waits[:2], [0, 0])
+        self.assertGreater(waits[2], 0)
+        self.assertEqual(ratelimit.take('contact', self.post('203.0.113.8')), 0)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/ratelimit-check',
+    }})
+    def test_check_rejects_non_atomic_cache(self):
+        self.assertEqual([e.id for e in ratelimit.check_cache()], ['core.E001'])
+
+    def test_check_accepts_local_memory_cache(self):
+        with override_settings(DEBUG=True):
+            self.assertEqual(ratelimit.check_cache(), [])
+        with override_settings(DEBUG=False):
+            self.assertEqual([e.id for e in ratelimit.check_cache()], ['core.W001'])
+        with override_settings(RATE_LIMIT_ENABLED=False, DEBUG=False):
+            self.assertEqual(ratelimit.check_cache(), [])
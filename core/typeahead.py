@@ -0,0 +1,274 @@
+"""
+In-memory prefix index for the AJAX typeahead endpoints.
+
+Each worker keeps a trie per scope ("post", "project") built from titles,
+tags and technologies. Every trie node stores up to ``TYPEAHEAD_NODE_RESULTS``
+document ids in score order, so a keystroke is a walk down the trie plus a
+filter over a short list, with no database round trip.
+
+Content-change signals bump a version in the shared cache; workers notice
+within ``TYPEAHEAD_VERSION_CHECK`` seconds and rebuild in a background thread
+while the old index keeps answering. With ``TASKS_EAGER`` on, or inside a
+transaction (as in tests), the rebuild runs in the calling thread instead: a
+thread on its own connection would not see the transaction's rows and would
+wait on its locks. ``lookup()`` returns ``None`` when the
+index cannot answer confidently (long queries, truncated nodes, an index cut
+short by its memory budget) and the caller falls back to the database engine.
+"""
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from . import metrics
+
+logger = logging.getLogger('django')
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+MAX_TERM_LENGTH = 24
+MAX_QUERY_TOKENS = 4
+
+
+def normalize(text):
+    return [w[:MAX_TERM_LENGTH] for w in WORD_RE.findall(text.lower())]
+
+
+class PrefixIndex:
+    """Trie over words; each node keeps the best few document ids"""
+
+    __slots__ = ('root', 'docs', 'terms', 'nodes', 'max_nodes', 'node_results', 'complete')
+
+    def __init__(self, max_nodes=200000, node_results=20):
+        # A node is [children, ids, truncated]
+        self.root = [{}, [], False]
+        self.docs = {}
+        self.terms = {}
+        self.nodes = 1
+        self.max_nodes = max_nodes
+        self.node_results = node_results
+        self.complete = True
+
+    def add(self, doc_id, payload, text):
+        """Index a document; add documents best-first so node lists stay ranked"""
+        words = set(normalize(text))
+        self.docs[doc_id] = payload
+        self.terms[doc_id] = words
+        for word in words:
+            node = self.root
+            for char in word:
+                child = node[0].get(char)
+                if child is None:
+                    if self.nodes >= self.max_nodes:
+                        # Memory budget reached: answers may be incomplete
+                        self.complete = False
+                        break
+                    child = node[0][char] = [{}, [], False]
+                    self.nodes += 1
+                node = child
+                ids = node[1]
+                if ids and ids[-1] == doc_id:
+                    # Already listed via another word sharing this prefix
+                    continue
+                if len(ids) < self.node_results:
+                    ids.append(doc_id)
+                else:
+                    node[2] = True
+
+    def _node(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return None
+        return node
+
+    def search(self, query, limit):
+        """Return (payloads, confident) for documents matching every token prefix"""
+        tokens = normalize(query)
+        if not tokens:
+            return [], True
+
+        nodes = []
+        for token in tokens:
+            node = self._node(token)
+            if node is None:
+                return [], self.complete
+            nodes.append((token, node))
+
+        # Scan the shortest candidate list and check the remaining tokens
+        token, node = min(nodes, key=lambda pair: len(pair[1][1]))
+        others = [t for t, _ in nodes if t != token]
+        results = []
+        for doc_id in node[1]:
+            words = self.terms[doc_id]
+            if all(any(w.startswith(t) for w in words) for t in others):
+                results.append(self.docs[doc_id])
+                if len(results) >= limit:
+                    return results, True
+        confident = self.complete and not node[2]
+        return results, confident
+
+
+def build_post_index(index):
+    from blog.models import Post
+    posts = (
+        Post.objects.filter(status='published')
+        .select_related('category')
+        .prefetch_related('tags')
+        .order_by('-published_at', '-created_at')
+    )
+    for p in posts.iterator(chunk_size=500):
+        index.add(p.pk, {
+            'title': p.title,
+            'slug': p.slug,
+            'featured_image': p.featured_image.url if p.featured_image else None,
+            'excerpt': p.excerpt[:100] + '...' if len(p.excerpt) > 100 else p.excerpt,
+            'category': p.category.name if p.category else None,
+        }, ' '.join([p.title] + [tag.name for tag in p.tags.all()]))
+
+
+def build_project_index(index):
+    from projects.models import Project
+    projects = (
+        Project.objects.filter(is_published=True)
+        .prefetch_related('technologies')
+        .order_by('-featured', '-created_at')
+    )
+    for p in projects.iterator(chunk_size=500):
+        index.add(p.pk, {
+            'title': p.title,
+            'slug': p.slug,
+            'thumbnail': p.thumbnail.url if p.thumbnail else None,
+            'description': p.description[:100] + '...' if len(p.description) > 100 else p.description,
+        }, ' '.join([p.title] + [tech.name for tech in p.technologies.all()]))
+
+
+BUILDERS = {
+    'post': build_post_index,
+    'project': build_project_index,
+}
+
+
+def _version_key(scope):
+    return f'typeahead:version:{scope}'
+
+
+class TypeaheadRegistry:
+    """Per-process indexes with lazy, versioned background rebuilds"""
+
+    def __init__(self):
+        self._indexes = {}
+        self._versions = {}
+        self._checked = {}
+        self._building = set()
+        self._lock = threading.Lock()
+
+    def _shared_version(self, scope):
+        version = cache.get(_version_key(scope))
+        if version is None:
+            version = 1
+            cache.add(_version_key(scope), version, None)
+        return version
+
+    def build(self, scope):
+        """Build the index for ``scope`` in the calling thread"""
+        version = self._shared_version(scope)
+        index = PrefixIndex(
+            max_nodes=getattr(settings, 'TYPEAHEAD_MAX_NODES', 200000),
+            node_results=getattr(settings, 'TYPEAHEAD_NODE_RESULTS', 20),
+        )
+        started = time.perf_counter()
+        BUILDERS[scope](index)
+        with self._lock:
+            self._indexes[scope] = index
+            self._versions[scope] = version
+            self._checked[scope] = time.monotonic()
+            self._building.discard(scope)
+        metrics.incr(f'typeahead.{scope}.builds')
+        logger.info(
+            f"Typeahead index '{scope}': {len(index.docs)} docs, {index.nodes} nodes, "
+            f"built in {time.perf_counter() - started:.3f}s"
+        )
+        return index
+
+    def _rebuild_in_background(self, scope):
+        if getattr(settings, 'TASKS_EAGER', False) or connection.in_atomic_block:
+            self.build(scope)
+            return
+        with self._lock:
+            if scope in self._building:
+                return
+            self._building.add(scope)
+
+        def run():
+            try:
+                self.build(scope)
+            except Exception as e:
+                logger.error(f"Typeahead index '{scope}' rebuild failed: {e}")
+                with self._lock:
+                    self._building.discard(scope)
+            finally:
+                connection.close()
+
+        threading.Thread(target=run, name=f'typeahead-{scope}', daemon=True).start()
+
+    def get(self, scope):
+        index = self._indexes.get(scope)
+        if index is None:
+            return self.build(scope)
+
+        now = time.monotonic()
+        if now - self._checked.get(scope, 0) >= getattr(settings, 'TYPEAHEAD_VERSION_CHECK', 2):
+            self._checked[scope] = now
+            if self._shared_version(scope) != self._versions.get(scope):
+                self._rebuild_in_background(scope)
+        # The rebuilt index when the rebuild ran inline
+        return self._indexes[scope]
+
+    def invalidate(self, scope):
+        """Mark ``scope`` stale in every worker"""
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), 2, None)
+        with self._lock:
+            self._checked.pop(scope, None)
+
+
+registry = TypeaheadRegistry()
+
+
+def lookup(scope, query, limit=5):
+    """Return typeahead payloads for ``query`` or None if the caller should use the database"""
+    query = query.strip()
+    if not query or len(normalize(query)) > MAX_QUERY_TOKENS:
+        metrics.incr(f'typeahead.{scope}.fallback')
+        return None
+    try:
+        index = registry.get(scope)
+    except Exception as e:
+        logger.error(f"Typeahead index '{scope}' unavailable: {e}")
+        return None
+
+    results, confident = index.search(query, limit)
+    if len(results) < limit and not confident:
+        metrics.incr(f'typeahead.{scope}.fallback')
+        return None
+    metrics.incr(f'typeahead.{scope}.hit')
+    return results
+
+
+def warm():
+    """Build every index (called from gunicorn's post_worker_init)"""
+    for scope in BUILDERS:
+        registry.build(scope)
+
+
+def invalidate(scope):
+    registry.invalidate(scope)
+
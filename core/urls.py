@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('_internal/metrics/', views.metrics_view, name='metrics'),
+]
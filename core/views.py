@@ -0,0 +1,55 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.views.generic import TemplateView
+from . import metrics, page_cache
+from .models import SearchDocument
+from .search import search
+
+
+class SearchView(TemplateView):
+    """Site-wide search across articles, projects, FAQs and services"""
+    template_name = 'core/search.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        doc_type = self.request.GET.get('type', '')
+        doc_types = [doc_type] if doc_type in dict(SearchDocument.DOC_TYPES) else None
+        
+        context['search_query'] = query
+        context['current_type'] = doc_type if doc_types else ''
+        context['doc_types'] = SearchDocument.DOC_TYPES
+        context['results'] = list(search(query, doc_types=doc_types)) if query else []
+        # Empty result pages must be purged when a matching document appears
+        page_cache.add_tags(self.request, page_cache.list_tag(SearchDocument))
+        return context
+
+
+@staff_member_required
+def metrics_view(request):
+    """Expose this worker's internal counters as JSON (staff only)"""
+    data = metrics.snapshot()
+    data['ratios'] = {
+        'site_info_hit_rate': metrics.ratio(
+            'site_info.hit', 'site_info.miss'
+        ),
+        'post_views_drop_rate': metrics.ratio(
+            'post_views.dropped', 'post_views.persisted'
+        ),
+        'page_cache_hit_rate': metrics.ratio(
+            'page_cache.hit', 'page_cache.miss'
+        ),
+        'fragment_hit_rate': metrics.ratio(
+            'fragment.hit', 'fragment.miss'
+        ),
+        'conditional_304_rate': metrics.ratio(
+            'conditional.not_modified', 'conditional.modified'
+        ),
+    }
+    if hasattr(cache, 'stats'):
+        # Two-tier backend: per-tier hit ratios and local memory use
+        data['cache'] = cache.stats()
+    if request.GET.get('reset'):
+        metrics.reset()
+    return JsonResponse(data)
@@ -44,4 +44,13 @@ keepalive = 5
 graceful_timeout = 30
 
 # Preload application for memory efficiency
-preload_app = True
\ No newline at end of file
+preload_app = True
+
+
+def post_worker_init(worker):
+    """Warm per-worker in-memory indexes before serving requests"""
+    try:
+        from core.typeahead import warm
+        warm()
+    except Exception as e:
+        worker.log.warning(f"Typeahead warm-up failed: {e}")
@@ -1,10 +1,23 @@
+import threading
+import time
+
 from django.conf import settings
+
+from core import metrics, stampede
 from .models import PersonalInfo, SiteConfiguration
 from contact.models import ContactInfo, SocialLink
 
 
-def site_info(request):
-    """Add site-wide information to context"""
+SITE_INFO_CACHE_KEY = 'home:site_info'
+
+# Per-process memo in front of the shared cache. Its short timeout bounds how
+# long another worker can serve chrome data after an invalidation.
+_memo = {'data': None, 'expires': 0.0}
+_memo_lock = threading.Lock()
+
+
+def _build_site_info():
+    """Query the database for the site-wide context"""
     context = {
         # Site configuration from settings
         'SITE_NAME': getattr(settings, 'SITE_NAME', 'Django Developer Portfolio'),
@@ -34,25 +47,72 @@ def site_info(request):
         context['SITE_TAGLINE'] = site_config.site_tagline
         context['SITE_DESCRIPTION'] = site_config.site_description
         context['SITE_KEYWORDS'] = site_config.site_keywords
-    except:
+    except Exception:
         pass
     
     try:
-        personal_info = PersonalInfo.objects.first()
-        context['personal_info'] = personal_info
-    except:
+        context['personal_info'] = PersonalInfo.objects.first()
+    except Exception:
         pass
     
     try:
-        contact_info = ContactInfo.get_solo()
-        context['contact_info'] = contact_info
-    except:
+        context['contact_info'] = ContactInfo.get_solo()
+    except Exception:
         pass
     
-    # Get active social links
+    # Get active social links (evaluated so they can be cached)
     try:
-        context['social_links'] = SocialLink.objects.filter(is_active=True)
-    except:
+        context['social_links'] = list(SocialLink.objects.filter(is_active=True))
+    except Exception:
         context['social_links'] = []
     
     return context
+
+
+def get_site_info():
+    """Return the site-wide context from the memo, the shared cache or the database"""
+    now = time.monotonic()
+    data = _memo['data']
+    if data is not None and _memo['expires'] > now:
+        metrics.incr('site_info.hit')
+        metrics.incr('site_info.hit.memo')
+        return data
+    
+    built = []
+    
+    def build():
+        built.append(True)
+        metrics.incr('site_info.miss')
+        return _build_site_info()
+    
+    # Single-flight rebuild: concurrent misses share one set of queries
+    data = stampede.get_or_set(
+        SITE_INFO_CACHE_KEY, build,
+        getattr(settings, 'SITE_INFO_CACHE_TIMEOUT', 60 * 60)
+    )
+    if not built:
+        metrics.incr('site_info.hit')
+        metrics.incr('site_info.hit.cache')
+    
+    with _memo_lock:
+        _memo['data'] = data
+        _memo['expires'] = now + getattr(settings, 'SITE_INFO_MEMO_TIMEOUT', 5)
+    return data
+
+
+def invalidate_site_info():
+    """Drop the memo and mark the shared entry for rebuild.
+    
+    The old value stays available to other requests while one of them
+    rebuilds it.
+    """
+    with _memo_lock:
+        _memo['data'] = None
+        _memo['expires'] = 0.0
+    stampede.expire(SITE_INFO_CACHE_KEY)
+
+
+def site_info(request):
+    """Add site-wide information to context"""
+    # Copy so templates can't mutate the cached dict
+    return dict(get_site_info())
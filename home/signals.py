@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .context_processors import invalidate_site_info
+from .models import PersonalInfo, SiteConfiguration
+from contact.models import ContactInfo, SocialLink
+
+
+@receiver(post_save, sender=SiteConfiguration)
+@receiver(post_delete, sender=SiteConfiguration)
+@receiver(post_save, sender=PersonalInfo)
+@receiver(post_delete, sender=PersonalInfo)
+@receiver(post_save, sender=ContactInfo)
+@receiver(post_delete, sender=ContactInfo)
+@receiver(post_save, sender=SocialLink)
+@receiver(post_delete, sender=SocialLink)
+def site_info_changed(sender, **kwargs):
+    """Invalidate the cached site-wide context when chrome data changes"""
+    # After commit, so a concurrent request cannot re-cache the old rows
+    transaction.on_commit(invalidate_site_info)
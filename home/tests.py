@@ -1,3 +1,36 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from . import context_processors
+from .models import SiteConfiguration
+
+
+class SiteInfoTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        context_processors._memo.update(data=None, expires=0.0)
+
+    def test_edit_from_another_worker_shows_after_memo_timeout(self):
+        SiteConfiguration.objects.create(pk=1, site_name='Before')
+        self.assertEqual(context_processors.get_site_info()['SITE_NAME'], 'Before')
+        # Another worker's save invalidates its own LocMem cache, not this one
+        SiteConfiguration.objects.filter(pk=1).update(site_name='After')
+
+        later = time.time() + settings.SITE_INFO_MEMO_TIMEOUT + 1
+        monotonic = time.monotonic() + settings.SITE_INFO_MEMO_TIMEOUT + 1
+        with mock.patch('time.time', return_value=later), \
+                mock.patch('time.monotonic', return_value=monotonic):
+            self.assertEqual(context_processors.get_site_info()['SITE_NAME'], 'After')
+
+    def test_save_invalidates_after_commit(self):
+        config = SiteConfiguration.objects.create(pk=1, site_name='Before')
+        self.assertEqual(context_processors.get_site_info()['SITE_NAME'], 'Before')
+        with self.captureOnCommitCallbacks(execute=True):
+            config.site_name = 'After'
+            config.save()
+        self.assertEqual(context_processors.get_site_info()['SITE_NAME'], 'After')
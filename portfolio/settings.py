@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'projects',
     'blog',
     'contact',
+    'core',
 ]
 
 MIDDLEWARE = [
@@ -59,6 +60,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Last, so hits still pass back through every response middleware above
+    'core.middleware.PageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'portfolio.urls'
@@ -161,6 +164,112 @@ else:  # Development - local media storage
     MEDIA_URL = '/media/'
     MEDIA_ROOT = BASE_DIR / 'media'
 
+# Caching
+# Without Redis every worker has its own LocMem cache and never sees another
+# worker's invalidations, so long-lived cached content is only on by default
+# with REDIS_URL (the CACHES setting below).
+REDIS_URL = config('REDIS_URL', default='')
+# Site-wide context (site_info context processor): shared cache timeout and
+# the per-process memo timeout that bounds cross-worker staleness. Without a
+# shared cache the memo timeout is the only bound, so it caps both.
+SITE_INFO_MEMO_TIMEOUT = config('SITE_INFO_MEMO_TIMEOUT', default=5, cast=int)
+SITE_INFO_CACHE_TIMEOUT = config(
+    'SITE_INFO_CACHE_TIMEOUT', default=60 * 60 if REDIS_URL else SITE_INFO_MEMO_TIMEOUT, cast=int
+)
+
+# Write-behind view counters: maximum seconds before buffered increments are
+# written, and the number of distinct rows that forces an early flush.
+VIEW_COUNTER_FLUSH_INTERVAL = config('VIEW_COUNTER_FLUSH_INTERVAL', default=10, cast=int)
+VIEW_COUNTER_MAX_PENDING = config('VIEW_COUNTER_MAX_PENDING', default=500, cast=int)
+
+# PostView analytics ingestion: bounded per-worker queue flushed with
+# bulk_create. Events are dropped (and counted) when the queue is full.
+POST_VIEW_TRACKING = config('POST_VIEW_TRACKING', default=True, cast=bool)
+POST_VIEW_QUEUE_SIZE = config('POST_VIEW_QUEUE_SIZE', default=10000, cast=int)
+POST_VIEW_BATCH_SIZE = config('POST_VIEW_BATCH_SIZE', default=500, cast=int)
+POST_VIEW_FLUSH_INTERVAL = config('POST_VIEW_FLUSH_INTERVAL', default=5, cast=int)
+# Raw PostView rows older than this are pruned by rollup_post_views; the
+# trending widget reads the daily rollup over POPULAR_POSTS_DAYS.
+POST_VIEW_RETENTION_DAYS = config('POST_VIEW_RETENTION_DAYS', default=90, cast=int)
+POPULAR_POSTS_DAYS = config('POPULAR_POSTS_DAYS', default=30, cast=int)
+# Typeahead prefix index: node budget per index, ids kept per node, and how
+# often (seconds) workers check for a newer index version.
+TYPEAHEAD_MAX_NODES = config('TYPEAHEAD_MAX_NODES', default=200000, cast=int)
+TYPEAHEAD_NODE_RESULTS = config('TYPEAHEAD_NODE_RESULTS', default=20, cast=int)
+TYPEAHEAD_VERSION_CHECK = config('TYPEAHEAD_VERSION_CHECK', default=2, cast=int)
+# Number of precomputed related posts / projects stored per object
+RELATED_POSTS_LIMIT = config('RELATED_POSTS_LIMIT', default=6, cast=int)
+RELATED_PROJECTS_LIMIT = config('RELATED_PROJECTS_LIMIT', default=6, cast=int)
+# Full-page cache for anonymous GETs (see core.page_cache). On by default only
+# with Redis: per-process LocMem pages are never invalidated by other workers
+PAGE_CACHE_ENABLED = config('PAGE_CACHE_ENABLED', default=bool(REDIS_URL) and not DEBUG, cast=bool)
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=600, cast=int)
+PAGE_CACHE_EXCLUDE_PATHS = ['/admin/', '/_internal/', '/static/', '/media/']
+PAGE_CACHE_STALE_TIMEOUT = config('PAGE_CACHE_STALE_TIMEOUT', default=300, cast=int)
+PAGE_CACHE_LOCK_WAIT = config('PAGE_CACHE_LOCK_WAIT', default=3, cast=float)
+# Cursor ("load more") pagination for blog and project lists; a ?cursor=
+# parameter switches a single request over even when this is off
+KEYSET_PAGINATION = config('KEYSET_PAGINATION', default=False, cast=bool)
+# Cached exact counts for public listings; planner estimates for admin
+# changelists above the threshold (PostgreSQL only, see core.counts)
+COUNT_CACHE_TIMEOUT = config('COUNT_CACHE_TIMEOUT', default=300, cast=int)
+ESTIMATED_COUNT_THRESHOLD = config('ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int)
+# Cached sidebar/filter fragments (see core.fragments); on by default only
+# with Redis, like the page cache
+FRAGMENT_CACHE_ENABLED = config('FRAGMENT_CACHE_ENABLED', default=bool(REDIS_URL), cast=bool)
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=60 * 60, cast=int)
+# Cached previous/next links on detail pages (see core.neighbours); short
+# without Redis, where other workers' invalidations never arrive
+NEIGHBOURS_CACHE_TIMEOUT = config(
+    'NEIGHBOURS_CACHE_TIMEOUT', default=60 * 60 * 24 if REDIS_URL else 60, cast=int
+)
+# Responsive image variants generated off the request path (see core.images)
+IMAGE_VARIANT_WIDTHS = [320, 640, 960, 1280, 1920]
+IMAGE_VARIANT_FORMATS = ['avif', 'webp']
+# Background tasks (see core.tasks); eager runs them in-process after commit,
+# the default in development where no worker runs
+TASKS_EAGER = config('TASKS_EAGER', default=DEBUG, cast=bool)
+TASK_POLL_INTERVAL = config('TASK_POLL_INTERVAL', default=1.0, cast=float)
+TASK_RETRY_BASE_DELAY = config('TASK_RETRY_BASE_DELAY', default=10, cast=int)
+TASK_RETRY_MAX_DELAY = config('TASK_RETRY_MAX_DELAY', default=60 * 60, cast=int)
+TASK_LOCK_TIMEOUT = config('TASK_LOCK_TIMEOUT', default=10 * 60, cast=int)
+# Stampede protection for cached rebuilds (see core.stampede)
+STAMPEDE_LOCK_TIMEOUT = config('STAMPEDE_LOCK_TIMEOUT', default=30, cast=int)
+STAMPEDE_WAIT_TIMEOUT = config('STAMPEDE_WAIT_TIMEOUT', default=3, cast=float)
+STAMPEDE_STALE_TIMEOUT = config('STAMPEDE_STALE_TIMEOUT', default=300, cast=int)
+STAMPEDE_BETA = config('STAMPEDE_BETA', default=1.0, cast=float)
+# ETag / Last-Modified on content views (see core.conditional); built from
+# page cache tag versions, so on by default only when they are shared
+CONDITIONAL_GET_ENABLED = config('CONDITIONAL_GET_ENABLED', default=bool(REDIS_URL), cast=bool)
+# Part of every ETag so a deploy with new templates never answers 304
+CONDITIONAL_GET_VERSION = config('RAILWAY_GIT_COMMIT_SHA', default='')
+
+# Cache: per-worker LRU in front of Redis when REDIS_URL is set (see core.cache)
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.TwoTierCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'portfolio',
+            'OPTIONS': {
+                'LOCAL_MAX_ENTRIES': config('CACHE_LOCAL_MAX_ENTRIES', default=5000, cast=int),
+                'LOCAL_MAX_BYTES': config('CACHE_LOCAL_MAX_BYTES', default=16 * 1024 * 1024, cast=int),
+                'LOCAL_TIMEOUT': config('CACHE_LOCAL_TIMEOUT', default=5, cast=int),
+                'LOCAL_EXCLUDE': ['*:lock'],
+                # redis-py picks up hiredis automatically when installed
+                'SHARED_OPTIONS': {
+                    'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                },
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -171,14 +280,30 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 # Email Configuration (for contact form)
 # Use environment variable to control email backend
 # Email Configuration - SendGrid SMTP
-EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+# core.mail.EmailBackend is Django's SMTP backend with pooled, reused connections
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='core.mail.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.sendgrid.net')
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='apikey')  # This should be 'apikey'
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')  # Your SendGrid API key
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+EMAIL_POOL_SIZE = config('EMAIL_POOL_SIZE', default=2, cast=int)
+EMAIL_POOL_MAX_AGE = config('EMAIL_POOL_MAX_AGE', default=300, cast=int)
+EMAIL_POOL_HEALTH_CHECK = config('EMAIL_POOL_HEALTH_CHECK', default=15, cast=int)
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@example.com')  # Your verified sender
 CONTACT_EMAIL = config('CONTACT_EMAIL', default='admin@example.com')  # Where you receive messages
+# Token buckets for form POSTs (see core.ratelimit): scope -> {bucket: (capacity, period seconds)}
+# Shared across workers only with REDIS_URL; the system checks reject other shared caches
+RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+RATE_LIMITS = {
+    'contact': {'ip': (5, 60 * 60), 'email': (3, 60 * 60), 'global': (100, 60 * 60)},
+    'newsletter': {'ip': (10, 60 * 60), 'email': (3, 60 * 60), 'global': (300, 60 * 60)},
+}
+# Newsletter delivery (see blog.newsletter); the rate is messages per second, 0 for none
+NEWSLETTER_BATCH_SIZE = config('NEWSLETTER_BATCH_SIZE', default=100, cast=int)
+NEWSLETTER_RATE_LIMIT = config('NEWSLETTER_RATE_LIMIT', default=10, cast=float)
+NEWSLETTER_TASK_BUDGET = config('NEWSLETTER_TASK_BUDGET', default=240, cast=int)
 
 
 # Security Settings (enable in production)
@@ -200,7 +325,9 @@ SITE_TAGLINE = "Building Scalable Web Solutions with Django"
 SITE_DESCRIPTION = "Professional Django developer specializing in building robust, scalable web applications. View my portfolio of projects and get in touch for collaborations."
 SITE_KEYWORDS = "Django, Python, Web Development, Full Stack Developer, Portfolio"
 SITE_AUTHOR = "CC"
-SITE_URL = "https://yourdomain.com"
+# Absolute links in emails (newsletter unsubscribe URLs); the newsletter
+# refuses to send while this is still the placeholder
+SITE_URL = config('SITE_URL', default='https://yourdomain.com')
 
 # Social Links
 GITHUB_URL = "https://github.com/emmydigitalzcodes"
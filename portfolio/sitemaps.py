@@ -1,5 +1,8 @@
 from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps.views import sitemap as sitemap_view
 from django.urls import reverse
+from core.conditional import compute_validators, latest_of
+from core.page_cache import add_tags, model_tag
 from projects.models import Project
 from blog.models import Post, Category
 
@@ -69,3 +72,22 @@ class CategorySitemap(Sitemap):
     
     def location(self, obj):
         return obj.get_absolute_url()
+
+
+def sitemap_validators(request, **kwargs):
+    """ETag / Last-Modified for sitemap.xml from one aggregate query"""
+    return compute_validators(
+        Post.objects.filter(status='published'),
+        models=(Project, Category),
+        projects=latest_of(Project.objects.filter(is_published=True)),
+    )
+
+
+def sitemap(request, sitemaps, **kwargs):
+    """The sitemap view, purged from the page cache when any listed model changes.
+
+    Its context holds URL dicts rather than model instances, so the page
+    cache can't derive these tags itself.
+    """
+    add_tags(request, *(model_tag(model) for model in (Post, Project, Category)))
+    return sitemap_view(request, sitemaps, **kwargs)
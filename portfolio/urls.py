@@ -6,10 +6,10 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
-from django.contrib.sitemaps.views import sitemap
+from core.conditional import conditional_page
 from .sitemaps import (
     StaticViewSitemap, ProjectSitemap, 
-    BlogSitemap, CategorySitemap
+    BlogSitemap, CategorySitemap, sitemap, sitemap_validators
 )
 
 # Sitemap configuration
@@ -36,8 +36,12 @@ urlpatterns = [
     # Contact app
     path('contact/', include('contact.urls', namespace='contact')),
     
+    # Core (site search, internal metrics)
+    path('', include('core.urls', namespace='core')),
+    
     # Sitemap
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps},
+    path('sitemap.xml', conditional_page(sitemap_validators, 'sitemap')(sitemap),
+         {'sitemaps': sitemaps},
          name='django.contrib.sitemaps.views.sitemap'),
     
     # Robots.txt
@@ -0,0 +1,33 @@
+"""
+Cached filter and technology fragments shared by the project list views
+(see core.fragments).
+"""
+from core import fragments
+from core.page_cache import model_tag
+from .models import ProjectCategory, Technology
+
+
+def categories_context(current_category):
+    return {
+        'categories': list(ProjectCategory.objects.filter(is_active=True)),
+        'current_category': current_category,
+    }
+
+
+def technologies_context():
+    return {'technologies': list(Technology.objects.filter(is_active=True))}
+
+
+def render_category_filters(current_category='', request=None):
+    return fragments.render(
+        'projects.category_filters', 'projects/partials/category_filters.html',
+        lambda: categories_context(current_category),
+        [model_tag(ProjectCategory)], vary=[current_category], request=request,
+    )
+
+
+def render_technologies(request=None):
+    return fragments.render(
+        'projects.technologies', 'projects/partials/technologies_grid.html',
+        technologies_context, [model_tag(Technology)], request=request,
+    )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from projects.related import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Recompute the whole related-projects ranking in bulk."
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Rows written per bulk insert",
+        )
+    
+    def handle(self, *args, **options):
+        edges = rebuild_all(batch_size=options['batch_size'])
+        self.stdout.write(f"Stored {edges} related-project edge(s)")
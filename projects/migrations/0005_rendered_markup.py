@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_neighbour_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='architecture_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='challenges_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='markup_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='solutions_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='architecture',
+            field=models.TextField(blank=True, help_text='Technical architecture description (Markdown supported)'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='challenges',
+            field=models.TextField(blank=True, help_text='Challenges faced during development (Markdown supported)'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='content',
+            field=models.TextField(help_text='Detailed description for project detail page (Markdown supported)'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='solutions',
+            field=models.TextField(blank=True, help_text='Solutions implemented (Markdown supported)'),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.urls import reverse
 from django.utils.text import slugify
 
+from core import markup
+
 
 class Technology(models.Model):
     """Technologies used in projects"""
@@ -73,7 +75,7 @@ class Project(models.Model):
     slug = models.SlugField(unique=True, blank=True)
     subtitle = models.CharField(max_length=300, blank=True)
     description = models.TextField(help_text="Brief description for project cards")
-    content = models.TextField(help_text="Detailed description for project detail page")
+    content = models.TextField(help_text="Detailed description for project detail page (Markdown supported)")
     
     # Project status
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='completed')
@@ -108,11 +110,19 @@ class Project(models.Model):
     duration = models.CharField(max_length=100, blank=True, help_text="e.g., '3 months'")
     
     # Technical details
-    challenges = models.TextField(blank=True, help_text="Challenges faced during development")
-    solutions = models.TextField(blank=True, help_text="Solutions implemented")
-    architecture = models.TextField(blank=True, help_text="Technical architecture description")
+    challenges = models.TextField(blank=True, help_text="Challenges faced during development (Markdown supported)")
+    solutions = models.TextField(blank=True, help_text="Solutions implemented (Markdown supported)")
+    architecture = models.TextField(blank=True, help_text="Technical architecture description (Markdown supported)")
     key_features = models.TextField(blank=True, help_text="Key features (one per line)")
     
+    # Rendered from the Markdown fields above on save (see core.markup)
+    content_html = models.TextField(blank=True, editable=False)
+    challenges_html = models.TextField(blank=True, editable=False)
+    solutions_html = models.TextField(blank=True, editable=False)
+    architecture_html = models.TextField(blank=True, editable=False)
+    toc = models.JSONField(default=list, blank=True, editable=False)
+    markup_hash = models.CharField(max_length=40, blank=True, editable=False)
+    
     # SEO
     meta_title = models.CharField(max_length=200, blank=True)
     meta_description = models.TextField(blank=True)
@@ -123,10 +133,40 @@ class Project(models.Model):
     
     class Meta:
         ordering = ['-featured', '-created_at']
+        # Partial indexes matching the published-project query shapes in projects.views
+        indexes = [
+            models.Index(
+                fields=['-featured', '-created_at'],
+                condition=models.Q(is_published=True),
+                name='projects_pub_order_idx',
+            ),
+            models.Index(
+                fields=['category', '-featured', '-created_at'],
+                condition=models.Q(is_published=True),
+                name='projects_pub_cat_order_idx',
+            ),
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(is_published=True),
+                name='projects_pub_nav_idx',
+            ),
+        ]
+    
+    markup_fields = {
+        'content': 'content_html',
+        'challenges': 'challenges_html',
+        'solutions': 'solutions_html',
+        'architecture': 'architecture_html',
+    }
+    # Sections sit under the detail page's <h3> headings
+    markup_baselevel = 4
     
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        rendered = markup.render_fields(self)
+        if rendered and kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *rendered}
         super().save(*args, **kwargs)
     
     def __str__(self):
@@ -147,6 +187,34 @@ class Project(models.Model):
     @property
     def display_title(self):
         return self.meta_title or self.title
+    
+    @property
+    def related_projects(self):
+        """Related projects, best first, from the precomputed RelatedProject ranking"""
+        return Project.objects.filter(
+            is_published=True,
+            related_from__project=self
+        ).select_related('category').prefetch_related('technologies').order_by('related_from__rank')
+
+
+class RelatedProject(models.Model):
+    """Precomputed related-project edge, maintained by projects.related"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_from')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    
+    class Meta:
+        ordering = ['project', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'related'], name='projects_relatedproject_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['project', 'rank'], name='projects_related_rank_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.project_id} -> {self.related_id} ({self.score:.2f})"
 
 
 class ProjectImage(models.Model):
@@ -0,0 +1,50 @@
+"""
+Precomputed related-projects ranking.
+
+For each published project the best ``RELATED_PROJECTS_LIMIT`` other
+projects are stored in ``RelatedProject``, scored by ``core.related`` from
+shared technologies (weighted by rarity) and the same category, plus the
+candidate's featured level. Rankings with few real matches are filled up
+with the most featured projects.
+"""
+from core.related import RelatedGraph
+
+from .models import Project, RelatedProject
+
+FEATURED_WEIGHT = 0.5
+
+
+class ProjectGraph(RelatedGraph):
+    model = Project
+    edge_model = RelatedProject
+    owner_field = 'project'
+    tags_field = 'technologies'
+    visible = {'is_published': True}
+    limit_setting = 'RELATED_PROJECTS_LIMIT'
+    boost_fields = ('featured',)
+    fill_order = ('-featured', '-pk')
+    
+    def boost(self, values, now):
+        return FEATURED_WEIGHT * values[0]
+
+
+graph = ProjectGraph()
+
+
+def update_project(project_id, fill=False):
+    """Recompute edges for a changed project and every project it could affect.
+    
+    Publishing, unpublishing or re-featuring a project can also move the
+    featured fill, so those changes pass ``fill=True``.
+    """
+    return graph.update(project_id, fill=fill)
+
+
+def refresh(project_ids):
+    """Recompute edges for ``project_ids`` only"""
+    return graph.refresh(project_ids)
+
+
+def rebuild_all(batch_size=1000):
+    """Recompute the whole ranking"""
+    return graph.rebuild_all(batch_size=batch_size)
@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Project
+from . import related
+
+
+@receiver(pre_save, sender=Project)
+def project_related_fields_changed(sender, instance, raw=False, **kwargs):
+    # None: nothing relevant changed; 'partial': category; 'fill': visibility or
+    # featured level, which can also move the featured fill of sparse rankings
+    instance._related_change = 'fill'
+    if raw or not instance.pk:
+        return
+    old = Project.objects.filter(pk=instance.pk).values(
+        'category_id', 'is_published', 'featured'
+    ).first()
+    if old is None:
+        return
+    if old['is_published'] != instance.is_published or old['featured'] != instance.featured:
+        instance._related_change = 'fill'
+    elif old['category_id'] != instance.category_id:
+        instance._related_change = 'partial'
+    else:
+        instance._related_change = None
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, raw=False, **kwargs):
+    change = getattr(instance, '_related_change', 'fill')
+    if not raw and change:
+        pk = instance.pk
+        transaction.on_commit(lambda: related.update_project(pk, fill=change == 'fill'))
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+def project_technologies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    project_ids = [instance.pk] if not reverse else list(pk_set or ())
+    for pk in project_ids:
+        transaction.on_commit(lambda pk=pk: related.update_project(pk))
+
+
+@receiver(pre_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    # Found before the delete, while the project's technologies and edges still exist
+    affected = related.graph.affected(instance.pk, fill=True) - {instance.pk}
+    if affected:
+        transaction.on_commit(lambda: related.refresh(affected))
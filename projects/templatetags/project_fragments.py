@@ -0,0 +1,19 @@
+from django import template
+
+from .. import fragments
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def project_category_filters(context):
+    """Category filter buttons, highlighting ``current_category`` (cached)"""
+    return fragments.render_category_filters(
+        context.get('current_category', ''), context.get('request')
+    )
+
+
+@register.simple_tag(takes_context=True)
+def project_technologies(context):
+    """Grid of active technologies (cached)"""
+    return fragments.render_technologies(context.get('request'))
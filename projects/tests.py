@@ -1,3 +1,102 @@
+import random
+
 from django.test import TestCase
 
-# Create your tests here.
+from . import related
+from .models import Project, ProjectCategory, RelatedProject, Technology
+
+
+class RelatedProjectsTests(TestCase):
+    """Incremental updates, featured fill included, agree with a full rebuild"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(11)
+        cls.categories = [
+            ProjectCategory.objects.create(name=f'Category {i}', slug=f'category-{i}')
+            for i in range(4)
+        ]
+        cls.technologies = [
+            Technology.objects.create(name=f'Tech {i}', slug=f'tech-{i}') for i in range(8)
+        ]
+        cls.projects = []
+        for i in range(30):
+            project = Project.objects.create(
+                title=f'Project {i}',
+                slug=f'project-{i}',
+                description='Description',
+                content='Content',
+                # A few sparse projects without a category rely on the fill
+                category=cls.categories[i % 3] if i % 7 else None,
+                featured=2 if i % 11 == 0 else 1 if i % 5 == 0 else 0,
+                is_published=i % 9 != 8,
+            )
+            if i % 7:
+                project.technologies.set(rng.sample(cls.technologies[:6], rng.randint(0, 3)))
+            cls.projects.append(project)
+        related.rebuild_all()
+
+    def edges(self, owners=None):
+        edges = RelatedProject.objects.all()
+        if owners is not None:
+            edges = edges.filter(project_id__in=owners)
+        return set(edges.values_list('project_id', 'related_id', 'rank', 'score'))
+
+    def assertMatchesRebuild(self, owners=None):
+        # Visibility changes move the weights of every ranking; compare the
+        # rankings the update recomputes
+        incremental = self.edges(owners)
+        related.rebuild_all()
+        self.assertEqual(incremental, self.edges(owners))
+
+    def test_scoped_corpus_loads_candidates_and_fill_only(self):
+        project = self.projects[1]
+        corpus = related.graph.load([project.pk])
+        expected = {project.pk} | set(
+            Project.objects.filter(is_published=True, category=project.category).values_list('pk', flat=True)
+        ) | set(
+            Project.objects.filter(
+                is_published=True, technologies__in=project.technologies.all(),
+            ).values_list('pk', flat=True)
+        ) | set(corpus.fill)
+        self.assertEqual(set(corpus.categories), expected)
+        self.assertLess(len(corpus.categories), Project.objects.filter(is_published=True).count())
+
+    def test_featured_change_matches_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projects[3].featured = 2
+            self.projects[3].save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projects[0].featured = 0
+            self.projects[0].save()
+        self.assertMatchesRebuild()
+
+    def test_publish_updates_affected_rankings(self):
+        project = self.projects[8]
+        with self.captureOnCommitCallbacks(execute=True):
+            project.is_published = True
+            project.featured = 2
+            project.save()
+        self.assertMatchesRebuild(related.graph.affected(project.pk, fill=True))
+
+    def test_unpublish_updates_affected_rankings(self):
+        project = self.projects[0]
+        affected = related.graph.affected(project.pk, fill=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            project.is_published = False
+            project.save()
+        self.assertFalse(RelatedProject.objects.filter(related=project).exists())
+        self.assertMatchesRebuild(affected)
+
+    def test_technology_change_matches_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projects[1].technologies.set([self.technologies[6], self.technologies[2]])
+            self.projects[2].technologies.add(self.technologies[6])
+        self.assertMatchesRebuild()
+
+    def test_delete_updates_affected_rankings(self):
+        project = self.projects[0]
+        affected = related.graph.affected(project.pk, fill=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            project.delete()
+        self.assertMatchesRebuild(affected - {project.pk})
@@ -1,10 +1,31 @@
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import ListView, DetailView
-from django.db.models import Q
-from .models import Project, ProjectCategory, Technology
+from django.db.models import Max, Q
+from core import neighbours, typeahead
+from core.conditional import ConditionalGetMixin
+from core.counts import CachedCountPaginator, cached_count
+from core.page_cache import add_tags, model_tag
+from core.pagination import KeysetPaginationMixin
+from .models import Project, ProjectCategory, ProjectImage, ProjectStat, Technology
 
 
-class ProjectListView(ListView):
+class PublishedProjectsConditionalMixin(ConditionalGetMixin):
+    """Validators cover every published project (featured sidebar, stats)"""
+    conditional_models = (ProjectCategory, Technology, ProjectImage)
+    
+    def get_validator_queryset(self):
+        return Project.objects.filter(is_published=True)
+
+
+class ProjectKeysetMixin(KeysetPaginationMixin):
+    """Cursor pagination in the model's default order, made unique by id"""
+    keyset_ordering = ['-featured', '-created_at', '-id']
+    ajax_template_name = 'projects/partials/project_page.html'
+    # Offset mode still shows page numbers; its COUNT(*) goes through the cache
+    paginator_class = CachedCountPaginator
+
+
+class ProjectListView(PublishedProjectsConditionalMixin, ProjectKeysetMixin, ListView):
     """Project list view with filtering"""
     model = Project
     template_name = 'projects/project_list.html'
@@ -41,11 +62,8 @@ class ProjectListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get all categories for filter
-        context['categories'] = ProjectCategory.objects.filter(is_active=True)
-        
-        # Get all technologies for filter
-        context['technologies'] = Technology.objects.filter(is_active=True)
+        # Category filters and the technologies grid are cached fragments
+        # (projects.fragments)
         
         # Get featured projects
         context['featured_projects'] = Project.objects.filter(
@@ -58,21 +76,22 @@ class ProjectListView(ListView):
         context['current_technology'] = self.request.GET.get('technology', '')
         context['search_query'] = self.request.GET.get('q', '')
         
-        # Project stats
-        context['total_projects'] = Project.objects.filter(is_published=True).count()
-        context['featured_count'] = Project.objects.filter(
+        # Project stats (cached until a project changes)
+        context['total_projects'] = cached_count(Project.objects.filter(is_published=True))
+        context['featured_count'] = cached_count(Project.objects.filter(
             is_published=True, featured__gt=0
-        ).count()
+        ))
         
         return context
 
 
-class ProjectDetailView(DetailView):
+class ProjectDetailView(PublishedProjectsConditionalMixin, DetailView):
     """Project detail view"""
     model = Project
     template_name = 'projects/project_detail.html'
     context_object_name = 'project'
     slug_url_kwarg = 'slug'
+    conditional_models = (ProjectCategory, Technology, ProjectImage, ProjectStat)
     
     def get_queryset(self):
         return Project.objects.filter(
@@ -81,44 +100,25 @@ class ProjectDetailView(DetailView):
             'technologies', 'images', 'stats'
         )
     
+    def get_validator_aggregates(self):
+        return {'current': Max('pk', filter=Q(slug=self.kwargs['slug']))}
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        project = self.get_object()
+        project = self.object
         
-        # Get related projects
-        related_projects = Project.objects.filter(
-            is_published=True
-        ).exclude(id=project.id)
+        # Get related projects (precomputed ranking: technologies, category, featured)
+        context['related_projects'] = project.related_projects[:3]
         
-        # Prioritize same category
-        if project.category:
-            related_projects = related_projects.filter(
-                category=project.category
-            ) | related_projects
-        
-        # Then prioritize same technologies
-        if project.technologies.exists():
-            related_projects = related_projects.filter(
-                technologies__in=project.technologies.all()
-            ) | related_projects
-        
-        context['related_projects'] = related_projects.distinct()[:3]
-        
-        # Get next and previous projects
-        context['next_project'] = Project.objects.filter(
-            is_published=True,
-            created_at__gt=project.created_at
-        ).order_by('created_at').first()
-        
-        context['previous_project'] = Project.objects.filter(
-            is_published=True,
-            created_at__lt=project.created_at
-        ).order_by('-created_at').first()
+        # Get next and previous projects (one cached lookup)
+        context['previous_project'], context['next_project'] = neighbours.get(
+            project, self.request
+        )
         
         return context
 
 
-class ProjectCategoryView(ListView):
+class ProjectCategoryView(PublishedProjectsConditionalMixin, ProjectKeysetMixin, ListView):
     """View projects by category"""
     model = Project
     template_name = 'projects/project_list.html'
@@ -139,13 +139,11 @@ class ProjectCategoryView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
-        context['categories'] = ProjectCategory.objects.filter(is_active=True)
-        context['technologies'] = Technology.objects.filter(is_active=True)
         context['page_title'] = f"Projects in {self.category.name}"
         return context
 
 
-class TechnologyView(ListView):
+class TechnologyView(PublishedProjectsConditionalMixin, ProjectKeysetMixin, ListView):
     """View projects by technology"""
     model = Project
     template_name = 'projects/project_list.html'
@@ -166,13 +164,11 @@ class TechnologyView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['technology'] = self.technology
-        context['categories'] = ProjectCategory.objects.filter(is_active=True)
-        context['technologies'] = Technology.objects.filter(is_active=True)
         context['page_title'] = f"Projects using {self.technology.name}"
         return context
 
 
-class FeaturedProjectsView(ListView):
+class FeaturedProjectsView(PublishedProjectsConditionalMixin, ProjectKeysetMixin, ListView):
     """View featured projects"""
     model = Project
     template_name = 'projects/project_list.html'
@@ -187,8 +183,6 @@ class FeaturedProjectsView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = ProjectCategory.objects.filter(is_active=True)
-        context['technologies'] = Technology.objects.filter(is_active=True)
         context['page_title'] = "Featured Projects"
         context['showing_featured'] = True
         return context
@@ -197,9 +191,14 @@ class FeaturedProjectsView(ListView):
 def project_search(request):
     """AJAX search for projects"""
     query = request.GET.get('q', '')
+    # Results are plain dicts, so the page cache can't collect their tags
+    add_tags(request, model_tag(Project))
     
     projects = []
     if query:
+        # In-memory prefix index first, database search for the long tail
+        projects = typeahead.lookup('project', query, limit=5)
+    if query and projects is None:
         projects_list = Project.objects.filter(
             is_published=True
         ).filter(
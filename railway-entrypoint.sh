@@ -1,9 +1,20 @@
 #!/bin/bash
 # railway-entrypoint.sh - Entrypoint script for Railway
+#
+# Usage: railway-entrypoint.sh [web|worker]
+#   web (default): migrations, static files, then Gunicorn
+#   worker: the background task queue (core.tasks, run_tasks)
+#
+# Queued tasks only run with a worker. Either deploy a second service from
+# railway.worker.yaml and set TASKS_WORKER=service on the web service, or
+# set TASKS_WORKER=inline to run the worker inside the web container. With
+# neither (and TASKS_EAGER off) the web container starts a worker itself.
 
 set -e
 
-echo "🚀 Starting Django Portfolio on Railway..."
+ROLE="${1:-web}"
+
+echo "🚀 Starting Django Portfolio on Railway (${ROLE})..."
 
 # Wait for database to be ready
 echo "⏳ Waiting for database..."
@@ -29,10 +40,39 @@ print('❌ Database connection timeout')
 sys.exit(1)
 "
 
+if [ "$ROLE" = "worker" ]; then
+    echo "⚙️  Starting task worker..."
+    exec python manage.py run_tasks
+elif [ "$ROLE" != "web" ]; then
+    echo "❌ Unknown role '${ROLE}', expected web or worker"
+    exit 1
+fi
+
+# Never start a site whose queued tasks would not run
+TASKS_WORKER="$(echo "${TASKS_WORKER:-}" | tr '[:upper:]' '[:lower:]')"
+case "$TASKS_WORKER" in
+    service|inline) ;;
+    *)
+        case "$(echo "${TASKS_EAGER:-false}" | tr '[:upper:]' '[:lower:]')" in
+            true|1|yes|on) ;;
+            *)
+                echo "⚠️  No task worker configured; starting one alongside Gunicorn."
+                echo "   Set TASKS_WORKER=service and deploy railway.worker.yaml as a second"
+                echo "   service, or TASKS_WORKER=inline to keep this and silence the warning."
+                TASKS_WORKER=inline
+                ;;
+        esac
+        ;;
+esac
+
 # Run migrations
 echo "🔄 Running database migrations..."
 python manage.py migrate --noinput
 
+# Render stored Markdown HTML (rows with a current hash are skipped)
+echo "📝 Rendering Markdown content..."
+python manage.py rerender_posts
+
 # Create cache table if using database cache
 echo "🔄 Creating cache table..."
 python manage.py createcachetable 2>/dev/null || true
@@ -45,6 +85,11 @@ python manage.py collectstatic --noinput --clear 2>/dev/null || true
 echo "🗜️  Compressing static files..."
 python manage.py compress --force 2>/dev/null || true
 
+if [ "$TASKS_WORKER" = "inline" ]; then
+    echo "⚙️  Starting task worker alongside Gunicorn..."
+    python manage.py run_tasks &
+fi
+
 echo "✅ Setup complete! Starting Gunicorn..."
 
 # Start Gunicorn with Railway's PORT
@@ -306,7 +306,7 @@ document.addEventListener('DOMContentLoaded', function() {
             })
             .then(response => {
                 clearTimeout(timeoutId);
-                if (!response.ok) {
+                if (!response.ok && response.status !== 429) {
                     throw new Error(`HTTP error! status: ${response.status}`);
                 }
                 return response.text();
@@ -442,6 +442,55 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
+    // ========================================
+    // Load More (cursor pagination)
+    // ========================================
+    document.addEventListener('click', function(e) {
+        const link = e.target.closest('[data-load-more-link]');
+        if (!link) {
+            return;
+        }
+        const items = document.querySelector('[data-load-more-items]');
+        const container = link.closest('[data-load-more]');
+        if (!items || !container) {
+            return;
+        }
+        e.preventDefault();
+        link.classList.add('disabled');
+        
+        fetch(link.href, {
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            },
+            credentials: 'same-origin'
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.text();
+        })
+        .then(html => {
+            const page = document.createElement('div');
+            page.innerHTML = html;
+            const newItems = page.querySelector('[data-load-more-items]');
+            if (newItems) {
+                items.append(...newItems.children);
+            }
+            const newContainer = page.querySelector('[data-load-more]');
+            if (newContainer) {
+                container.replaceWith(newContainer);
+            } else {
+                container.remove();
+            }
+        })
+        .catch(error => {
+            console.error('Load more error:', error);
+            // Fall back to a normal page load
+            window.location.href = link.href;
+        });
+    });
+    
     // ========================================
     // Search Functionality
     // ========================================